@@ -67,6 +67,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "utils.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -158,6 +159,11 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "user.auth.ClerkAuthentication",
     ],
+    # orjson 기반 JSON 렌더러 (orjson 미설치 시 DRF JSONRenderer 와 동일)
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 SPECTACULAR_SETTINGS = {
@@ -186,6 +192,26 @@ DEFAULT_FROM_EMAIL = os.getenv("SMTP_DEFAULT_SENDER", "no-reply@example.com")
 
 # (선택) 캐시로 멱등성/레이트리밋
 CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# 여러 프로세스/서버가 캐시를 공유해야 하면 CACHE_REDIS_URL 을 설정한다. (redis 패키지 필요)
+if os.getenv("CACHE_REDIS_URL"):
+    CACHES["shared"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_REDIS_URL"),
+    }
+
+# 메일 열람 시 읽음 표시 write-behind 버퍼 (email_metadata/read_buffer.py)
+READ_BUFFER_ENABLED = os.getenv("READ_BUFFER_ENABLED", "True") == "True"
+READ_BUFFER_FLUSH_INTERVAL = float(os.getenv("READ_BUFFER_FLUSH_INTERVAL", 2.0))
+READ_BUFFER_MAX_PENDING = 500
+
+# 응답 압축 (utils/middleware.py). 이 크기(바이트) 미만의 응답은 압축하지 않는다
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", 1024))
+RESPONSE_COMPRESSION_GZIP_LEVEL = 6
+RESPONSE_COMPRESSION_BROTLI_QUALITY = 5
+
+# 메일 목록 응답 캐시 (email_metadata/cache.py). 사용할 CACHES 별칭과 항목 유지 시간(초)
+EMAIL_LIST_CACHE_ALIAS = os.getenv("EMAIL_LIST_CACHE_ALIAS", "shared" if "shared" in CACHES else "default")
+EMAIL_LIST_CACHE_TIMEOUT = int(os.getenv("EMAIL_LIST_CACHE_TIMEOUT", 300))
 
 
 # ####################################################################
@@ -203,3 +229,44 @@ if CLERK_TURN_OFF:
 if S3_TURN_OFF:
     # 2. 파일 저장을 S3 대신 로컬 파일 시스템으로 변경
     DEFAULT_FILE_STORAGE = "django.core.files.storage.FileSystemStorage"
+
+# LLM 스팸 분류 결과 캐시 (email_content/service/classification_cache.py). 유지 기간(일)과 최대 항목 수(LRU)
+CLASSIFICATION_CACHE_TTL_DAYS = int(os.getenv("CLASSIFICATION_CACHE_TTL_DAYS", 30))
+CLASSIFICATION_CACHE_MAX_ENTRIES = int(os.getenv("CLASSIFICATION_CACHE_MAX_ENTRIES", 200000))
+
+# 메일 요약 공유 캐시 (email_content/service/summary_cache.py). 유지 기간(일)과 최대 항목 수(LRU)
+SUMMARY_CACHE_TTL_DAYS = int(os.getenv("SUMMARY_CACHE_TTL_DAYS", 90))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", 100000))
+# 같은 내용의 요약이 이미 만들어지는 중일 때 기다리는 최대 시간(초). LLM 요약 마감 시간보다 조금 길게 둔다.
+SUMMARY_WAIT_TIMEOUT = float(os.getenv("SUMMARY_WAIT_TIMEOUT", 35))
+
+# 동기화 후 미리 요약 (EmailAccount.prefetch_summaries 를 켠 계정만, email_content/service/summary_prefetch.py)
+SUMMARY_PREFETCH_ENABLED = os.getenv("SUMMARY_PREFETCH_ENABLED", "True") == "True"
+SUMMARY_PREFETCH_CONCURRENCY = int(os.getenv("SUMMARY_PREFETCH_CONCURRENCY", 2))
+SUMMARY_PREFETCH_DAILY_TOKENS = int(os.getenv("SUMMARY_PREFETCH_DAILY_TOKENS", 50000))
+SUMMARY_PREFETCH_MIN_CHARS = 500  # 이보다 짧은 본문은 미리 요약하지 않는다
+SUMMARY_PREFETCH_WINDOW_HOURS = 24  # 최근 이 시간 안에 받은 메일만
+SUMMARY_PREFETCH_BATCH_SIZE = 20  # 동기화 한 번에 미리 요약하는 최대 메일 수
+
+# 인용문/서명을 뺀 본문이 이보다 짧은 메일은 LLM 없이 추출 요약한다 (utils/textrank.py)
+SUMMARY_LOCAL_MAX_CHARS = int(os.getenv("SUMMARY_LOCAL_MAX_CHARS", 400))
+
+# 동기화 시 LLM 스팸 분류를 기다리지 않고 inbox 에 먼저 저장한 뒤, 백그라운드 작업자가 분류한다
+# (email_content/service/classification_worker.py). 작업자 스레드를 끄면 classify_pending 명령으로 처리한다.
+CLASSIFICATION_DEFER_LLM = os.getenv("CLASSIFICATION_DEFER_LLM", "True") == "True"
+CLASSIFICATION_WORKER_ENABLED = os.getenv("CLASSIFICATION_WORKER_ENABLED", "True") == "True"
+CLASSIFICATION_WORKER_INTERVAL = float(os.getenv("CLASSIFICATION_WORKER_INTERVAL", 10.0))
+CLASSIFICATION_WORKER_BATCH_SIZE = 100
+# LLM 분류에 실패한 메일은 CLASSIFICATION_RETRY_DELAY 초 뒤부터 실패할 때마다 두 배 간격으로 다시 시도하고,
+# CLASSIFICATION_MAX_ATTEMPTS 번 실패하면 포기하고 inbox 에 둔다. (계속 실패하는 메일이 대기열 앞을 막지 않도록)
+CLASSIFICATION_RETRY_DELAY = float(os.getenv("CLASSIFICATION_RETRY_DELAY", 60.0))
+CLASSIFICATION_MAX_ATTEMPTS = int(os.getenv("CLASSIFICATION_MAX_ATTEMPTS", 6))
+
+# 프로필 변경 시 재분류 작업 (email_content/service/reclassification.py).
+# 최근 며칠치 메일을 대상으로, 한 번에 몇 통씩, 청크 사이에 최소 몇 초를 쉬며 진행할지
+RECLASSIFY_WINDOW_DAYS = int(os.getenv("RECLASSIFY_WINDOW_DAYS", 90))
+RECLASSIFY_CHUNK_SIZE = 50
+RECLASSIFY_CHUNK_INTERVAL = float(os.getenv("RECLASSIFY_CHUNK_INTERVAL", 2.0))
+# 같은 위치에서 분류에 실패하면 청크 간격을 두 배씩 늘리며 다시 시도하고, 이 횟수만큼 실패하면
+# 앞의 실패한 메일을 건너뛴다. (청크 전체가 실패하면 LLM 장애로 보고 작업을 실패 처리)
+RECLASSIFY_MAX_ATTEMPTS = int(os.getenv("RECLASSIFY_MAX_ATTEMPTS", 8))
@@ -0,0 +1,42 @@
+import os
+
+import django
+import pytest
+
+# pytest 공용 설정. 순수 함수 테스트는 Django 없이도 돌지만, DB 가 필요한 테스트는 db fixture 를 쓴다.
+#   - 외부 서비스(Clerk, S3)와 백그라운드 작업자(분류/미리 요약/읽음 버퍼)는 끈다.
+#   - 테스트 DB 는 처음 db fixture 를 쓸 때 한 번 만들고(SQLite 메모리), 테스트가 끝날 때마다 비운다.
+#     작업자 코드가 다른 스레드에서 DB 를 쓰므로 트랜잭션 롤백 대신 flush 로 비운다.
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("FERNET_KEY", "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=")
+os.environ.setdefault("CLERK_TURN_OFF", "True")
+os.environ.setdefault("S3_TURN_OFF", "True")
+os.environ.setdefault("CLASSIFICATION_WORKER_ENABLED", "False")
+os.environ.setdefault("SUMMARY_PREFETCH_ENABLED", "False")
+os.environ.setdefault("READ_BUFFER_ENABLED", "False")
+django.setup()
+
+
+@pytest.fixture(scope="session")
+def django_test_db():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    yield
+    connection.creation.destroy_test_db(old_name, verbosity=0)
+    teardown_test_environment()
+
+
+@pytest.fixture
+def db(django_test_db):
+    from django.core.cache import caches
+    from django.core.management import call_command
+
+    yield
+    call_command("flush", interactive=False, verbosity=0)
+    for cache in caches.all():
+        cache.clear()
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Contact
+from utils.sparse_fields import SparseFieldsMixin
 
 
-class ContactSerializer(serializers.ModelSerializer):
+class ContactSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     Contact 모델을 위한 Serializer
     - 목록 조회, 생성, 수정에 사용됩니다.
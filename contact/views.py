@@ -12,12 +12,15 @@ from drf_spectacular.utils import (
 from .models import Contact
 from .serializers import ContactSerializer
 from email_account.models import EmailAccount
+from utils.projection import ProjectionListMixin
+from utils.sparse_fields import SPARSE_FIELD_PARAMETERS
 
 
 @extend_schema_view(
     get=extend_schema(
         summary="즐겨찾기 주소록 목록 조회",
         description="특정 이메일 계정(`account_id`)에 등록된 즐겨찾기 주소 목록을 조회합니다.",
+        parameters=SPARSE_FIELD_PARAMETERS,
         responses=ContactSerializer(many=True),
         examples=[
             OpenApiExample(
@@ -48,7 +51,7 @@ from email_account.models import EmailAccount
         ],
     ),
 )
-class ContactListCreateView(generics.ListCreateAPIView):
+class ContactListCreateView(ProjectionListMixin, generics.ListCreateAPIView):
     """
     GET: 특정 계정의 주소록 목록 조회
     POST: 특정 계정에 새 주소 추가
@@ -66,6 +69,10 @@ class ContactListCreateView(generics.ListCreateAPIView):
         """소유권이 확인된 계정의 주소록만 반환합니다."""
         return Contact.objects.filter(account=self.account)
 
+    def project_queryset(self, queryset):
+        # ContactSerializer 와 같은 형식
+        return queryset.values("id", "address")
+
     def create(self, request, *args, **kwargs):
         address = request.data.get("address")
 
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailaccount",
+            name="filter_rules",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="로컬 스팸 점수 규칙 (spam_threshold, factors). 형식은 utils/spam_rules.py 참고",
+            ),
+        ),
+    ]
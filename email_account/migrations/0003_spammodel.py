@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0002_emailaccount_filter_rules"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpamModel",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("n_features", models.PositiveIntegerField(default=262144)),
+                ("spam_docs", models.PositiveIntegerField(default=0)),
+                ("ham_docs", models.PositiveIntegerField(default=0)),
+                ("counts", models.BinaryField(default=b"", help_text="zlib 압축된 클래스별 토큰 수 배열")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="spam_model",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+        ),
+    ]
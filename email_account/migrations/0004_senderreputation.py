@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0003_spammodel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SenderReputation",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=255)),
+                ("spam_weight", models.PositiveIntegerField(default=0)),
+                ("ham_weight", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sender_reputations",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("account", "key"), name="uniq_sender_reputation_per_account")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0004_senderreputation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailaccount",
+            name="prefetch_summaries",
+            field=models.BooleanField(
+                default=False,
+                help_text="동기화 후 안 읽은 받은편지함 메일을 미리 요약할지 여부 (하루 토큰 예산 안에서)",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0005_emailaccount_prefetch_summaries"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="senderreputation",
+            name="llm_ham_weight",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="senderreputation",
+            name="llm_spam_weight",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from user.models import User
 from email_account.utils import fernet
 from cryptography.fernet import InvalidToken
+from utils.spam_bayes import N_FEATURES, HashedNaiveBayes
 
 # 각 이메일 어카운트 연동 시 프로필 설정해서 DB에 저장하는 view 필요.
 
@@ -20,6 +21,14 @@ class EmailAccount(models.Model):
     interests = models.JSONField(
         null=True, blank=True, default=list, help_text="사용자 관심사 목록 (예: ['기술', '스포츠'])"
     )
+    prefetch_summaries = models.BooleanField(
+        default=False, help_text="동기화 후 안 읽은 받은편지함 메일을 미리 요약할지 여부 (하루 토큰 예산 안에서)"
+    )
+    filter_rules = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="로컬 스팸 점수 규칙 (spam_threshold, factors). 형식은 utils/spam_rules.py 참고",
+    )
 
     last_synced = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -56,3 +65,42 @@ class SpamedMail(models.Model):
         constraints = [
             models.UniqueConstraint(fields=["account", "address"], name="uniq_spamed_email_per_account"),
         ]
+
+
+# 계정별 발신 키(List-Id/발신 도메인/주소) 평판. 키 형식과 판정 기준은 utils/sender_reputation.py 참고.
+# SpamedMail 이 사용자가 직접 등록한 차단 목록이라면, 이 표는 분류 결과와 사용자의 폴더 이동으로 쌓이는 값이다.
+# LLM 판정(llm/cache/near_duplicate)으로 쌓인 가중치는 계정 프로필에 따라 달라지므로 llm_* 에 따로 두고,
+# 프로필이 바뀌어 재분류를 시작할 때 0으로 되돌린다. 판정에는 두 가중치의 합을 쓴다.
+# 갱신은 email_content/service/sender_reputation.py 를 통해서만 한다.
+class SenderReputation(models.Model):
+    account = models.ForeignKey(EmailAccount, on_delete=models.CASCADE, related_name="sender_reputations")
+    key = models.CharField(max_length=255)
+    spam_weight = models.PositiveIntegerField(default=0)
+    ham_weight = models.PositiveIntegerField(default=0)
+    llm_spam_weight = models.PositiveIntegerField(default=0)
+    llm_ham_weight = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "key"], name="uniq_sender_reputation_per_account"),
+        ]
+
+
+# 계정별 로컬 스팸 모델 (utils/spam_bayes.py 의 HashedNaiveBayes 상태).
+# 사용자의 스팸함 이동으로 학습되며, 갱신은 email_content/service/spam_model.py 를 통해서만 한다.
+class SpamModel(models.Model):
+    account = models.OneToOneField(EmailAccount, on_delete=models.CASCADE, related_name="spam_model")
+    n_features = models.PositiveIntegerField(default=N_FEATURES)
+    spam_docs = models.PositiveIntegerField(default=0)
+    ham_docs = models.PositiveIntegerField(default=0)
+    counts = models.BinaryField(default=b"", help_text="zlib 압축된 클래스별 토큰 수 배열")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def classifier(self):
+        return HashedNaiveBayes.from_bytes(self.counts, (self.ham_docs, self.spam_docs), self.n_features)
+
+    def store(self, classifier):
+        self.counts = classifier.to_bytes()
+        self.ham_docs, self.spam_docs = (int(n) for n in classifier.docs)
+        self.save()
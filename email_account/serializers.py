@@ -1,13 +1,20 @@
 from rest_framework import serializers
 from .models import EmailAccount
+from email_content.models import ReclassificationJob
 from email_content.utils import get_imap_config
+from email_metadata.read_buffer import pending_unread_deltas
+from email_metadata.services import folder_counts
+from utils.spam_rules import DEFAULT_HAM_THRESHOLD, DEFAULT_SPAM_THRESHOLD, FACTOR_TYPES
+from utils.sparse_fields import SparseFieldsMixin
 
 
-class EmailAccountSerializer(serializers.ModelSerializer):
+class EmailAccountSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """
     EmailAccount 모델의 목록 조회를 위한 Serializer
     """
 
+    folder_counts = serializers.SerializerMethodField()
+
     class Meta:
         model = EmailAccount
         fields = [
@@ -19,8 +26,25 @@ class EmailAccountSerializer(serializers.ModelSerializer):
             "job",
             "usage",
             "interests",
+            "folder_counts",
         ]
 
+    def get_folder_counts(self, obj) -> dict:
+        """폴더별 전체/안읽음 메일 수. 뷰에서 folder_counters 를 prefetch 해두면 추가 쿼리가 없습니다."""
+        if "_pending_reads" not in self.context:
+            self.context["_pending_reads"] = pending_unread_deltas(obj.user_id)[0]
+        pending = {folder: n for (acc, folder), n in self.context["_pending_reads"].items() if acc == obj.id}
+        rows = [(c.folder, c.total_count, c.unread_count) for c in obj.folder_counters.all()]
+        return folder_counts(rows, pending)
+
+
+class FolderCountsSerializer(serializers.Serializer):
+    """계정별 폴더 카운트 응답을 위한 Serializer (스키마 문서용)"""
+
+    account_id = serializers.IntegerField()
+    address = serializers.EmailField()
+    folder_counts = serializers.DictField(child=serializers.DictField(child=serializers.IntegerField()))
+
 
 class EmailAccountCreateSerializer(serializers.ModelSerializer):
     """
@@ -69,5 +93,56 @@ class EmailAccountProfileSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = EmailAccount
-        fields = ["job", "usage", "interests"]
+        fields = ["job", "usage", "interests", "prefetch_summaries"]
         extra_kwargs = {"interests": {"error_messages": {"invalid": "This field must be a list."}}}
+
+
+class FilterRuleFactorSerializer(serializers.Serializer):
+    """로컬 스팸 규칙의 개별 요소 (utils/spam_rules.py)"""
+
+    id = serializers.CharField(max_length=100)
+    type = serializers.ChoiceField(choices=FACTOR_TYPES)
+    content = serializers.CharField(max_length=500)
+    weight = serializers.FloatField(min_value=-100, max_value=100)
+
+
+class FilterRulesSerializer(serializers.Serializer):
+    """
+    EmailAccount.filter_rules 조회/수정을 위한 Serializer
+    """
+
+    spam_threshold = serializers.FloatField(default=DEFAULT_SPAM_THRESHOLD)
+    ham_threshold = serializers.FloatField(default=DEFAULT_HAM_THRESHOLD)
+    factors = FilterRuleFactorSerializer(many=True, max_length=2000)
+
+    def validate(self, attrs):
+        if attrs["ham_threshold"] >= attrs["spam_threshold"]:
+            raise serializers.ValidationError({"ham_threshold": "ham_threshold 는 spam_threshold 보다 작아야 합니다."})
+        return attrs
+
+    def validate_factors(self, factors):
+        ids = [factor["id"] for factor in factors]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("factor id 가 중복되었습니다.")
+        return factors
+
+
+class ReclassificationJobSerializer(serializers.ModelSerializer):
+    """프로필 변경 후 재분류 작업의 진행 상황"""
+
+    class Meta:
+        model = ReclassificationJob
+        fields = [
+            "id",
+            "status",
+            "total",
+            "processed",
+            "moved_to_spam",
+            "moved_to_inbox",
+            "skipped",
+            "error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
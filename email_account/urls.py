@@ -4,11 +4,15 @@ from .views import (
     EmailAccountListCreateView,
     EmailAccountDestroyView,
     EmailAccountProfileUpdateView,
+    EmailAccountFolderCountsView,
+    EmailAccountFilterRulesView,
+    EmailAccountReclassificationView,
 )
 
 app_name = "email_accounts"
 
 urlpatterns = [
+    path("counters/", EmailAccountFolderCountsView.as_view(), name="메일계정 폴더별 메일 수 조회"),
     path("<int:pk>/sync/", EmailSyncView.as_view(), name="메일 최신 동기화"),
     # 이메일 계정 CRUD
     path("", EmailAccountListCreateView.as_view(), name="메일계정 연동 및 조회"),
@@ -18,4 +22,10 @@ urlpatterns = [
         EmailAccountProfileUpdateView.as_view(),
         name="메일계정 프로필 수정",
     ),
+    path("<int:account_id>/filter-rules/", EmailAccountFilterRulesView.as_view(), name="메일계정 스팸 규칙"),
+    path(
+        "<int:account_id>/reclassification/",
+        EmailAccountReclassificationView.as_view(),
+        name="메일계정 재분류",
+    ),
 ]
@@ -10,12 +10,22 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status, generics
 from .models import EmailAccount
 from email_content.service.imap import fetch_and_store_emails
+from email_metadata.cache import invalidate_accounts
+from email_metadata.read_buffer import pending_unread_deltas
+from email_metadata.services import folder_counts
+from email_content.service import classification_cache, reclassification
+from email_content.service.classification_worker import classification_worker
+from utils.sparse_fields import SPARSE_FIELD_PARAMETERS
+from utils.spam_rules import DEFAULT_HAM_THRESHOLD, DEFAULT_SPAM_THRESHOLD, invalidate_compiled_rules
 
 ####### 이메일 계정 연동 관련 임포트 #########
 from .serializers import (
     EmailAccountSerializer,
     EmailAccountCreateSerializer,
     EmailAccountProfileSerializer,
+    FolderCountsSerializer,
+    FilterRulesSerializer,
+    ReclassificationJobSerializer,
 )
 
 ####### 이메일 계정 연동 관련 임포트 #########
@@ -109,6 +119,7 @@ class EmailSyncView(APIView):
     get=extend_schema(
         summary="연동된 메일 계정 목록 조회",
         description="현재 로그인된 사용자가 연동한 모든 이메일 계정 목록을 조회합니다.",
+        parameters=SPARSE_FIELD_PARAMETERS,
         responses=EmailAccountSerializer(many=True),
         examples=[
             OpenApiExample(
@@ -173,7 +184,7 @@ class EmailAccountListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """현재 로그인된 사용자의 계정만 조회합니다."""
-        return EmailAccount.objects.filter(user=self.request.user)
+        return EmailAccount.objects.filter(user=self.request.user).prefetch_related("folder_counters")
 
     def get_serializer_class(self):
         """요청 메서드에 따라 다른 Serializer를 반환합니다."""
@@ -213,11 +224,18 @@ class EmailAccountDestroyView(generics.DestroyAPIView):
         """현재 로그인된 사용자의 계정 내에서만 삭제를 허용합니다."""
         return EmailAccount.objects.filter(user=self.request.user)
 
+    def perform_destroy(self, instance):
+        # 삭제된 계정의 메일이 캐시된 목록에 남지 않도록 먼저 무효화한다
+        invalidate_accounts([instance.id])
+        instance.delete()
+
 
 @extend_schema_view(
     patch=extend_schema(
         summary="메일 계정 프로필 설정/수정",
-        description="지정된 이메일 계정의 프로필을 설정하거나 수정합니다. `PATCH` 메서드이므로, **변경하려는 필드만** 요청 바디에 담아 보낼 수 있습니다. 해당 프로필은 이후 스팸 필터링에 사용됩니다.",
+        description="""지정된 이메일 계정의 프로필을 설정하거나 수정합니다. `PATCH` 메서드이므로, **변경하려는 필드만** 요청 바디에 담아 보낼 수 있습니다. 해당 프로필은 이후 스팸 필터링에 사용됩니다.
+        프로필이 바뀌면 최근 메일을 새 프로필로 다시 분류하는 작업이 백그라운드에서 시작됩니다. (`/reclassification/` 에서 진행 상황 조회)
+        `prefetch_summaries` 를 켜면 동기화 후 안 읽은 받은편지함 메일을 하루 토큰 예산 안에서 미리 요약해 둡니다.""",
         request=EmailAccountProfileSerializer,
         responses={200: EmailAccountProfileSerializer, 400: OpenApiTypes.OBJECT},
         examples=[
@@ -227,6 +245,7 @@ class EmailAccountDestroyView(generics.DestroyAPIView):
                     "job": "데이터 분석가",
                     "usage": "학교용",
                     "interests": ["금융", "부동산"],
+                    "prefetch_summaries": True,
                 },
                 response_only=True,
             ),
@@ -253,3 +272,199 @@ class EmailAccountProfileUpdateView(generics.UpdateAPIView):
     def get_queryset(self):
         """현재 로그인된 사용자의 계정 내에서만 수정을 허용합니다."""
         return EmailAccount.objects.filter(user=self.request.user)
+
+    def perform_update(self, serializer):
+        before = classification_cache.profile_fingerprint(serializer.instance)
+        account = serializer.save()
+        # 캐시 키에 프로필 지문이 들어 있으므로 이전 프로필 기준으로 캐시된 LLM 분류 결과는 자연히 쓰이지 않는다.
+        # (다른 계정과 공유하는 항목일 수 있으므로 지우지 않고 TTL/LRU 로 만료되게 둔다)
+        if classification_cache.profile_fingerprint(account) != before:
+            # 최근 메일을 새 프로필 기준으로 다시 분류한다 (classification_worker 가 청크 단위로 진행)
+            reclassification.start_job(account)
+            classification_worker.wake()
+
+
+@extend_schema(
+    summary="계정/폴더별 메일 수 조회",
+    description="""로그인된 사용자의 모든 이메일 계정에 대해 폴더별 전체 메일 수와 안읽은 메일 수를 한 번에 조회합니다.
+    매 요청마다 메일을 세지 않고 미리 유지되는 카운터를 읽으므로, 배지 갱신용으로 자주 호출해도 됩니다.
+    보낸 편지함(sent)은 폴더가 아니라 보낸 사람으로 구하는 목록이므로 포함하지 않습니다.""",
+    responses={200: FolderCountsSerializer(many=True)},
+    examples=[
+        OpenApiExample(
+            "조회 성공",
+            value=[
+                {
+                    "account_id": 1,
+                    "address": "user1@example.com",
+                    "folder_counts": {
+                        "inbox": {"total": 120, "unread": 7},
+                        "spam": {"total": 14, "unread": 14},
+                        "starred": {"total": 3, "unread": 0},
+                        "trash": {"total": 2, "unread": 0},
+                    },
+                }
+            ],
+            response_only=True,
+        )
+    ],
+)
+class EmailAccountFolderCountsView(APIView):
+    """로그인된 사용자의 계정/폴더별 메일 수를 하나의 쿼리로 조회합니다."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        rows = EmailAccount.objects.filter(user=request.user).values_list(
+            "id",
+            "address",
+            "folder_counters__folder",
+            "folder_counters__total_count",
+            "folder_counters__unread_count",
+        )
+
+        accounts = {}
+        for account_id, address, folder, total, unread in rows.order_by("id"):
+            entry = accounts.setdefault(account_id, {"address": address, "rows": []})
+            if folder is not None:
+                entry["rows"].append((folder, total, unread))
+
+        pending, _threads = pending_unread_deltas(request.user.pk)
+        data = [
+            {
+                "account_id": account_id,
+                "address": entry["address"],
+                "folder_counts": folder_counts(
+                    entry["rows"], {folder: n for (acc, folder), n in pending.items() if acc == account_id}
+                ),
+            }
+            for account_id, entry in accounts.items()
+        ]
+        return Response(data, status=status.HTTP_200_OK)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="로컬 스팸 규칙 조회",
+        description="계정의 로컬 스팸 점수 규칙(`filter_rules`)을 조회합니다. 규칙이 없으면 빈 factors 를 반환합니다.",
+        responses={200: FilterRulesSerializer, 404: OpenApiTypes.OBJECT},
+    ),
+    put=extend_schema(
+        summary="로컬 스팸 규칙 저장",
+        description="""계정의 로컬 스팸 점수 규칙을 통째로 교체합니다.
+        메일 동기화 시 LLM 분류 전에 이 규칙으로 점수를 매겨, `spam_threshold` 이상인 메일은 바로 스팸으로,
+        `ham_threshold` 이하인 메일은 바로 받은편지함으로 분류합니다. 그 사이의 메일만 LLM 으로 분류합니다.
+        - `keyword`: 제목/본문 부분 문자열 (대소문자 무시)
+        - `sender`: 보낸 사람 주소, 도메인, 또는 와일드카드 패턴 (예: `*@promo.example.com`)
+        - `header`: `List-Unsubscribe` (존재 여부) 또는 `Precedence: bulk` (값 포함 여부)
+        - `weight` 가 음수면 정상 메일 쪽 신호입니다.""",
+        request=FilterRulesSerializer,
+        responses={200: FilterRulesSerializer, 400: OpenApiTypes.OBJECT, 404: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                "규칙 예시",
+                value={
+                    "spam_threshold": 5.0,
+                    "ham_threshold": -1.0,
+                    "factors": [
+                        {"id": "kw-free", "type": "keyword", "content": "무료 체험", "weight": 2.5},
+                        {"id": "promo", "type": "sender", "content": "*@promo.example.com", "weight": 4},
+                        {"id": "bulk", "type": "header", "content": "Precedence: bulk", "weight": 1.5},
+                    ],
+                },
+            )
+        ],
+    ),
+)
+class EmailAccountFilterRulesView(generics.GenericAPIView):
+    """지정된 이메일 계정의 로컬 스팸 규칙을 조회/수정합니다."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = FilterRulesSerializer
+    lookup_field = "id"
+    lookup_url_kwarg = "account_id"
+
+    def get_queryset(self):
+        return EmailAccount.objects.filter(user=self.request.user)
+
+    def get(self, request, account_id):
+        account = self.get_object()
+        rules = {
+            "spam_threshold": DEFAULT_SPAM_THRESHOLD,
+            "ham_threshold": DEFAULT_HAM_THRESHOLD,
+            "factors": [],
+            **(account.filter_rules or {}),
+        }
+        return Response(FilterRulesSerializer(rules).data)
+
+    def put(self, request, account_id):
+        account = self.get_object()
+        serializer = FilterRulesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        account.filter_rules = serializer.data
+        account.save(update_fields=["filter_rules"])
+        # 컴파일된 규칙은 지문으로 갱신되지만, 다른 계정에 밀려나기 전까지 옛 항목이 남지 않도록 바로 비운다
+        invalidate_compiled_rules(account.id)
+        return Response(serializer.data)
+
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="재분류 작업 진행 상황 조회",
+        description="""계정의 가장 최근 재분류 작업의 진행 상황을 조회합니다. 작업이 없으면 404 를 반환합니다.
+        - `status`: `pending`(대기) / `running`(진행 중) / `completed`(완료) / `cancelled`(새 작업으로 대체됨) / `failed`(실패)
+        - `processed` / `total`: 처리한 메일 수 / 작업 시작 시점의 대상 메일 수
+        - `skipped`: 여러 번 분류에 실패하여 건너뛴 메일 수 (processed 에 포함되지 않음)
+        - `error`: LLM 장애 등으로 재시도를 기다리는 중이거나 실패(`failed`)한 이유""",
+        responses={200: ReclassificationJobSerializer, 404: OpenApiTypes.OBJECT},
+        examples=[
+            OpenApiExample(
+                "진행 중",
+                value={
+                    "id": 3,
+                    "status": "running",
+                    "total": 420,
+                    "processed": 150,
+                    "moved_to_spam": 12,
+                    "moved_to_inbox": 2,
+                    "skipped": 0,
+                    "error": "",
+                    "created_at": "2025-10-01T09:00:00Z",
+                    "updated_at": "2025-10-01T09:00:08Z",
+                    "finished_at": None,
+                },
+                response_only=True,
+            )
+        ],
+    ),
+    post=extend_schema(
+        summary="재분류 작업 시작",
+        description="""계정의 최근 메일(받은편지함/스팸함)을 현재 프로필과 규칙으로 다시 분류하는 작업을 시작합니다.
+        진행 중인 작업이 있으면 취소하고 새로 시작합니다. 사용자가 직접 옮긴 메일은 건드리지 않습니다.""",
+        request=None,
+        responses={202: ReclassificationJobSerializer, 404: OpenApiTypes.OBJECT},
+    ),
+)
+class EmailAccountReclassificationView(generics.GenericAPIView):
+    """지정된 이메일 계정의 재분류 작업을 시작하거나 진행 상황을 조회합니다."""
+
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReclassificationJobSerializer
+    lookup_field = "id"
+    lookup_url_kwarg = "account_id"
+
+    def get_queryset(self):
+        return EmailAccount.objects.filter(user=self.request.user)
+
+    def get(self, request, account_id):
+        account = self.get_object()
+        job = account.reclassification_jobs.order_by("-id").first()
+        if job is None:
+            return Response({"detail": "재분류 작업이 없습니다."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ReclassificationJobSerializer(job).data)
+
+    def post(self, request, account_id):
+        account = self.get_object()
+        job = reclassification.start_job(account)
+        classification_worker.wake()
+        return Response(ReclassificationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
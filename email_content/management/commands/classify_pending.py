@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from email_content.service.classification_worker import classify_pending
+
+
+class Command(BaseCommand):
+    help = "동기화 때 LLM 분류를 미뤄 둔 메일(classification_pending)을 분류하고, 스팸으로 판정된 메일을 스팸함으로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None, help="한 번에 분류할 메일 수")
+        parser.add_argument("--loop", action="store_true", help="종료하지 않고 주기적으로 계속 처리")
+        parser.add_argument(
+            "--interval", type=float, default=10.0, help="--loop 사용 시 대기 메일이 없을 때 쉬는 시간(초)"
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = classify_pending(options["batch_size"])
+            total += processed
+            if processed:
+                self.stdout.write(f"{processed}건 분류 (누적 {total}건)")
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"분류 완료 ({total}건)"))
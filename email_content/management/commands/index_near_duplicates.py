@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from email_content.models import EmailContent
+from email_content.service import near_duplicates
+from utils import minhash
+
+
+class Command(BaseCommand):
+    help = "MinHash 서명이 없는 기존 메일의 서명을 계산하고 유사 메일 색인(MinHashBucket)에 넣습니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="한 번에 처리할 메일 수")
+
+    def handle(self, *args, **options):
+        last_id, indexed = 0, 0
+        while True:
+            contents = list(
+                EmailContent.objects.filter(id__gt=last_id, minhash__isnull=True)
+                .only("id", "subject", "text_body", "html_body")
+                .order_by("id")[: options["batch_size"]]
+            )
+            if not contents:
+                break
+            last_id = contents[-1].id
+            texts = [near_duplicates.minhash_text(c.subject, c.text_body, c.html_body) for c in contents]
+            for content, signature in zip(contents, minhash.signatures(texts)):
+                content.minhash = minhash.to_bytes(signature) if signature is not None else None
+            signed = [content for content in contents if content.minhash]
+            EmailContent.objects.bulk_update(signed, ["minhash"])
+            near_duplicates.index(signed)
+            indexed += len(signed)
+            self.stdout.write(f"{last_id} 번까지 확인, {indexed}건 색인")
+        self.stdout.write(self.style.SUCCESS(f"색인 완료 ({indexed}건)"))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from email_account.models import EmailAccount
+from email_content.service.reclassification import run_job, start_job
+
+
+class Command(BaseCommand):
+    help = "계정의 최근 메일을 현재 프로필/규칙으로 다시 분류하고, 판정이 바뀐 메일을 받은편지함/스팸함으로 옮깁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, required=True, help="재분류할 메일 계정 id")
+
+    def handle(self, *args, **options):
+        account = EmailAccount.objects.filter(id=options["account"]).first()
+        if account is None:
+            raise CommandError(f"메일 계정 {options['account']} 이 없습니다.")
+
+        job = start_job(account)
+        self.stdout.write(f"재분류 시작: 대상 {job.total}건")
+        job = run_job(
+            job,
+            on_progress=lambda job: self.stdout.write(
+                f"{job.processed}/{job.total}건 처리 (스팸함으로 {job.moved_to_spam}건, 받은편지함으로 {job.moved_to_inbox}건)"
+                + (f" - {job.error}" if job.error else "")
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"재분류 {job.status} ({job.processed}건 처리, 스팸함으로 {job.moved_to_spam}건, "
+                f"받은편지함으로 {job.moved_to_inbox}건)"
+            )
+        )
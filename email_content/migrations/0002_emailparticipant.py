@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from email_content.utils import parse_participants
+
+
+def backfill_participants(apps, schema_editor):
+    """기존에 저장된 메일의 주소 헤더로 EmailParticipant를 채운다."""
+    EmailContent = apps.get_model("email_content", "EmailContent")
+    EmailParticipant = apps.get_model("email_content", "EmailParticipant")
+
+    batch = []
+    fields = ("id", "from_header", "to_header", "cc_header", "bcc_header")
+    for row in EmailContent.objects.values(*fields).iterator(chunk_size=500):
+        for role in ("from", "to", "cc", "bcc"):
+            for display_name, address in parse_participants(row[f"{role}_header"]):
+                batch.append(
+                    EmailParticipant(email_id=row["id"], role=role, address=address, display_name=display_name)
+                )
+        if len(batch) >= 1000:
+            EmailParticipant.objects.bulk_create(batch)
+            batch = []
+    EmailParticipant.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailParticipant",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[("from", "보낸 사람"), ("to", "받는 사람"), ("cc", "참조"), ("bcc", "숨은 참조")],
+                        max_length=4,
+                    ),
+                ),
+                ("address", models.CharField(help_text="소문자로 정규화된 이메일 주소", max_length=255)),
+                ("display_name", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "email",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="participants",
+                        to="email_content.emailcontent",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["address", "role"], name="participant_address_role_idx")],
+            },
+        ),
+        migrations.RunPython(backfill_participants, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0002_emailparticipant"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailcontent",
+            name="headers",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0003_emailcontent_headers"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="emailcontent",
+            name="has_attachment",
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
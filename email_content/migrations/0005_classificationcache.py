@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0003_spammodel"),
+        ("email_content", "0004_alter_emailcontent_has_attachment"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClassificationCache",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("result", models.CharField(max_length=10)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("last_used_at", models.DateTimeField(auto_now=True, db_index=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="classification_cache",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+        ),
+    ]
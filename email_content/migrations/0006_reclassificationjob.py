@@ -0,0 +1,60 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0003_spammodel"),
+        ("email_content", "0005_classificationcache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReclassificationJob",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "대기"),
+                            ("running", "진행 중"),
+                            ("completed", "완료"),
+                            ("cancelled", "취소"),
+                            ("failed", "실패"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("since", models.DateTimeField(help_text="이 시각 이후 수신된 메일만 다시 분류한다")),
+                (
+                    "cursor",
+                    models.BigIntegerField(
+                        blank=True, help_text="마지막으로 처리한 EmailMetadata id (id 내림차순 진행)", null=True
+                    ),
+                ),
+                ("total", models.IntegerField(default=0)),
+                ("processed", models.IntegerField(default=0)),
+                ("moved_to_spam", models.IntegerField(default=0)),
+                ("moved_to_inbox", models.IntegerField(default=0)),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reclassification_jobs",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["account", "-created_at"], name="reclassify_account_created_idx")],
+            },
+        ),
+    ]
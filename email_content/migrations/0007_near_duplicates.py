@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0006_reclassificationjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailcontent",
+            name="duplicate_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="near_duplicates",
+                to="email_content.emailcontent",
+            ),
+        ),
+        migrations.AddField(
+            model_name="emailcontent",
+            name="minhash",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="MinHashBucket",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("bucket", models.BigIntegerField(db_index=True)),
+                (
+                    "email",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="minhash_buckets",
+                        to="email_content.emailcontent",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0007_near_duplicates"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryCache",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("summary", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("last_used_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0008_summarycache"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryLease",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("owner", models.CharField(max_length=32)),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0005_emailaccount_prefetch_summaries"),
+        ("email_content", "0009_summarylease"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SummaryBudget",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                ("tokens_used", models.PositiveIntegerField(default=0)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summary_budgets",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("account", "day"), name="uniq_summary_budget_per_day")],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0010_summarybudget"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reclassificationjob",
+            name="failures",
+            field=models.IntegerField(default=0, help_text="cursor 를 옮기지 못하고 연속으로 분류에 실패한 횟수"),
+        ),
+        migrations.AddField(
+            model_name="reclassificationjob",
+            name="skipped",
+            field=models.IntegerField(default=0, help_text="여러 번 분류하지 못해 건너뛴 메일 수"),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:45
+
+from django.db import migrations
+
+
+def drop_duplicate_buckets(apps, schema_editor):
+    """유사 메일 색인에는 묶음의 대표만 남긴다. (duplicate_of 가 있는 메일의 버킷 삭제)"""
+    MinHashBucket = apps.get_model("email_content", "MinHashBucket")
+    MinHashBucket.objects.filter(email__duplicate_of__isnull=False).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0011_reclassificationjob_skipped_failures"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_buckets, migrations.RunPython.noop),
+    ]
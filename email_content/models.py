@@ -12,9 +12,146 @@ class EmailContent(models.Model):
     bcc_header = models.JSONField(null=True, blank=True)
     text_body = models.TextField(null=True, blank=True)
     html_body = models.TextField(null=True, blank=True)
-    has_attachment = models.BooleanField(default=False)
+    has_attachment = models.BooleanField(default=False, db_index=True)
     date = models.DateTimeField(null=True, blank=True)
+    # 스레딩 등 후처리에 필요한 원본 헤더 일부 (In-Reply-To, References 등)
+    headers = models.JSONField(default=dict, blank=True)
+    # 거의 같은 메일 찾기용 MinHash 서명 (utils/minhash.py, uint32 x 64 = 256바이트). 본문이 짧으면 없다.
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    # 먼저 들어온 거의 같은 메일 중 가장 오래된 것 (email_content/service/near_duplicates.py)
+    duplicate_of = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="near_duplicates"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.subject or "(No Subject)"
+
+
+# 보낸 사람/받는 사람 주소를 정규화해서 저장하는 테이블.
+# from_header, to_header 등은 원본 그대로 두고, 주소 기반 조회는 이 테이블의 인덱스를 사용한다.
+class EmailParticipant(models.Model):
+    ROLE_CHOICES = [
+        ("from", "보낸 사람"),
+        ("to", "받는 사람"),
+        ("cc", "참조"),
+        ("bcc", "숨은 참조"),
+    ]
+
+    email = models.ForeignKey(EmailContent, on_delete=models.CASCADE, related_name="participants")
+    role = models.CharField(max_length=4, choices=ROLE_CHOICES)
+    address = models.CharField(max_length=255, help_text="소문자로 정규화된 이메일 주소")
+    display_name = models.CharField(max_length=255, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            # "이 사람이 보낸 메일 전체" 같은 조회를 인덱스 탐색으로 처리하기 위함
+            models.Index(fields=["address", "role"], name="participant_address_role_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.role}: {self.address}"
+
+
+# MinHash 서명의 LSH 버킷 색인. 메일마다 구간(band) 수만큼 행이 있고, 버킷 값이 같은 메일이 유사 메일 후보가 된다.
+class MinHashBucket(models.Model):
+    email = models.ForeignKey(EmailContent, on_delete=models.CASCADE, related_name="minhash_buckets")
+    bucket = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"{self.email_id}: {self.bucket}"
+
+
+# LLM 스팸 분류 결과 캐시 (email_content/service/classification_cache.py).
+# 같은 뉴스레터가 여러 사용자에게 오거나 재동기화로 같은 메일을 다시 볼 때 LLM 을 다시 부르지 않기 위함이다.
+# key 는 메일 내용(정규화한 제목, 보낸 사람, 본문 digest)과 계정 프로필(job/usage/interests) 지문의 해시라서,
+# 프로필이 같은 다른 계정과도 결과를 공유한다. 프로필이 바뀌면 키가 달라지므로 예전 항목은 TTL/LRU 로 지워진다.
+# account 는 결과를 만든 계정으로, 계정을 삭제하면 그 계정의 메일로 만든 항목도 함께 지워진다. (CASCADE)
+class ClassificationCache(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    account = models.ForeignKey(
+        "email_account.EmailAccount", on_delete=models.CASCADE, related_name="classification_cache"
+    )
+    result = models.CharField(max_length=10)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]}: {self.result}"
+
+
+# 메일 요약 공유 캐시 (email_content/service/summary_cache.py).
+# key 는 정규화한 제목과 정리한 본문(인용문/서명 제외)의 해시라서, 연동된 두 계정이 같은 메일을 받거나
+# 여러 사용자가 같은 뉴스레터를 받아도 요약은 한 번만 만든다. EmailMetadata.shared_summary 가 이 행을 가리킨다.
+class SummaryCache(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.key[:12]}: {self.summary[:30]}"
+
+
+# 요약 생성 임대(lease). 여러 프로세스가 같은 내용(SummaryCache.key)의 요약을 동시에 만들지 않도록,
+# 행을 만든 프로세스만 LLM 을 부르고 나머지는 SummaryCache 에 결과가 생길 때까지 기다린다.
+# 프로세스가 죽어 남은 행은 expires_at 이 지나면 다른 프로세스가 가져간다.
+class SummaryLease(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    owner = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key[:12]}: {self.owner}"
+
+
+# 미리 요약(email_content/service/summary_prefetch.py)에 쓴 계정별 하루 토큰 수.
+# 사용자가 직접 요청한 요약은 세지 않는다.
+class SummaryBudget(models.Model):
+    account = models.ForeignKey("email_account.EmailAccount", on_delete=models.CASCADE, related_name="summary_budgets")
+    day = models.DateField()
+    tokens_used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "day"], name="uniq_summary_budget_per_day"),
+        ]
+
+
+# 계정 프로필(job/usage/interests)이 바뀐 뒤 최근 메일을 다시 분류하는 작업 (email_content/service/reclassification.py).
+# 작업자가 청크 단위로 처리하며 cursor(마지막으로 처리한 EmailMetadata id)를 저장하므로, 프로세스가 재시작되어도 이어서 진행한다.
+class ReclassificationJob(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "대기"),
+        ("running", "진행 중"),
+        ("completed", "완료"),
+        ("cancelled", "취소"),
+        ("failed", "실패"),
+    ]
+    ACTIVE_STATUSES = ("pending", "running")
+
+    account = models.ForeignKey(
+        "email_account.EmailAccount", on_delete=models.CASCADE, related_name="reclassification_jobs"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    since = models.DateTimeField(help_text="이 시각 이후 수신된 메일만 다시 분류한다")
+    cursor = models.BigIntegerField(
+        null=True, blank=True, help_text="마지막으로 처리한 EmailMetadata id (id 내림차순 진행)"
+    )
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    moved_to_spam = models.IntegerField(default=0)
+    moved_to_inbox = models.IntegerField(default=0)
+    skipped = models.IntegerField(default=0, help_text="여러 번 분류하지 못해 건너뛴 메일 수")
+    failures = models.IntegerField(default=0, help_text="cursor 를 옮기지 못하고 연속으로 분류에 실패한 횟수")
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["account", "-created_at"], name="reclassify_account_created_idx")]
+
+    def __str__(self):
+        return f"{self.account_id}: {self.status} ({self.processed}/{self.total})"
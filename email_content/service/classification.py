@@ -0,0 +1,233 @@
+import logging
+from collections import Counter
+from email.utils import parseaddr
+
+from contact.models import Contact
+from email_account.models import SpamedMail
+from email_metadata.models import ThreadKey
+from email_metadata.threads import parse_message_ids
+from email_content.service import classification_cache, near_duplicates, sender_reputation
+from email_content.service.spam_model import load_classifier
+from utils import metrics
+from utils.spam_filter import classify_emails_in_batch
+from utils.sender_reputation import group_by_key, is_group_key, sender_key
+from utils.spam_rules import get_compiled_rules, header_heuristics
+
+logger = logging.getLogger(__name__)
+
+# 수신 메일 스팸 분류 단계(cascade).
+# 싸고 확실한 단계부터 차례로 적용하고, 앞 단계에서 결정되지 않은 메일만 다음 단계로 넘긴다.
+#   1. blocklist    : SpamedMail 에 등록된 주소/도메인 → spam
+#   2. allowlist    : Contact 에 등록된 주소/도메인 → inbox
+#                     (From 은 위조할 수 있으므로 내 계정 주소는 넣지 않는다. 내 주소를 사칭한 스팸이 흔하다)
+#   3. conversation : 내 메일함에 있는 메일에 대한 답장(In-Reply-To/References) → inbox
+#   4. header       : 수신 서버가 스팸으로 표시(X-Spam-Flag) → spam
+#   5. local        : 로컬 규칙 점수 + 대량 발송 헤더 점수. spam_threshold 이상 spam, ham_threshold 이하 inbox
+#   6. reputation   : 지금까지의 분류 결과/사용자 이동으로 평판이 안정된 발신 키(List-Id/도메인/주소)의 메일
+#                     (sender_reputation.py. LLM 판정으로 쌓인 몫은 프로필이 바뀌면 지운다)
+#   7. bayes        : 사용자 폴더 이동으로 학습된 계정별 Naive Bayes 모델이 확신하는 메일 (spam_model.py)
+#   8. cache        : 같은 내용/같은 프로필로 이전에 LLM 이 분류한 결과 (classification_cache.py)
+#      near_duplicate : 추적 링크/이름만 다른 유사 메일(MinHash)을 같은 프로필로 LLM 이 분류한 결과 (near_duplicates.py)
+#   9. llm          : 그래도 애매한 메일만 LLM 으로 분류
+#                     같은 배치에 같은 메일링 리스트/대량 발송 도메인의 메일이 여럿이면 첫 메일(대표)만 보내고,
+#                     나머지는 대표의 판정을 따른다("group").
+#                     defer_llm=True 면 LLM 을 기다리지 않고 inbox 로 두며("deferred"),
+#                     classification_worker 가 나중에 다시 분류해 스팸함으로 옮긴다.
+# 단계별 처리 건수는 utils.metrics 의 "spam_cascade.<단계>" 카운터에 쌓인다.
+
+TIERS = (
+    "blocklist",
+    "allowlist",
+    "conversation",
+    "header",
+    "local_spam",
+    "local_ham",
+    "reputation_spam",
+    "reputation_ham",
+    "bayes_spam",
+    "bayes_ham",
+    "cache",
+    "near_duplicate",
+    "llm",
+    "group",
+    "llm_failed",
+    "deferred",
+)
+
+# Naive Bayes 스팸 확률이 이 값 이상이면 spam, 1 - 이 값 이하이면 inbox 로 확정한다
+BAYES_CONFIDENCE = 0.95
+
+
+def _sender_address(email_data):
+    return parseaddr(str(email_data.get("from_header") or ""))[1].lower()
+
+
+def _address_in(address, entries):
+    """주소 자체나 그 도메인(상위 도메인 포함, '@domain' 표기 허용)이 entries 에 있는지 확인한다."""
+    if not address:
+        return False
+    if address in entries:
+        return True
+    domain = address.rpartition("@")[2]
+    while domain:
+        if domain in entries or f"@{domain}" in entries:
+            return True
+        domain = domain.partition(".")[2]
+    return False
+
+
+def _reply_ids(email_data):
+    headers = email_data.get("headers") or {}
+    return parse_message_ids(headers.get("In-Reply-To")) + parse_message_ids(headers.get("References"))
+
+
+def metadata_email_data(metadata):
+    """저장된 메일(EmailMetadata, email select_related)을 classify_batch 가 받는 dict 로 바꿉니다. uid 는 metadata id."""
+    email_obj = metadata.email
+    return {
+        "uid": str(metadata.id),
+        "subject": email_obj.subject or "",
+        "from_header": email_obj.from_header or "",
+        "text_body": email_obj.text_body,
+        "html_body": email_obj.html_body,
+        "headers": email_obj.headers or {},
+        "minhash": email_obj.minhash,
+    }
+
+
+def classify_batch(account, emails, defer_llm=False, learn=True):
+    """
+    ingest 중인 메일 목록(uid, from_header, subject, text_body, headers 를 가진 dict)을 분류합니다.
+    ({uid: "spam" | "inbox"}, {uid: 분류한 단계}) 를 반환합니다.
+    defer_llm=True 면 LLM 이 필요한 메일은 부르지 않고 "deferred" 단계의 inbox 로 반환합니다.
+    learn=False 면 결과를 발신자 평판에 반영하지 않습니다. (이미 반영된 메일을 다시 분류할 때)
+    """
+    results, tiers = {}, {}
+
+    def decide(email_data, folder, tier):
+        results[email_data["uid"]] = folder
+        tiers[email_data["uid"]] = tier
+
+    blocked = {
+        address.lower() for address in SpamedMail.objects.filter(account=account).values_list("address", flat=True)
+    }
+    allowed = {address.lower() for address in Contact.objects.filter(account=account).values_list("address", flat=True)}
+
+    reply_ids = {mid for email_data in emails for mid in _reply_ids(email_data)}
+    known_ids = set(
+        ThreadKey.objects.filter(account=account, key__in=reply_ids).values_list("key", flat=True) if reply_ids else ()
+    )
+
+    compiled = get_compiled_rules(account.id, account.filter_rules or {})
+    uncertain = []
+    for email_data in emails:
+        sender = _sender_address(email_data)
+        if _address_in(sender, blocked):
+            decide(email_data, "spam", "blocklist")
+            continue
+        if _address_in(sender, allowed):
+            decide(email_data, "inbox", "allowlist")
+            continue
+        if known_ids and known_ids.intersection(_reply_ids(email_data)):
+            decide(email_data, "inbox", "conversation")
+            continue
+
+        verdict, header_score, _matched = header_heuristics(email_data.get("headers"))
+        if verdict == "spam":
+            decide(email_data, "spam", "header")
+            continue
+
+        score = compiled.score(email_data).score + header_score
+        if score >= compiled.threshold:
+            decide(email_data, "spam", "local_spam")
+        elif score <= compiled.ham_threshold:
+            decide(email_data, "inbox", "local_ham")
+        else:
+            uncertain.append(email_data)
+
+    sender_keys = {e["uid"]: sender_key(e.get("from_header"), e.get("headers")) for e in emails}
+    if uncertain:
+        reputations = sender_reputation.load(account.id, {sender_keys[e["uid"]] for e in uncertain})
+        for email_data in uncertain:
+            reputation = reputations.get(sender_keys[email_data["uid"]])
+            if reputation:
+                decide(email_data, reputation, f"reputation_{'spam' if reputation == 'spam' else 'ham'}")
+        uncertain = [email_data for email_data in uncertain if email_data["uid"] not in results]
+
+    classifier = load_classifier(account.id) if uncertain else None
+    if classifier is not None:
+        still_uncertain = []
+        for email_data, probability in zip(uncertain, classifier.predict_spam_proba(uncertain)):
+            if probability >= BAYES_CONFIDENCE:
+                decide(email_data, "spam", "bayes_spam")
+            elif probability <= 1 - BAYES_CONFIDENCE:
+                decide(email_data, "inbox", "bayes_ham")
+            else:
+                still_uncertain.append(email_data)
+        uncertain = still_uncertain
+
+    if uncertain:
+        fingerprint = classification_cache.profile_fingerprint(account)
+        keys = {
+            email_data["uid"]: classification_cache.content_key(email_data, fingerprint) for email_data in uncertain
+        }
+        cached = classification_cache.get_many(keys.values())
+        for email_data in uncertain:
+            if keys[email_data["uid"]] in cached:
+                decide(email_data, cached[keys[email_data["uid"]]], "cache")
+        uncertain = [email_data for email_data in uncertain if keys[email_data["uid"]] not in cached]
+
+    if uncertain:
+        for uid, result in near_duplicates.cached_classifications(uncertain, fingerprint).items():
+            results[uid], tiers[uid] = result, "near_duplicate"
+        uncertain = [email_data for email_data in uncertain if email_data["uid"] not in results]
+
+    # 같은 메일링 리스트/대량 발송 도메인의 메일은 대표 메일 하나만 다음 단계로 보낸다
+    followers = {}
+    for key, members in group_by_key(uncertain, lambda e: sender_keys[e["uid"]]).items():
+        if len(members) > 1 and is_group_key(key):
+            followers[members[0]["uid"]] = members[1:]
+    grouped = {email_data["uid"] for members in followers.values() for email_data in members}
+    uncertain = [email_data for email_data in uncertain if email_data["uid"] not in grouped]
+
+    if uncertain and defer_llm:
+        for email_data in uncertain:
+            decide(email_data, "inbox", "deferred")
+        uncertain = []
+
+    if uncertain:
+        llm_results = classify_emails_in_batch(
+            emails=[
+                {"id": e["uid"], "subject": e["subject"], "body": e["text_body"] or e.get("html_body") or ""}
+                for e in uncertain
+            ],
+            job=account.job or "",
+            usage=account.usage or "",
+            interests=account.interests or {},
+        )
+        for email_data in uncertain:
+            classification = llm_results.get(email_data["uid"])
+            if classification is None:
+                # LLM 오류 시에는 기존과 같이 받은편지함에 둔다
+                decide(email_data, "inbox", "llm_failed")
+            else:
+                decide(email_data, "spam" if classification == "spam" else "inbox", "llm")
+        classification_cache.set_many(
+            account, {keys[e["uid"]]: results[e["uid"]] for e in uncertain if tiers[e["uid"]] == "llm"}
+        )
+
+    for representative, members in followers.items():
+        # 대표가 미뤄지거나 실패하면 나머지도 같은 상태로 둔다 (나중에 함께 다시 분류)
+        tier = "group" if tiers[representative] == "llm" else tiers[representative]
+        for email_data in members:
+            decide(email_data, results[representative], tier)
+
+    if learn:
+        sender_reputation.record_outcomes(account.id, sender_keys, results, tiers)
+
+    counts = Counter(tiers.values())
+    for tier, count in counts.items():
+        metrics.increment(f"spam_cascade.{tier}", count)
+    if counts:
+        logger.info("spam cascade for %s: %s", account.address, dict(counts))
+    return results, tiers
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from datetime import timedelta
+from email.utils import parseaddr
+
+from django.conf import settings
+from django.utils import timezone
+
+from email_content.models import ClassificationCache
+from email_metadata.threads import normalize_subject
+
+# LLM 스팸 분류 결과 캐시. classification.classify_batch 가 LLM 을 부르기 전에 조회하고, LLM 결과를 저장한다.
+# 항목은 CLASSIFICATION_CACHE_TTL_DAYS 동안 쓰이지 않으면 만료되고,
+# CLASSIFICATION_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 쓰이지 않은 항목부터 지운다. (LRU)
+
+# 본문은 앞부분만 digest 에 넣는다. (뉴스레터 끝의 수신자별 수신거부 링크 등으로 키가 갈리지 않도록)
+BODY_DIGEST_CHARS = 20000
+PRUNE_INTERVAL = 600  # 초
+
+_WHITESPACE = re.compile(r"\s+")
+_prune_lock = threading.Lock()
+_last_pruned = 0.0
+
+
+def profile_fingerprint(account):
+    """LLM 분류에 쓰이는 계정 프로필(job/usage/interests)의 지문."""
+    interests = account.interests or []
+    if isinstance(interests, list):
+        interests = sorted(str(interest) for interest in interests)
+    profile = {"job": account.job or "", "usage": account.usage or "", "interests": interests}
+    return hashlib.sha1(json.dumps(profile, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def content_key(email_data, fingerprint):
+    """정규화한 제목, 보낸 사람 주소, 본문 digest, 프로필 지문으로 캐시 키를 만든다."""
+    subject, _is_reply = normalize_subject(email_data.get("subject") or "")
+    sender = parseaddr(str(email_data.get("from_header") or ""))[1].lower()
+    body = _WHITESPACE.sub(" ", (email_data.get("text_body") or "")[:BODY_DIGEST_CHARS]).strip()
+    body_digest = hashlib.sha256(body.encode()).hexdigest()
+    return hashlib.sha256(f"{fingerprint}\n{subject.lower()}\n{sender}\n{body_digest}".encode()).hexdigest()
+
+
+def _expires_before():
+    return timezone.now() - timedelta(days=settings.CLASSIFICATION_CACHE_TTL_DAYS)
+
+
+def get_many(keys):
+    """{key: result} 를 반환합니다. 찾은 항목은 최근 사용 시각을 갱신합니다."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+    found = dict(
+        ClassificationCache.objects.filter(key__in=keys, last_used_at__gte=_expires_before()).values_list(
+            "key", "result"
+        )
+    )
+    if found:
+        ClassificationCache.objects.filter(key__in=list(found)).update(last_used_at=timezone.now())
+    return found
+
+
+def set_many(account, results):
+    """{key: result} 를 저장합니다. 이미 있는 키는 결과와 계정을 덮어씁니다."""
+    if not results:
+        return
+    ClassificationCache.objects.bulk_create(
+        [ClassificationCache(key=key, account=account, result=result) for key, result in results.items()],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["account", "result", "last_used_at"],
+    )
+    _maybe_prune()
+
+
+def prune():
+    """만료된 항목과, 최대 개수를 넘는 오래된 항목을 지웁니다. 지운 개수를 반환합니다."""
+    deleted, _ = ClassificationCache.objects.filter(last_used_at__lt=_expires_before()).delete()
+    max_entries = settings.CLASSIFICATION_CACHE_MAX_ENTRIES
+    overflow = ClassificationCache.objects.order_by("-last_used_at").values_list("last_used_at", flat=True)
+    cutoff = next(iter(overflow[max_entries : max_entries + 1]), None)
+    if cutoff is not None:
+        evicted, _ = ClassificationCache.objects.filter(last_used_at__lte=cutoff).delete()
+        deleted += evicted
+    return deleted
+
+
+def _maybe_prune():
+    global _last_pruned
+    with _prune_lock:
+        if time.monotonic() - _last_pruned < PRUNE_INTERVAL:
+            return
+        _last_pruned = time.monotonic()
+    prune()
@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from email_content.service import reclassification
+from email_content.service.classification import classify_batch, metadata_email_data
+from email_content.service.summary_prefetch import summary_prefetcher
+from email_metadata.models import EmailMetadata
+from email_metadata.services import bulk_update_metadata
+
+logger = logging.getLogger(__name__)
+
+# 동기화 시 LLM 분류를 미룬 메일(classification_pending=True)을 나중에 분류하는 작업자.
+# 동기화는 메일을 inbox 에 바로 저장하고 wake() 만 호출하므로, 새 메일이 목록에 보이기까지 LLM 응답을 기다리지 않는다.
+# 스팸으로 판정된 메일은 services.bulk_update_metadata 로 옮기므로 카운터/스레드/동기화 버전/목록 캐시가 함께 갱신된다.
+# 프로필 변경에 따른 재분류 작업(reclassification.py)도 이 스레드가 청크 단위로 진행한다.
+#   CLASSIFICATION_WORKER_ENABLED    : False 면 스레드를 띄우지 않는다. (classify_pending 명령으로 처리)
+#   CLASSIFICATION_WORKER_INTERVAL   : 깨우지 않아도 대기 메일을 확인하는 주기(초)
+#   CLASSIFICATION_WORKER_BATCH_SIZE : 한 번에 분류하는 메일 수
+#   CLASSIFICATION_RETRY_DELAY / CLASSIFICATION_MAX_ATTEMPTS : 분류에 실패한 메일의 재시도 간격과 최대 시도 횟수
+
+
+def _record_failures(rows):
+    """
+    LLM 이 분류하지 못한 메일의 실패 횟수를 올리고 다음 시도 시각을 미룹니다. (실패할 때마다 간격 두 배)
+    CLASSIFICATION_MAX_ATTEMPTS 번 실패해 더 시도하지 않을 메일의 ID 집합을 반환합니다.
+    """
+    now = timezone.now()
+    given_up = set()
+    by_attempts = defaultdict(list)
+    for metadata in rows:
+        attempts = metadata.classification_attempts + 1
+        if attempts >= settings.CLASSIFICATION_MAX_ATTEMPTS:
+            given_up.add(metadata.id)
+        by_attempts[attempts].append(metadata.id)
+    for attempts, ids in by_attempts.items():
+        delay = settings.CLASSIFICATION_RETRY_DELAY * 2 ** (attempts - 1)
+        EmailMetadata.objects.filter(id__in=ids, classification_pending=True).update(
+            classification_attempts=attempts, classification_retry_at=now + timedelta(seconds=delay)
+        )
+    return given_up
+
+
+def classify_pending(limit=None):
+    """
+    분류 대기 중인 메일을 최대 limit 개 분류합니다. 처리(대기 해제)한 메일 수를 반환합니다.
+    LLM 이 분류하지 못한 메일(장애, circuit open, 실패한 청크, 응답에서 빠진 메일)은 대기 상태로 남겨 두었다가
+    재시도 시각이 지나면 다시 시도하고, CLASSIFICATION_MAX_ATTEMPTS 번 실패하면 inbox 로 확정합니다.
+    """
+    limit = limit or settings.CLASSIFICATION_WORKER_BATCH_SIZE
+    queryset = (
+        EmailMetadata.objects.filter(classification_pending=True, deleted_at__isnull=True)
+        .filter(Q(classification_retry_at__isnull=True) | Q(classification_retry_at__lte=timezone.now()))
+        .select_related("email", "account")
+        .order_by("id")[:limit]
+    )
+    by_account = defaultdict(list)
+    for metadata in queryset:
+        by_account[metadata.account_id].append(metadata)
+
+    processed = 0
+    for rows in by_account.values():
+        account = rows[0].account
+        results, tiers = classify_batch(account, [metadata_email_data(metadata) for metadata in rows])
+        failed = [metadata for metadata in rows if tiers.get(str(metadata.id)) == "llm_failed"]
+        if failed:
+            given_up = _record_failures(failed)
+            logger.warning(
+                "classification of %d pending mails for %s failed, giving up on %d",
+                len(failed),
+                account.address,
+                len(given_up),
+            )
+            # 다시 시도할 메일만 대기 상태로 남긴다. 포기한 메일은 분류 결과가 없으므로 inbox 로 확정한다
+            retry_ids = {metadata.id for metadata in failed} - given_up
+            rows = [metadata for metadata in rows if metadata.id not in retry_ids]
+        if not rows:
+            continue
+
+        spam_ids = [metadata.id for metadata in rows if results.get(str(metadata.id)) == "spam"]
+        if spam_ids:
+            # 그 사이 사용자가 직접 옮긴 메일은 건드리지 않는다 (직접 옮기면 services 가 대기 상태를 해제한다)
+            spam_ids = list(
+                EmailMetadata.objects.filter(id__in=spam_ids, folder="inbox", classification_pending=True).values_list(
+                    "id", flat=True
+                )
+            )
+            bulk_update_metadata(spam_ids, folder="spam", classification_pending=False)
+        # inbox 로 확정된 메일은 보이는 값이 바뀌지 않으므로 동기화 버전을 올리지 않고 대기 표시만 지운다
+        EmailMetadata.objects.filter(id__in=[metadata.id for metadata in rows], classification_pending=True).update(
+            classification_pending=False
+        )
+        processed += len(rows)
+        # 분류 대기 중인 메일은 미리 요약하지 않으므로, 받은편지함으로 확정된 지금 요약한다
+        if account.prefetch_summaries and len(spam_ids) < len(rows):
+            summary_prefetcher.wake(account.id)
+    return processed
+
+
+class ClassificationWorker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def wake(self):
+        """대기 메일이 생겼음을 알립니다. 작업자 스레드가 없으면 띄웁니다."""
+        if not settings.CLASSIFICATION_WORKER_ENABLED:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="classification-worker", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        jobs_active = False
+        while True:
+            # 재분류 작업이 진행 중이면 청크 간격마다 깨어난다
+            self._wakeup.wait(
+                settings.RECLASSIFY_CHUNK_INTERVAL if jobs_active else settings.CLASSIFICATION_WORKER_INTERVAL
+            )
+            self._wakeup.clear()
+            try:
+                self.drain()
+                jobs_active = reclassification.run_due_jobs()
+            except Exception:
+                logger.exception("classification worker failed")
+            finally:
+                close_old_connections()
+
+    def drain(self):
+        """대기 메일이 없거나 더 진행되지 않을 때까지 배치 단위로 분류합니다. 처리한 메일 수를 반환합니다."""
+        total = 0
+        while True:
+            processed = classify_pending()
+            total += processed
+            if processed < settings.CLASSIFICATION_WORKER_BATCH_SIZE:
+                return total
+
+
+classification_worker = ClassificationWorker()
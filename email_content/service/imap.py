@@ -1,10 +1,11 @@
 import imaplib
 import email
-from email_content.models import EmailContent
+from email_content.models import EmailContent, EmailParticipant
 from email_account.models import EmailAccount
 from email_attachment.models import Attachment
 from email_metadata.models import EmailMetadata
-from email_content.utils import get_imap_config
+from email_metadata.services import create_metadata
+from email_content.utils import get_imap_config, parse_participants
 import uuid
 import boto3
 import email.utils
@@ -16,7 +17,27 @@ import os
 ##################################################
 
 #### 스팸 필터 로직 추가 ####
-from utils.spam_filter import classify_emails_in_batch
+from email_content.service import near_duplicates
+from email_content.service.classification import classify_batch
+from email_content.service.classification_worker import classification_worker
+from email_content.service.summary_prefetch import summary_prefetcher
+from utils import minhash
+
+
+# EmailContent.headers 에 원본 그대로 보관하는 헤더 (스레딩, 로컬 스팸 규칙의 header factor 등 후처리용)
+STORED_HEADERS = (
+    "In-Reply-To",
+    "References",
+    "Reply-To",
+    "Return-Path",
+    "List-Id",
+    "List-Unsubscribe",
+    "Precedence",
+    "Auto-Submitted",
+    "X-Mailer",
+    "X-Spam-Flag",
+    "X-Spam-Status",
+)
 
 
 def upload_to_s3(file_bytes, prefix, ext):
@@ -41,9 +62,29 @@ def upload_to_s3(file_bytes, prefix, ext):
 
 
 def parse_addresses(header):
+    """
+    주소 헤더를 수신자 단위 문자열 리스트로 분리한다.
+    표시 이름 안의 쉼표("Kim, Minsu" <a@b.com>)에서 잘리지 않도록 RFC 5322 규칙으로 파싱한다.
+    """
     if not header:
         return []
-    return [addr.strip() for addr in header.split(",")]
+    return [email.utils.formataddr((name, addr)) for name, addr in email.utils.getaddresses([str(header)]) if addr]
+
+
+def create_participants(email_obj):
+    """EmailContent의 주소 헤더들을 정규화하여 EmailParticipant 행으로 저장한다."""
+    participants = []
+    for role, header in (
+        ("from", email_obj.from_header),
+        ("to", email_obj.to_header),
+        ("cc", email_obj.cc_header),
+        ("bcc", email_obj.bcc_header),
+    ):
+        for display_name, address in parse_participants(header):
+            participants.append(
+                EmailParticipant(email=email_obj, role=role, address=address, display_name=display_name)
+            )
+    EmailParticipant.objects.bulk_create(participants)
 
 
 def fetch_and_store_emails(address):
@@ -112,6 +153,7 @@ def fetch_and_store_emails(address):
         cc_header = msg.get("Cc", "")
         bcc_header = msg.get("Bcc", "")
         date = msg.get("Date", "")
+        stored_headers = {name: str(msg.get(name)) for name in STORED_HEADERS if msg.get(name)}
         # date 파싱
         try:
             parsed_date = email.utils.parsedate_to_datetime(date)
@@ -165,31 +207,25 @@ def fetch_and_store_emails(address):
                 "has_attachment": has_attachment,
                 "attachments_data": attachments_data,
                 "parsed_date": parsed_date,
+                "headers": stored_headers,
             }
         )
+    # 거의 같은 메일 찾기용 MinHash 서명은 배치 전체를 한 번에 계산한다 (분류 단계에서도 쓴다)
+    for email_data, signature in zip(emails_to_process, near_duplicates.compute_signatures(emails_to_process)):
+        email_data["minhash"] = signature
     #### 스팸 필터링을 위한 데이터 준비 끝 ####
 
-    #### 스팸 필터링 일괄 호출(불러온 50개에 대해) ####
-    emails_for_classification = [
-        {"id": e["uid"], "subject": e["subject"], "body": e["text_body"] or ""} for e in emails_to_process
-    ]
-
-    classification_results = {}
-    if emails_for_classification:
-        # --- 사용자 선호도 데이터 준비 ---
-        job_preference = account.job or ""
-        usage_preference = account.usage or ""
-        user_preferences = account.interests or {}  # account.interests는 JSONField (dict)
-        # --- 스팸 필터 일괄 호출 ---
-        classification_results = classify_emails_in_batch(
-            emails=emails_for_classification,
-            job=job_preference,
-            usage=usage_preference,
-            interests=user_preferences,
-        )
-    #### END: 스팸 필터 일괄 호출 단계 ####
+    #### 스팸 분류: 차단/허용 목록 → 헤더 → 로컬 점수 순으로 거르고, 애매한 메일만 LLM 으로 보낸다 ####
+    # LLM 분류는 기다리지 않는다. 해당 메일은 inbox 에 먼저 저장하고 classification_worker 가 나중에 처리한다.
+    classification_results, tiers = (
+        classify_batch(account, emails_to_process, defer_llm=settings.CLASSIFICATION_DEFER_LLM)
+        if emails_to_process
+        else ({}, {})
+    )
+    #### END: 스팸 분류 단계 ####
 
     #### START: 분류 결과와 함께 DB에 저장하는 단계 ####
+    stored_contents = []
     for email_data in emails_to_process:
         classification = classification_results.get(email_data["uid"], "inbox")
         folder = "spam" if classification == "spam" else "inbox"
@@ -207,15 +243,20 @@ def fetch_and_store_emails(address):
             html_body=email_data["html_body"],
             has_attachment=email_data["has_attachment"],
             date=email_data["parsed_date"],
+            headers=email_data["headers"],
+            minhash=minhash.to_bytes(email_data["minhash"]) if email_data["minhash"] is not None else None,
         )
+        stored_contents.append(email_obj)
+        create_participants(email_obj)
 
         # 6. EmailMetadata 저장
-        EmailMetadata.objects.create(
+        create_metadata(
             account=account,
             email=email_obj,
             uid=email_data["uid"],
             folder=folder,  # <-- 스팸 필터 결과 적용
             received_at=email_data["parsed_date"],
+            classification_pending=tiers.get(email_data["uid"]) == "deferred",
         )
 
         # 7. 첨부파일 저장
@@ -231,5 +272,12 @@ def fetch_and_store_emails(address):
             )
     #### END: 분류 결과와 함께 DB에 저장하는 단계 ####
 
+    near_duplicates.index(stored_contents)
+
+    if "deferred" in tiers.values():
+        classification_worker.wake()
+    if emails_to_process and account.prefetch_summaries:
+        summary_prefetcher.wake(account.id)
+
     imap.close()
     imap.logout()
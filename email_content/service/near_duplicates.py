@@ -0,0 +1,201 @@
+from collections import defaultdict
+
+import numpy as np
+from django.db.models import Exists, F, OuterRef, Q, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from email_content.models import EmailContent, MinHashBucket
+from email_content.service import classification_cache
+from email_metadata.models import EmailMetadata
+from utils import minhash
+from utils.llm_batching import clean_body
+
+# 거의 같은 메일(near-duplicate) 색인과 재사용.
+#   - 수신 시 메일마다 MinHash 서명을 계산해 EmailContent.minhash 에 두고, LSH 버킷을 MinHashBucket 에 색인한다.
+#   - 먼저 들어온 유사 메일이 있으면 EmailContent.duplicate_of 에 그 묶음의 가장 오래된 메일(대표)을 기록한다.
+#     버킷에는 묶음의 대표만 색인하므로, 같은 뉴스레터가 계속 와도 버킷 행은 늘지 않는다.
+#   - 스팸 분류: 유사 메일의 LLM 분류 결과가 캐시에 있으면 그 결과를 쓴다. (classification.py 의 near_duplicate 단계)
+#   - 요약: 같은 사용자의 유사 메일에 요약이 있으면 그 요약을 쓴다. (수신자 이름 등이 담길 수 있어 사용자 간에는 공유하지 않음)
+#   - 목록: collapse=duplicates 이면 유사 메일 묶음에서 가장 최근 메일만 보여준다.
+
+# 추정 Jaccard 유사도가 이 값 이상이어야 유사 메일로 본다
+SIMILARITY_THRESHOLD = 0.7
+# 버킷마다, 그리고 서명 하나당 확인하는 후보 수 (흔한 버킷에 대표가 몰려도 읽어 오는 행 수가 이 값에 묶이도록)
+MAX_CANDIDATES = 200
+# 분류 결과를 찾아볼 유사 메일 묶음 수와 묶음마다 확인하는 최근 메일 수
+MAX_REUSED = 5
+
+
+def minhash_text(subject, text_body, html_body):
+    return f"{subject or ''}\n{clean_body(text_body or html_body or '', limit=minhash.MAX_TEXT_CHARS)}"
+
+
+def compute_signatures(emails):
+    """ingest 중인 메일 dict 목록의 서명을 한 번에 계산합니다. (짧은 메일은 None)"""
+    return minhash.signatures([minhash_text(e.get("subject"), e.get("text_body"), e.get("html_body")) for e in emails])
+
+
+def signature_of(email_data):
+    """메일 dict 의 "minhash" 값(numpy 배열 또는 저장된 bytes)을 서명으로 바꿉니다."""
+    value = email_data.get("minhash")
+    if value is None or isinstance(value, np.ndarray):
+        return value
+    return minhash.from_bytes(value)
+
+
+def find_similar(signatures):
+    """
+    서명마다 색인된 유사 메일 묶음의 대표를 [(EmailContent id, 유사도)] 로 유사도가 높은 순으로 반환합니다.
+    버킷이 하나라도 겹치는 대표를 후보로 모은 뒤(버킷마다 id 가 작은 MAX_CANDIDATES 개까지),
+    서명을 비교해 SIMILARITY_THRESHOLD 이상만 남긴다.
+    """
+    buckets = [minhash.band_buckets(signature) if signature is not None else None for signature in signatures]
+    wanted = {int(bucket) for row in buckets if row is not None for bucket in row}
+    if not wanted:
+        return [[] for _signature in signatures]
+
+    rows = (
+        MinHashBucket.objects.filter(bucket__in=wanted)
+        .annotate(rank=Window(RowNumber(), partition_by=[F("bucket")], order_by=F("email_id").asc()))
+        .filter(rank__lte=MAX_CANDIDATES)
+        .values_list("bucket", "email_id")
+    )
+    emails_by_bucket = defaultdict(set)
+    for bucket, email_id in rows:
+        emails_by_bucket[bucket].add(email_id)
+
+    candidates = []
+    for row in buckets:
+        ids = set() if row is None else set().union(*(emails_by_bucket.get(int(bucket), ()) for bucket in row))
+        candidates.append(sorted(ids)[:MAX_CANDIDATES])
+
+    stored = {
+        email_id: minhash.from_bytes(data)
+        for email_id, data in EmailContent.objects.filter(id__in={i for ids in candidates for i in ids}).values_list(
+            "id", "minhash"
+        )
+    }
+    results = []
+    for signature, ids in zip(signatures, candidates):
+        ids = [i for i in ids if stored.get(i) is not None]
+        if not ids:
+            results.append([])
+            continue
+        scores = minhash.similarity(signature, np.stack([stored[i] for i in ids]))
+        matches = [(i, float(score)) for i, score in zip(ids, scores) if score >= SIMILARITY_THRESHOLD]
+        results.append(sorted(matches, key=lambda match: -match[1]))
+    return results
+
+
+def index(contents):
+    """
+    새로 저장한 EmailContent 들의 duplicate_of 를 채우고, 묶음의 대표가 된 메일만 버킷에 색인합니다.
+    같은 배치 안의 메일끼리는 버킷을 DB 에 넣기 전에 메모리에서 비교한다.
+    """
+    contents = sorted((c for c in contents if c.minhash), key=lambda c: c.id)
+    if not contents:
+        return
+    signatures = [minhash.from_bytes(c.minhash) for c in contents]
+    matches = find_similar(signatures)
+
+    roots, changed = [], []
+    batch_signatures = {}
+    batch_buckets = defaultdict(list)
+    for content, signature, found in zip(contents, signatures, matches):
+        buckets = [int(bucket) for bucket in minhash.band_buckets(signature)]
+        older = [i for i, _score in found if i < content.id]
+        # 이미 색인된 대표가 없으면 이 배치에서 먼저 대표가 된 메일과 비교한다
+        candidates = sorted({i for bucket in buckets for i in batch_buckets.get(bucket, ())})
+        if not older and candidates:
+            scores = minhash.similarity(signature, np.stack([batch_signatures[i] for i in candidates]))
+            older = [i for i, score in zip(candidates, scores) if score >= SIMILARITY_THRESHOLD]
+        if older:
+            content.duplicate_of_id = min(older)
+            changed.append(content)
+            continue
+        roots.append((content, buckets))
+        batch_signatures[content.id] = signature
+        for bucket in buckets:
+            batch_buckets[bucket].append(content.id)
+
+    MinHashBucket.objects.bulk_create(
+        [MinHashBucket(email_id=content.id, bucket=bucket) for content, buckets in roots for bucket in buckets]
+    )
+    EmailContent.objects.bulk_update(changed, ["duplicate_of"])
+
+
+def _recent_members(root_ids):
+    """묶음 대표마다 대표와 복사본 중 가장 최근 메일 MAX_REUSED 개를 {대표 id: [EmailContent dict]} 로 반환합니다."""
+    rows = (
+        EmailContent.objects.filter(Q(id__in=root_ids) | Q(duplicate_of_id__in=root_ids))
+        .annotate(root=Coalesce("duplicate_of_id", "id"))
+        .annotate(rank=Window(RowNumber(), partition_by=[F("root")], order_by=F("id").desc()))
+        .filter(rank__lte=MAX_REUSED)
+        .order_by("-id")
+        .values("id", "root", "subject", "from_header", "text_body")
+    )
+    members = defaultdict(list)
+    for row in rows:
+        members[row["root"]].append(row)
+    return members
+
+
+def cached_classifications(emails, fingerprint):
+    """
+    분류할 메일 dict 목록 중 유사 메일의 LLM 분류 결과가 캐시에 있는 메일의 {uid: 결과} 를 반환합니다.
+    유사 메일의 캐시 키는 그 메일 자신의 내용과 같은 프로필 지문으로 만든다.
+    묶음마다 대표와 최근 복사본을 확인한다. (대표의 캐시 항목이 만료되어도 복사본을 LLM 이 분류한 결과를 쓸 수 있도록)
+    """
+    matches = find_similar([signature_of(email_data) for email_data in emails])
+    similar_roots = {
+        uid: [i for i, _score in found[:MAX_REUSED]] for uid, found in zip((e["uid"] for e in emails), matches)
+    }
+    wanted = {i for ids in similar_roots.values() for i in ids}
+    if not wanted:
+        return {}
+    members = _recent_members(wanted)
+    keys = {row["id"]: classification_cache.content_key(row, fingerprint) for rows in members.values() for row in rows}
+    cached = classification_cache.get_many(keys.values())
+    results = {}
+    for uid, roots in similar_roots.items():
+        for row in (row for root in roots for row in members.get(root, ())):
+            if keys[row["id"]] in cached:
+                results[uid] = cached[keys[row["id"]]]
+                break
+    return results
+
+
+def reusable_summary(metadata, user):
+    """user 가 받은 유사 메일 중 이미 요약된 메일의 요약을 반환합니다. 없으면 None."""
+    email_obj = metadata.email
+    root_id = email_obj.duplicate_of_id or email_obj.id
+    if email_obj.duplicate_of_id is None and not EmailContent.objects.filter(duplicate_of_id=root_id).exists():
+        return None
+    return (
+        EmailMetadata.objects.filter(
+            account__user=user,
+            deleted_at__isnull=True,
+            is_summarized=True,
+        )
+        .filter(Q(email_id=root_id) | Q(email__duplicate_of_id=root_id))
+        .exclude(id=metadata.id)
+        .exclude(summarized_content__isnull=True)
+        .exclude(summarized_content="")
+        .values_list("summarized_content", flat=True)
+        .first()
+    )
+
+
+def collapse(queryset, user):
+    """유사 메일 묶음마다 같은 폴더에서 가장 최근에 받은 메일만 남깁니다."""
+    newer = (
+        EmailMetadata.objects.filter(
+            account__user=user,
+            deleted_at__isnull=True,
+            folder=OuterRef("folder"),
+            received_at__gt=OuterRef("received_at"),
+        )
+        .annotate(cluster=Coalesce("email__duplicate_of_id", "email_id"))
+        .filter(cluster=OuterRef("cluster"))
+    )
+    return queryset.annotate(cluster=Coalesce("email__duplicate_of_id", "email_id")).exclude(Exists(newer))
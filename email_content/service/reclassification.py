@@ -0,0 +1,187 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from email_content.models import ReclassificationJob
+from email_content.service import sender_reputation
+from email_content.service.classification import classify_batch, metadata_email_data
+from email_metadata.models import EmailMetadata
+from email_metadata.services import bulk_update_metadata
+
+logger = logging.getLogger(__name__)
+
+# 프로필 변경 후 재분류.
+# 계정의 최근 메일(RECLASSIFY_WINDOW_DAYS) 중 inbox/spam 에 있는 메일을 id 내림차순으로 RECLASSIFY_CHUNK_SIZE 통씩
+# 분류 파이프라인(classification.classify_batch, 결과 캐시 포함)에 다시 넣고, 결과가 달라진 메일만 bulk 로 옮긴다.
+#   - 사용자가 직접 스팸함으로/에서 옮긴 메일(trained_label 이 있는 메일)과 분류 대기 중인 메일은 대상에서 뺀다.
+#   - 청크마다 cursor 와 진행 상황을 저장하므로 중단되어도 이어서 진행한다.
+#     LLM 이 분류하지 못한 메일이 있으면 cursor 는 그 앞에서 멈추고, 다음 청크가 그 메일부터 다시 시도한다.
+#     cursor 를 옮기지 못한 채 RECLASSIFY_MAX_ATTEMPTS 번 실패하면(간격은 실패할 때마다 두 배) 실패한 메일을 건너뛰고,
+#     청크 전체가 실패했다면 LLM 장애로 보고 작업을 failed 로 끝낸다. (작업이 running 으로 계속 남지 않도록)
+#   - 같은 작업의 청크 사이에는 RECLASSIFY_CHUNK_INTERVAL 초 이상 간격을 둔다. (LLM 호출량 제한)
+# 작업은 classification_worker 스레드가 진행하며, reclassify_account 명령으로 직접 돌릴 수도 있다.
+
+RECLASSIFY_FOLDERS = ("inbox", "spam")
+
+
+def _candidates(job):
+    queryset = EmailMetadata.objects.filter(
+        account_id=job.account_id,
+        folder__in=RECLASSIFY_FOLDERS,
+        deleted_at__isnull=True,
+        received_at__gte=job.since,
+        classification_pending=False,
+        trained_label="",
+    )
+    return queryset.filter(id__lt=job.cursor) if job.cursor is not None else queryset
+
+
+def start_job(account):
+    """
+    진행 중인 작업을 취소하고 새 재분류 작업을 만듭니다.
+    이전 프로필 기준의 LLM 판정이 평판 단계에서 계속 적용되지 않도록, LLM 판정으로 쌓인 발신자 평판도 지웁니다.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ReclassificationJob.objects.filter(account=account, status__in=ReclassificationJob.ACTIVE_STATUSES).update(
+            status="cancelled", finished_at=now
+        )
+        sender_reputation.reset_llm_weights(account.id)
+        job = ReclassificationJob(account=account, since=now - timedelta(days=settings.RECLASSIFY_WINDOW_DAYS))
+        job.total = _candidates(job).count()
+        job.save()
+    return job
+
+
+def _move(ids, from_folder, to_folder):
+    # 분류하는 동안 사용자가 옮긴 메일은 제외한다
+    ids = list(
+        EmailMetadata.objects.filter(id__in=ids, folder=from_folder, trained_label="").values_list("id", flat=True)
+    )
+    return len(bulk_update_metadata(ids, folder=to_folder))
+
+
+def _save(job, **fields):
+    """작업 상태를 저장합니다. 그 사이 취소된 작업(새 작업으로 대체된 경우 등)은 되살리지 않습니다."""
+    fields["updated_at"] = timezone.now()
+    for name, value in fields.items():
+        setattr(job, name, value)
+    return ReclassificationJob.objects.filter(id=job.id, status__in=ReclassificationJob.ACTIVE_STATUSES).update(
+        **fields
+    )
+
+
+def _retry_or_skip(job, tiers, rows):
+    """
+    청크의 첫 메일부터 분류하지 못했을 때(LLM 장애 등) 처리합니다. 작업이 아직 진행 중이면 True 를 반환합니다.
+    RECLASSIFY_MAX_ATTEMPTS 번까지는 cursor 를 옮기지 않고 다음 차례에 같은 청크를 다시 시도합니다.
+    그 뒤에는 앞쪽의 실패한 메일을 건너뛰고, 청크 전체가 실패했다면 작업을 실패로 끝냅니다.
+    """
+    failures = job.failures + 1
+    if failures < settings.RECLASSIFY_MAX_ATTEMPTS:
+        return bool(_save(job, status="running", failures=failures, error="LLM 분류 실패, 재시도 대기 중"))
+
+    skip = next((index for index, metadata in enumerate(rows) if tiers[str(metadata.id)] != "llm_failed"), None)
+    if skip is None:
+        _save(
+            job,
+            status="failed",
+            failures=failures,
+            error=f"LLM 분류가 {failures}번 연속 실패하여 중단했습니다.",
+            finished_at=timezone.now(),
+        )
+        return False
+
+    logger.warning("reclassification job %s skipped %d mails that failed %d times", job.id, skip, failures)
+    return bool(
+        _save(job, status="running", failures=0, error="", cursor=rows[skip - 1].id, skipped=job.skipped + skip)
+    )
+
+
+def run_chunk(job):
+    """작업의 다음 청크를 처리합니다. 작업이 아직 진행 중이면 True 를 반환합니다."""
+    if job.status not in ReclassificationJob.ACTIVE_STATUSES:
+        return False
+    rows = list(_candidates(job).select_related("email", "account").order_by("-id")[: settings.RECLASSIFY_CHUNK_SIZE])
+    if not rows:
+        _save(job, status="completed", finished_at=timezone.now())
+        return False
+
+    # 이미 발신자 평판에 반영된 메일이므로 다시 반영하지 않는다
+    results, tiers = classify_batch(rows[0].account, [metadata_email_data(metadata) for metadata in rows], learn=False)
+    # cursor 는 LLM 이 분류하지 못한 첫 메일 앞에서 멈춘다. 그 메일부터 다음 차례에 다시 시도한다
+    failed = next((index for index, metadata in enumerate(rows) if tiers[str(metadata.id)] == "llm_failed"), None)
+    if failed == 0:
+        # 첫 메일부터 분류하지 못했다 (LLM 장애 등)
+        return _retry_or_skip(job, tiers, rows)
+    if failed is not None:
+        rows = rows[:failed]
+
+    to_spam, to_inbox = [], []
+    for metadata in rows:
+        uid = str(metadata.id)
+        if results[uid] == "spam" and metadata.folder == "inbox":
+            to_spam.append(metadata.id)
+        elif results[uid] == "inbox" and metadata.folder == "spam":
+            to_inbox.append(metadata.id)
+
+    return bool(
+        _save(
+            job,
+            status="running",
+            error="",
+            failures=0,
+            cursor=rows[-1].id,
+            processed=job.processed + len(rows),
+            moved_to_spam=job.moved_to_spam + _move(to_spam, "inbox", "spam"),
+            moved_to_inbox=job.moved_to_inbox + _move(to_inbox, "spam", "inbox"),
+        )
+    )
+
+
+def _claim(job, interval):
+    """
+    청크 간격이 지난 작업이면 다른 작업자보다 먼저 가져갑니다. (updated_at 을 조건으로 한 UPDATE)
+    여러 프로세스의 작업자가 같은 청크를 동시에 처리하지 않게 하고, 호출량 제한도 겸합니다.
+    """
+    now = timezone.now()
+    if job.status == "running" and now - job.updated_at < timedelta(seconds=interval):
+        return False
+    claimed = ReclassificationJob.objects.filter(id=job.id, updated_at=job.updated_at, status=job.status).update(
+        updated_at=now
+    )
+    job.updated_at = now
+    return bool(claimed)
+
+
+def _interval(job):
+    """청크 간격. 같은 위치에서 실패할 때마다 두 배로 늘린다."""
+    return settings.RECLASSIFY_CHUNK_INTERVAL * 2**job.failures
+
+
+def run_due_jobs():
+    """진행할 차례가 된 작업마다 한 청크씩 처리합니다. 아직 진행 중인 작업이 있으면 True 를 반환합니다."""
+    for job in ReclassificationJob.objects.filter(status__in=ReclassificationJob.ACTIVE_STATUSES).order_by("id"):
+        if not _claim(job, _interval(job)):
+            continue
+        try:
+            run_chunk(job)
+        except Exception as exc:
+            logger.exception("reclassification job %s failed", job.id)
+            _save(job, status="failed", error=str(exc)[:1000], finished_at=timezone.now())
+    return ReclassificationJob.objects.filter(status__in=ReclassificationJob.ACTIVE_STATUSES).exists()
+
+
+def run_job(job, on_progress=None):
+    """작업 하나를 끝날 때까지 진행합니다. (관리 명령용) 청크 사이에는 RECLASSIFY_CHUNK_INTERVAL 이상 쉽니다."""
+    while True:
+        job.refresh_from_db()
+        if not run_chunk(job):
+            return job
+        if on_progress:
+            on_progress(job)
+        time.sleep(_interval(job))
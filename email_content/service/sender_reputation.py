@@ -0,0 +1,83 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from email_account.models import SenderReputation
+from utils.sender_reputation import OUTCOME_WEIGHT, USER_MOVE_WEIGHT, accumulate, verdict
+
+# 발신 키별 평판(SenderReputation) 저장/조회. 계산 규칙은 utils/sender_reputation.py 참고.
+#   - 분류 단계(classification.py)의 결과는 OUTCOME_WEIGHT 로, 사용자의 폴더 이동은 USER_MOVE_WEIGHT 로 쌓는다.
+#   - LLM 판정은 계정 프로필에 따라 달라지므로 llm_* 가중치에 따로 쌓고, 프로필이 바뀌면 reset_llm_weights 로 지운다.
+#     (평판 단계는 cache/LLM 보다 먼저 실행되므로, 지우지 않으면 이전 프로필 기준의 판정이 계속 적용된다)
+#   - 평판으로 판정한 메일과 대표 메일의 판정을 따른 메일은 다시 쌓지 않는다. (스스로를 강화하지 않도록)
+
+# 평판에 반영하는 분류 단계. 차단/허용 목록과 대화 중인 메일은 발신자의 평판과 무관하므로 뺀다.
+LEARNED_TIERS = ("header", "local_spam", "local_ham", "bayes_spam", "bayes_ham", "cache", "near_duplicate", "llm")
+# 그중 계정 프로필에 따라 달라지는 LLM 판정 단계
+LLM_TIERS = ("cache", "near_duplicate", "llm")
+
+WEIGHT_FIELDS = ("spam_weight", "ham_weight", "llm_spam_weight", "llm_ham_weight")
+
+
+def load(account_id, keys):
+    """keys 중 평판이 안정된 키의 판정 {key: "spam" | "inbox"} 를 반환합니다."""
+    keys = [key for key in keys if key]
+    if not keys:
+        return {}
+    rows = SenderReputation.objects.filter(account_id=account_id, key__in=keys).values_list("key", *WEIGHT_FIELDS)
+    return {
+        key: result
+        for key, spam_weight, ham_weight, llm_spam_weight, llm_ham_weight in rows
+        if (result := verdict(spam_weight + llm_spam_weight, ham_weight + llm_ham_weight))
+    }
+
+
+def record(account_id, deltas):
+    """{key: (spam, ham, llm_spam, llm_ham 에 더할 가중치)} 를 반영합니다. 음수면 이전 반영을 되돌립니다."""
+    deltas = {key: delta for key, delta in deltas.items() if key and any(delta)}
+    if not deltas:
+        return
+    now = timezone.now()
+    with transaction.atomic():
+        SenderReputation.objects.bulk_create(
+            [SenderReputation(account_id=account_id, key=key) for key in deltas], ignore_conflicts=True
+        )
+        # 같은 키를 동시에 갱신해도 서로 덮어쓰지 않도록 행을 잠근다
+        rows = list(SenderReputation.objects.select_for_update().filter(account_id=account_id, key__in=deltas))
+        for row in rows:
+            weights = accumulate([getattr(row, field) for field in WEIGHT_FIELDS], deltas[row.key])
+            for field, weight in zip(WEIGHT_FIELDS, weights):
+                setattr(row, field, weight)
+            row.updated_at = now
+        SenderReputation.objects.bulk_update(rows, [*WEIGHT_FIELDS, "updated_at"])
+
+
+def record_outcomes(account_id, sender_keys, results, tiers):
+    """classify_batch 의 결과를 평판에 반영합니다. sender_keys 는 {uid: 발신 키}."""
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for uid, tier in tiers.items():
+        if tier in LEARNED_TIERS:
+            index = (0 if results[uid] == "spam" else 1) + (2 if tier in LLM_TIERS else 0)
+            deltas[sender_keys.get(uid, "")][index] += OUTCOME_WEIGHT
+    record(account_id, deltas)
+
+
+def reset_llm_weights(account_id):
+    """계정 프로필이 바뀌었을 때 LLM 판정으로 쌓인 가중치를 지웁니다. (규칙/사용자 이동으로 쌓인 값은 유지)"""
+    SenderReputation.objects.filter(account_id=account_id).exclude(llm_spam_weight=0, llm_ham_weight=0).update(
+        llm_spam_weight=0, llm_ham_weight=0, updated_at=timezone.now()
+    )
+
+
+def record_moves(account_id, moves):
+    """
+    사용자가 옮긴 메일 [(발신 키, 새 라벨, 이전에 학습된 라벨)] 을 반영합니다. 라벨은 "spam" / "ham".
+    같은 메일이 반대 라벨로 반영되어 있었다면 그 가중치를 먼저 뺀다.
+    """
+    deltas = defaultdict(lambda: [0, 0, 0, 0])
+    for key, label, previous in moves:
+        deltas[key][0 if label == "spam" else 1] += USER_MOVE_WEIGHT
+        if previous and previous != label:
+            deltas[key][0 if previous == "spam" else 1] -= USER_MOVE_WEIGHT
+    record(account_id, deltas)
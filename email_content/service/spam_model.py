@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from django.db import transaction
+
+from email_account.models import SpamModel
+from email_content.service import sender_reputation
+from email_metadata.models import EmailMetadata
+from utils.sender_reputation import sender_key
+
+# 사용자의 폴더 이동을 로컬 스팸 모델(utils/spam_bayes.py)의 학습 데이터로 쓴다.
+#   - 어느 폴더에서든 spam 으로 옮기면 → spam 으로 학습
+#   - spam 에서 inbox/starred 로 꺼내면 → ham 으로 학습
+# 이미 반대 라벨로 학습된 메일이면(EmailMetadata.trained_label) 그 학습을 먼저 되돌린다.
+# 같은 이동을 발신 키 평판(sender_reputation.py)에도 반영한다.
+
+HAM_FOLDERS = ("inbox", "starred")
+# 두 라벨 모두 이만큼 학습되기 전에는 예측에 쓰지 않는다
+MIN_TRAINED_DOCS = 5
+
+
+def feedback_label(old_folder, new_folder):
+    if old_folder == new_folder:
+        return None
+    if new_folder == "spam":
+        return "spam"
+    if old_folder == "spam" and new_folder in HAM_FOLDERS:
+        return "ham"
+    return None
+
+
+def learn_from_moves(moves):
+    """
+    사용자가 옮긴 메일 [(metadata_id, 이전 폴더, 새 폴더)] 로 계정별 모델을 갱신합니다.
+    학습에 반영된 메일 수를 반환합니다.
+    """
+    labels = {pk: label for pk, old, new in moves if (label := feedback_label(old, new))}
+    if not labels:
+        return 0
+
+    by_account = defaultdict(list)
+    queryset = (
+        EmailMetadata.objects.filter(id__in=labels)
+        .select_related("email")
+        .only(
+            "id",
+            "account_id",
+            "trained_label",
+            "email__subject",
+            "email__text_body",
+            "email__from_header",
+            "email__headers",
+        )
+    )
+    for metadata in queryset:
+        if metadata.trained_label != labels[metadata.id]:
+            by_account[metadata.account_id].append(metadata)
+
+    learned = 0
+    with transaction.atomic():
+        for account_id, rows in by_account.items():
+            # 같은 계정의 동시 학습이 서로 덮어쓰지 않도록 모델 행을 잠근다
+            state, _created = SpamModel.objects.select_for_update().get_or_create(account_id=account_id)
+            classifier = state.classifier()
+            for label in ("spam", "ham"):
+                targets = [m for m in rows if labels[m.id] == label]
+                if not targets:
+                    continue
+                previous = "ham" if label == "spam" else "spam"
+                classifier.learn([m.email for m in targets if m.trained_label == previous], previous, sign=-1)
+                classifier.learn([m.email for m in targets], label)
+                EmailMetadata.objects.filter(id__in=[m.id for m in targets]).update(trained_label=label)
+                learned += len(targets)
+            state.store(classifier)
+            sender_reputation.record_moves(
+                account_id,
+                [(sender_key(m.email.from_header, m.email.headers), labels[m.id], m.trained_label) for m in rows],
+            )
+    return learned
+
+
+def load_classifier(account_id):
+    """예측에 쓸 수 있을 만큼 학습된 모델이 있으면 반환하고, 아니면 None."""
+    state = SpamModel.objects.filter(account_id=account_id).first()
+    if state is None or min(state.spam_docs, state.ham_docs) < MIN_TRAINED_DOCS:
+        return None
+    return state.classifier()
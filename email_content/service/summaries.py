@@ -0,0 +1,79 @@
+from django.conf import settings
+
+from email_content.service import near_duplicates, summary_cache
+from email_metadata.models import EmailMetadata
+from utils import metrics
+from utils.llm_batching import clean_body
+from utils.summarizer import llm_available, stream_email_content, summarize_email_content, summarize_locally
+
+# 메일(EmailMetadata) 하나의 요약을 만들고 저장한다. 요약 API(EmailSummarizeView)와 미리 요약(summary_prefetch.py)이 함께 쓴다.
+#   0. 짧은 메일(인용문/서명을 뺀 본문이 SUMMARY_LOCAL_MAX_CHARS 미만)은 LLM 없이 추출 요약 (summarizer.summarize_locally)
+#   1. 같은 내용의 공유 요약 (summary_cache.py)
+#   2. 같은 사용자가 받은 유사 메일의 요약 (near_duplicates.py)
+#   3. LLM. 같은 내용의 요약이 이미 만들어지는 중이면 그 결과를 기다린다. (summary_cache.summarize_once)
+# 재요약(refresh=True)은 1, 2 를 건너뛰고 LLM 을 다시 부르며, 공유 요약과 그 사본들도 갱신한다.
+# on_text 를 넘기면 LLM 응답을 스트리밍으로 받아 조각마다 on_text 를 부른다. (요약 스트리밍 API)
+# 1, 2 에서 찾았거나 다른 요청이 만든 요약을 기다려 받은 경우에는 완성된 요약으로 한 번만 부른다.
+# fallback=True 이면 LLM 장애(circuit open)로 실패했을 때 추출 요약을 대신 돌려준다. 이 요약은 저장하지 않으므로
+# (is_summarized 는 False 로 남음) 장애가 끝난 뒤 다시 요청하면 LLM 요약을 받는다.
+
+
+def summarize_metadata(metadata, user, refresh=False, before_llm=None, on_text=None, fallback=False):
+    """
+    요약을 만들어 metadata 의 summarized_content/is_summarized 에 저장하고 요약을 반환합니다. 실패하면 "".
+    before_llm(subject, body) 가 있으면 LLM 이 필요할 때 호출하며, False 를 반환하면 LLM 을 부르지 않는다.
+    on_text(조각) 이 있으면 요약이 만들어지는 대로 조각을 넘긴다. 중간에 실패하면 넘긴 조각과 관계없이 "" 를 반환한다.
+    fallback=True 이고 아직 요약이 없는 메일이면, LLM 장애로 실패했을 때 저장하지 않은 추출 요약을 반환한다.
+    같은 내용의 요약을 기다리다 시간이 지나면 summary_cache.SummaryWaitTimeout 을 낸다.
+    """
+    email_content = metadata.email
+    subject, body = email_content.subject, email_content.text_body
+
+    streamed = False
+
+    def stream_text(part):
+        nonlocal streamed
+        streamed = True
+        on_text(part)
+
+    key = summary_cache.content_key(subject, body)
+    shared = None
+    if not refresh and len(clean_body(body or "")) < settings.SUMMARY_LOCAL_MAX_CHARS:
+        # 짧은 메일은 LLM 을 기다릴 만큼의 요약이 필요 없다
+        metrics.increment("summary.local")
+        summary = summarize_locally(subject, body)
+    elif not refresh and (shared := summary_cache.get(key)) is not None:
+        summary = shared.summary
+    else:
+        summary = None if refresh else near_duplicates.reusable_summary(metadata, user)
+        if not summary and before_llm is not None and not before_llm(subject, body):
+            # before_llm 은 single-flight 밖에서 확인한다. (안에서 거절하면 같은 요약을 기다리던 다른 요청도 실패한다)
+            summary = ""
+        elif not summary:
+
+            def call_llm():
+                if on_text is not None:
+                    return stream_email_content(subject, body, stream_text)
+                return summarize_email_content(subject, body)
+
+            shared = summary_cache.summarize_once(key, call_llm, refresh=refresh)
+            summary = shared.summary if shared is not None else ""
+            if shared is not None and refresh:
+                # 공유 요약을 쓰던 다른 메일의 사본도 맞춰 둔다 (공유 항목이 만료된 뒤에도 새 요약이 보이도록)
+                EmailMetadata.objects.filter(shared_summary=shared).update(summarized_content=summary)
+
+    if not summary and fallback and not streamed and not metadata.is_summarized and not llm_available():
+        metrics.increment("summary.local_fallback")
+        summary = metadata.summarized_content = summarize_locally(subject, body)
+        if on_text is not None:
+            on_text(summary)
+        return summary
+
+    if summary:
+        metadata.summarized_content = summary
+        metadata.is_summarized = True
+        metadata.shared_summary = shared
+        metadata.save(update_fields=["summarized_content", "is_summarized", "shared_summary"])
+        if on_text is not None and not streamed:
+            on_text(summary)
+    return summary
@@ -0,0 +1,177 @@
+import hashlib
+import re
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from email_content.models import SummaryCache, SummaryLease
+from email_metadata.threads import normalize_subject
+from utils import metrics
+from utils.llm_batching import clean_body
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+from utils.summarizer import SUMMARY_TIMEOUT, SYSTEM_INSTRUCTION
+
+# 메일 요약 공유 캐시. EmailSummarizeView 가 LLM 을 부르기 전에 조회하고, 새 요약을 저장한다.
+# 요약은 메일 내용에서만 만들어지므로 같은 내용이면 계정/사용자와 관계없이 공유한다.
+# 항목은 SUMMARY_CACHE_TTL_DAYS 동안 쓰이지 않으면 만료되고,
+# SUMMARY_CACHE_MAX_ENTRIES 를 넘으면 가장 오래 쓰이지 않은 항목부터 지운다. (LRU)
+# 항목이 지워져도 EmailMetadata.summarized_content 에 사본이 남는다.
+#
+# 같은 내용의 요약 요청이 동시에 여러 번 와도(더블 클릭, 여러 기기) LLM 은 한 번만 부른다. (summarize_once)
+#   - 프로세스 안: SingleFlight 로 먼저 온 요청만 실행하고 나머지는 그 결과를 기다린다.
+#   - 프로세스 사이: SummaryLease 행을 먼저 만든 프로세스만 실행하고 나머지는 SummaryCache 에 결과가 생기길 기다린다.
+#   기다리는 시간은 SUMMARY_WAIT_TIMEOUT 까지이며, 넘으면 SummaryWaitTimeout 을 낸다.
+
+# 본문은 정리한 뒤 앞부분만 키에 넣는다
+BODY_KEY_CHARS = 20000
+PRUNE_INTERVAL = 600  # 초
+
+_WHITESPACE = re.compile(r"\s+")
+# 요약 지시문이 바뀌면 이전 요약을 쓰지 않도록 키에 넣는다
+_INSTRUCTION_DIGEST = hashlib.sha1(SYSTEM_INSTRUCTION.encode()).hexdigest()[:12]
+_prune_lock = threading.Lock()
+_last_pruned = 0.0
+
+# 임대는 LLM 마감 시간보다 넉넉히 잡는다 (프로세스가 죽으면 이 시간이 지난 뒤 다른 프로세스가 가져간다)
+LEASE_SECONDS = SUMMARY_TIMEOUT * 2
+LEASE_POLL_INTERVAL = 0.5  # 초
+
+_flights = SingleFlight()
+
+
+class SummaryWaitTimeout(Exception):
+    """같은 내용의 요약을 기다리다 SUMMARY_WAIT_TIMEOUT 이 지난 경우"""
+
+
+def content_key(subject, body):
+    """정규화한 제목과 정리한 본문(HTML/인용문/서명 제외)으로 키를 만든다."""
+    subject, _is_reply = normalize_subject(subject or "")
+    body = _WHITESPACE.sub(" ", clean_body(body or "", limit=BODY_KEY_CHARS)).strip()
+    return hashlib.sha256(f"{_INSTRUCTION_DIGEST}\n{subject.lower()}\n{body}".encode()).hexdigest()
+
+
+def _expires_before():
+    return timezone.now() - timedelta(days=settings.SUMMARY_CACHE_TTL_DAYS)
+
+
+def get(key):
+    """키에 해당하는 유효한 항목을 반환합니다. 찾으면 최근 사용 시각을 갱신합니다."""
+    entry = SummaryCache.objects.filter(key=key, last_used_at__gte=_expires_before()).first()
+    if entry is not None:
+        entry.last_used_at = timezone.now()
+        SummaryCache.objects.filter(id=entry.id).update(last_used_at=entry.last_used_at)
+    return entry
+
+
+def put(key, summary):
+    """요약을 저장하고 항목을 반환합니다. 이미 있는 키면 요약을 새 값으로 바꾼다. (재요약)"""
+    # 조회 후 저장하는 트랜잭션 대신 한 문장(upsert)으로 저장한다 (SQLite 에서 동시에 저장해도 잠금 충돌이 나지 않도록)
+    SummaryCache.objects.bulk_create(
+        [SummaryCache(key=key, summary=summary, last_used_at=timezone.now())],
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["summary", "updated_at", "last_used_at"],
+    )
+    _maybe_prune()
+    return SummaryCache.objects.get(key=key)
+
+
+def prune():
+    """만료된 항목과, 최대 개수를 넘는 오래된 항목을 지웁니다. 지운 개수를 반환합니다."""
+    deleted, _ = SummaryCache.objects.filter(last_used_at__lt=_expires_before()).delete()
+    max_entries = settings.SUMMARY_CACHE_MAX_ENTRIES
+    overflow = SummaryCache.objects.order_by("-last_used_at").values_list("last_used_at", flat=True)
+    cutoff = next(iter(overflow[max_entries : max_entries + 1]), None)
+    if cutoff is not None:
+        evicted, _ = SummaryCache.objects.filter(last_used_at__lte=cutoff).delete()
+        deleted += evicted
+    return deleted
+
+
+def _maybe_prune():
+    global _last_pruned
+    with _prune_lock:
+        if time.monotonic() - _last_pruned < PRUNE_INTERVAL:
+            return
+        _last_pruned = time.monotonic()
+    prune()
+
+
+def acquire_lease(key, owner):
+    """요약 생성 임대를 잡습니다. 다른 프로세스가 유효한 임대를 갖고 있으면 False."""
+    now = timezone.now()
+    expires_at = now + timedelta(seconds=LEASE_SECONDS)
+    try:
+        with transaction.atomic():
+            SummaryLease.objects.create(key=key, owner=owner, expires_at=expires_at)
+        return True
+    except IntegrityError:
+        # 만료된 임대(프로세스가 죽은 경우)는 가져온다
+        return bool(SummaryLease.objects.filter(key=key, expires_at__lt=now).update(owner=owner, expires_at=expires_at))
+
+
+def release_lease(key, owner):
+    SummaryLease.objects.filter(key=key, owner=owner).delete()
+
+
+def _wait_for_other(key, since, deadline):
+    """다른 프로세스가 만드는 요약을 기다립니다. 그 프로세스가 실패하고 임대를 놓으면 None."""
+    metrics.increment("summary.lease_waits")
+    entries = SummaryCache.objects.filter(key=key)
+    if since is not None:
+        entries = entries.filter(updated_at__gte=since)
+    while True:
+        entry = entries.first()
+        if entry is not None:
+            return entry
+        if not SummaryLease.objects.filter(key=key, expires_at__gte=timezone.now()).exists():
+            # 임대를 놓기 직전에 저장했을 수 있으므로 한 번 더 확인한다
+            return entries.first()
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise SummaryWaitTimeout(f"summary for {key[:12]} is still being generated")
+        time.sleep(min(LEASE_POLL_INTERVAL, remaining))
+
+
+def _summarize_with_lease(key, summarize, refresh, deadline):
+    started = timezone.now()
+    owner = uuid.uuid4().hex
+    while not acquire_lease(key, owner):
+        entry = _wait_for_other(key, started if refresh else None, deadline)
+        # 재요약인데 다른 요청이 새 요약 없이 끝났으면(저장된 요약을 그대로 돌려준 경우 등) 직접 만든다
+        if entry is not None or not refresh:
+            return entry
+    try:
+        # 임대를 잡는 사이 다른 프로세스가 끝냈을 수 있다
+        entry = None if refresh else get(key)
+        if entry is None:
+            summary = summarize()
+            entry = put(key, summary) if summary else None
+        return entry
+    finally:
+        release_lease(key, owner)
+
+
+def summarize_once(key, summarize, refresh=False):
+    """
+    summarize() 로 key 의 요약을 만들어 저장하고 SummaryCache 항목을 반환합니다. 실패하면 None.
+    같은 key 의 요약이 이미 만들어지는 중이면 LLM 을 다시 부르지 않고 그 결과를 기다립니다.
+    refresh=True (재요약) 이면 이미 저장된 요약이 있어도 새로 만듭니다.
+    """
+    timeout = settings.SUMMARY_WAIT_TIMEOUT
+    deadline = time.monotonic() + timeout
+    try:
+        # 재요약은 일반 요약의 결과(이미 저장된 요약일 수 있다)를 받지 않도록 따로 묶는다
+        entry, shared = _flights.do(
+            (key, refresh), lambda: _summarize_with_lease(key, summarize, refresh, deadline), timeout
+        )
+    except SingleFlightTimeout as exc:
+        raise SummaryWaitTimeout(str(exc)) from exc
+    if shared:
+        metrics.increment("summary.single_flight_shared")
+    return entry
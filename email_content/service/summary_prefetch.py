@@ -0,0 +1,140 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import SummaryBudget
+from email_content.service.summaries import summarize_metadata
+from email_content.service.summary_cache import SummaryWaitTimeout
+from email_metadata.models import EmailMetadata
+from utils import metrics
+from utils.llm_batching import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# 동기화 후 미리 요약.
+# EmailAccount.prefetch_summaries 를 켠 계정은 동기화가 끝나면 wake() 로 이 작업자를 깨우고,
+# 최근에 받은 안 읽은 받은편지함 메일을 백그라운드에서 요약해 둔다. 사용자가 요약을 열 때 바로 보이도록 하기 위함이다.
+#   - 분류 대기 중인 메일(스팸일 수 있음)과 본문이 SUMMARY_PREFETCH_MIN_CHARS 보다 짧은 메일은 건너뛴다.
+#     분류 대기 메일은 classification_worker 가 분류를 마친 뒤 다시 깨운다.
+#   - 요약은 summaries.summarize_metadata 로 만들므로, 공유 요약/유사 메일 요약이 있으면 LLM 을 부르지 않는다.
+#   - LLM 이 필요할 때만 계정별 하루 토큰 예산(SummaryBudget, SUMMARY_PREFETCH_DAILY_TOKENS)에서 어림값을 차감하고,
+#     예산이 모자라면 부르지 않는다. (같은 요약을 기다리는 사용자 요청이 실패하지 않도록 single-flight 에 들어가기 전에 확인)
+#   - 계정 하나의 메일은 SUMMARY_PREFETCH_CONCURRENCY 개씩 동시에 요약한다.
+
+# 요약 응답의 토큰 수 어림값 (입력 토큰에 더해 예산에서 차감)
+OUTPUT_TOKENS = 300
+# 이보다 오래된 예산 기록은 지운다
+BUDGET_KEEP_DAYS = 7
+
+
+def reserve_tokens(account_id, tokens):
+    """오늘 예산에서 tokens 를 차감합니다. 예산이 모자라면 차감하지 않고 False 를 반환합니다."""
+    today = timezone.localdate()
+    SummaryBudget.objects.get_or_create(account_id=account_id, day=today)
+    reserved = SummaryBudget.objects.filter(
+        account_id=account_id, day=today, tokens_used__lte=settings.SUMMARY_PREFETCH_DAILY_TOKENS - tokens
+    ).update(tokens_used=F("tokens_used") + tokens)
+    if not reserved:
+        metrics.increment("summary_prefetch.over_budget")
+    return bool(reserved)
+
+
+def candidates(account):
+    return (
+        EmailMetadata.objects.filter(
+            account=account,
+            folder="inbox",
+            is_read=False,
+            is_summarized=False,
+            classification_pending=False,
+            deleted_at__isnull=True,
+            received_at__gte=timezone.now() - timedelta(hours=settings.SUMMARY_PREFETCH_WINDOW_HOURS),
+        )
+        .annotate(body_length=Length("email__text_body"))
+        .filter(body_length__gte=settings.SUMMARY_PREFETCH_MIN_CHARS)
+        .select_related("email")
+        .order_by("-received_at")[: settings.SUMMARY_PREFETCH_BATCH_SIZE]
+    )
+
+
+def prefetch_account(account_id):
+    """계정의 미리 요약 대상 메일을 요약합니다. 요약한 메일 수를 반환합니다."""
+    account = EmailAccount.objects.filter(id=account_id, prefetch_summaries=True).select_related("user").first()
+    if account is None:
+        return 0
+    SummaryBudget.objects.filter(
+        account_id=account_id, day__lt=timezone.localdate() - timedelta(days=BUDGET_KEEP_DAYS)
+    ).delete()
+    rows = list(candidates(account))
+    if not rows:
+        return 0
+    # 동시에 요약하는 스레드들이 오늘 예산 행을 함께 만들지 않도록 미리 만든다
+    SummaryBudget.objects.get_or_create(account_id=account_id, day=timezone.localdate())
+
+    def within_budget(subject, body):
+        return reserve_tokens(account.id, estimate_tokens(f"{subject or ''}\n{body or ''}") + OUTPUT_TOKENS)
+
+    def summarize(metadata):
+        try:
+            return bool(summarize_metadata(metadata, account.user, before_llm=within_budget))
+        except SummaryWaitTimeout:
+            # 사용자가 직접 요청한 요약이 만들어지는 중이다
+            return False
+        except Exception:
+            # 한 메일이 실패해도 나머지는 계속 요약한다
+            logger.exception("summary prefetch failed for metadata %s", metadata.id)
+            return False
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=settings.SUMMARY_PREFETCH_CONCURRENCY) as executor:
+        summarized = sum(executor.map(summarize, rows))
+    metrics.increment("summary_prefetch.summarized", summarized)
+    logger.info("prefetched %d/%d summaries for %s", summarized, len(rows), account.address)
+    return summarized
+
+
+class SummaryPrefetcher:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pending = set()
+        self._thread = None
+
+    def wake(self, account_id):
+        """계정의 동기화가 끝났음을 알립니다. 작업자 스레드가 없으면 띄웁니다."""
+        if not settings.SUMMARY_PREFETCH_ENABLED:
+            return
+        with self._lock:
+            self._pending.add(account_id)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="summary-prefetcher", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        break
+                    account_id = self._pending.pop()
+                try:
+                    prefetch_account(account_id)
+                except Exception:
+                    logger.exception("summary prefetch failed for account %s", account_id)
+                finally:
+                    close_old_connections()
+
+
+summary_prefetcher = SummaryPrefetcher()
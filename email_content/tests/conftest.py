@@ -0,0 +1,15 @@
+import pytest
+
+from email_content.service import classification
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """LLM 분류 대신 subject -> 결과 표를 돌려준다. 표에 없는 메일은 LLM 응답에서 빠진 것으로 본다."""
+    verdicts = {}
+
+    def classify_emails_in_batch(emails, **profile):
+        return {email["id"]: verdicts[email["subject"]] for email in emails if email["subject"] in verdicts}
+
+    monkeypatch.setattr(classification, "classify_emails_in_batch", classify_emails_in_batch)
+    return verdicts
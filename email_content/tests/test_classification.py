@@ -0,0 +1,82 @@
+from contact.models import Contact
+from email_account.models import EmailAccount, SenderReputation
+from email_content.service.classification import classify_batch
+from email_content.service.reclassification import start_job
+from user.models import User
+
+
+def make_account():
+    user = User.objects.create(user_id="classification")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def email(uid, from_header, headers=None):
+    return {
+        "uid": uid,
+        "from_header": from_header,
+        "subject": "안내",
+        "text_body": "",
+        "headers": headers or {},
+        "message_id": f"<{uid}@example.com>",
+    }
+
+
+def test_contact_is_allowlisted(db):
+    account = make_account()
+    Contact.objects.create(account=account, address="kim@example.com")
+
+    results, tiers = classify_batch(account, [email("1", "Kim <kim@example.com>", {"X-Spam-Flag": "YES"})])
+    assert (results["1"], tiers["1"]) == ("inbox", "allowlist")
+
+
+def test_own_address_is_not_allowlisted(db):
+    # From 은 위조할 수 있으므로 내 주소를 사칭한 메일도 다음 단계에서 걸러져야 한다
+    account = make_account()
+
+    results, tiers = classify_batch(account, [email("1", "Me <ME@example.com>", {"X-Spam-Flag": "YES"})], learn=False)
+    assert (results["1"], tiers["1"]) == ("spam", "header")
+
+
+def sale(uid):
+    mail = email(uid, "News <news@shop.example.com>")
+    mail["subject"] = f"세일 {uid}"
+    return mail
+
+
+def test_llm_reputation_is_reset_on_profile_change(db, llm):
+    account = make_account()
+    for i in range(5):
+        mail = sale(str(i))
+        llm[mail["subject"]] = "spam"
+        _results, tiers = classify_batch(account, [mail])
+        assert tiers[mail["uid"]] == "llm"
+
+    _results, tiers = classify_batch(account, [sale("next")], learn=False)
+    assert tiers["next"] == "reputation_spam"
+
+    # 프로필이 바뀌면 이전 프로필 기준의 LLM 판정은 평판에서 빠지고, LLM 이 다시 판단한다
+    start_job(account)
+    assert SenderReputation.objects.get(account=account).llm_spam_weight == 0
+    llm["세일 next"] = "inbox"
+    results, tiers = classify_batch(account, [sale("next")], learn=False)
+    assert (results["next"], tiers["next"]) == ("inbox", "llm")
+
+
+def test_local_rule_verdicts_build_reputation(db):
+    account = make_account()
+    account.filter_rules = {"factors": [{"id": "sale", "type": "keyword", "content": "세일", "weight": 6}]}
+    account.save()
+    mails = [email(str(i), "News <news@shop.example.com>") for i in range(5)]
+    for mail in mails:
+        mail["subject"] = "세일"
+    classify_batch(account, mails)
+
+    mail = email("next", "News <news@shop.example.com>")
+    mail["subject"] = "새 상품 안내"
+    _results, tiers = classify_batch(account, [mail], learn=False)
+    assert tiers["next"] == "reputation_spam"
+
+    # 규칙으로 쌓인 평판은 프로필이 바뀌어도 남는다
+    start_job(account)
+    _results, tiers = classify_batch(account, [mail], learn=False)
+    assert tiers["next"] == "reputation_spam"
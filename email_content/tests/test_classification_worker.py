@@ -0,0 +1,133 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_content.service.classification_worker import classify_pending
+from email_metadata.models import EmailMetadata
+from email_metadata.services import create_metadata
+from user.models import User
+
+
+def make_pending(account, subject):
+    content = EmailContent.objects.create(
+        message_id=f"<{subject}@example.com>",
+        subject=subject,
+        from_header=f"{subject} <news@{subject}.example.com>",
+        to_header=[account.address],
+        text_body=f"{subject} 본문입니다.",
+        date=timezone.now(),
+    )
+    return create_metadata(
+        account=account,
+        email=content,
+        uid=subject,
+        folder="inbox",
+        received_at=timezone.now(),
+        classification_pending=True,
+    )
+
+
+def make_account():
+    user = User.objects.create(user_id="worker")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def state(metadata):
+    metadata.refresh_from_db()
+    return metadata.folder, metadata.classification_pending
+
+
+def retry_now():
+    # 재시도 간격이 지난 것으로 만든다
+    EmailMetadata.objects.filter(classification_retry_at__isnull=False).update(classification_retry_at=timezone.now())
+
+
+def test_only_classified_mails_leave_pending(db, llm):
+    account = make_account()
+    spam, ham, missing = (make_pending(account, subject) for subject in ("spam", "ham", "missing"))
+    llm.update({"spam": "spam", "ham": "inbox"})
+
+    assert classify_pending() == 2
+    assert state(spam) == ("spam", False)
+    assert state(ham) == ("inbox", False)
+    # LLM 응답에서 빠진 메일은 다음에 다시 분류한다
+    assert state(missing) == ("inbox", True)
+
+    llm["missing"] = "spam"
+    # 재시도 간격이 지나기 전에는 다시 시도하지 않는다
+    assert classify_pending() == 0
+    retry_now()
+    assert classify_pending() == 1
+    assert state(missing) == ("spam", False)
+
+
+def test_llm_outage_keeps_everything_pending(db, llm):
+    account = make_account()
+    rows = [make_pending(account, subject) for subject in ("a", "b")]
+
+    assert classify_pending() == 0
+    assert [state(metadata) for metadata in rows] == [("inbox", True), ("inbox", True)]
+
+
+def test_user_move_is_not_overridden(db, llm):
+    account = make_account()
+    metadata = make_pending(account, "moved")
+    llm["moved"] = "spam"
+    # 분류 도중 사용자가 직접 옮긴 경우와 같다 (folder 가 이미 inbox 가 아니다)
+    EmailMetadata.objects.filter(id=metadata.id).update(folder="archive")
+
+    classify_pending()
+    assert state(metadata) == ("archive", False)
+
+
+def test_command_stops_when_only_failed_mails_remain(db, llm):
+    account = make_account()
+    make_pending(account, "ok")
+    make_pending(account, "missing")
+    llm["ok"] = "inbox"
+
+    out = StringIO()
+    call_command("classify_pending", batch_size=1, stdout=out)
+    assert "분류 완료 (1건)" in out.getvalue()
+    assert list(EmailMetadata.objects.filter(classification_pending=True).values_list("uid", flat=True)) == ["missing"]
+
+
+def test_failing_mail_does_not_starve_newer_mail(db, llm):
+    account = make_account()
+    broken = make_pending(account, "broken")
+    newer = make_pending(account, "newer")
+    llm["newer"] = "inbox"
+
+    assert classify_pending(limit=1) == 0
+    # 실패한 메일은 재시도 시각까지 뒤로 밀리므로 다음 배치는 새 메일을 가져간다
+    assert classify_pending(limit=1) == 1
+    assert state(newer) == ("inbox", False)
+    assert state(broken) == ("inbox", True)
+
+
+def test_gives_up_after_max_attempts(db, llm, monkeypatch):
+    monkeypatch.setattr(settings, "CLASSIFICATION_MAX_ATTEMPTS", 3)
+    account = make_account()
+    metadata = make_pending(account, "broken")
+
+    delays = []
+    for _ in range(2):
+        before = timezone.now()
+        assert classify_pending() == 0
+        metadata.refresh_from_db()
+        delays.append((metadata.classification_retry_at - before).total_seconds())
+        retry_now()
+    assert metadata.classification_attempts == 2
+    # 실패할 때마다 간격이 두 배로 늘어난다
+    delay = settings.CLASSIFICATION_RETRY_DELAY
+    assert delay <= delays[0] < delay + 5
+    assert 2 * delay <= delays[1] < 2 * delay + 5
+
+    # 마지막 시도까지 실패하면 inbox 로 확정하고 더 시도하지 않는다
+    assert classify_pending() == 1
+    assert state(metadata) == ("inbox", False)
+    assert classify_pending() == 0
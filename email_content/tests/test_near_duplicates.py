@@ -0,0 +1,143 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent, MinHashBucket
+from email_content.service import classification_cache, near_duplicates
+from email_metadata.services import create_metadata
+from user.models import User
+from utils import minhash
+
+CAMPAIGN = (
+    "안녕하세요 {name} 고객님, 이번 주 특가 상품을 소개합니다. 최대 50% 할인된 가격으로 겨울 코트와 니트를 만나보세요. "
+    "쿠폰 코드는 WINTER 입니다. 자세한 내용은 https://shop.example.com/track?u={uid} 에서 확인하세요. "
+    "이번 행사는 이번 주 일요일까지 진행됩니다. 수신을 원하지 않으시면 {uid}@mail.example.com 로 알려 주세요."
+)
+OTHER = (
+    "Quarterly report attached, please review the numbers before our meeting on Friday "
+    "and let me know if anything looks off."
+)
+NOW = timezone.now()
+
+
+def make_content(uid, body=None):
+    body = body or CAMPAIGN.format(name=f"고객{uid}", uid=uid)
+    signature = near_duplicates.compute_signatures([{"subject": "겨울 특가", "text_body": body}])[0]
+    return EmailContent.objects.create(
+        message_id=f"<{uid}@example.com>",
+        subject="겨울 특가",
+        from_header="Shop <news@shop.example.com>",
+        text_body=body,
+        date=NOW,
+        minhash=minhash.to_bytes(signature),
+    )
+
+
+def make_account(user_id):
+    user = User.objects.create(user_id=user_id)
+    return EmailAccount.objects.create(user=user, address=f"{user_id}@example.com", domain="imap.gmail.com")
+
+
+def receive(account, content, minutes=0, **fields):
+    return create_metadata(
+        account=account,
+        email=content,
+        uid=f"{account.id}.{content.id}",
+        folder="inbox",
+        received_at=NOW + timedelta(minutes=minutes),
+        **fields,
+    )
+
+
+def email_data(content):
+    return {
+        "uid": str(content.id),
+        "subject": content.subject,
+        "from_header": content.from_header,
+        "text_body": content.text_body,
+        "minhash": content.minhash,
+    }
+
+
+def duplicate_of(content):
+    content.refresh_from_db()
+    return content.duplicate_of_id
+
+
+def test_index_groups_copies_under_the_oldest_and_indexes_only_roots(db):
+    first, second, other = make_content(1), make_content(2), make_content(3, OTHER)
+    # 같은 배치 안의 메일끼리도 묶인다
+    near_duplicates.index([second, first, other])
+    later = make_content(4)
+    near_duplicates.index([later])
+
+    assert (duplicate_of(first), duplicate_of(second), duplicate_of(other), duplicate_of(later)) == (
+        None,
+        first.id,
+        None,
+        first.id,
+    )
+    # 복사본은 색인하지 않으므로 같은 뉴스레터가 계속 와도 버킷 행이 늘지 않는다
+    assert set(MinHashBucket.objects.values_list("email_id", flat=True)) == {first.id, other.id}
+    assert MinHashBucket.objects.filter(email=first).count() == minhash.BANDS
+
+
+def test_find_similar_caps_candidates_per_bucket(db, monkeypatch):
+    # 서로 다른 묶음의 대표가 같은 버킷에 몰린 경우와 같다
+    contents = [make_content(uid) for uid in range(1, 4)]
+    MinHashBucket.objects.bulk_create(
+        MinHashBucket(email=content, bucket=int(bucket))
+        for content in contents
+        for bucket in minhash.band_buckets(minhash.from_bytes(content.minhash))
+    )
+    monkeypatch.setattr(near_duplicates, "MAX_CANDIDATES", 2)
+
+    [found] = near_duplicates.find_similar([minhash.from_bytes(contents[2].minhash)])
+    assert {email_id for email_id, _score in found} == {contents[0].id, contents[1].id}
+
+
+def test_cached_classifications_reuse_root_or_recent_copy(db):
+    account = make_account("dup")
+    fingerprint = classification_cache.profile_fingerprint(account)
+    root, copy = make_content(1), make_content(2)
+    near_duplicates.index([root, copy])
+    incoming = make_content(3)
+
+    assert near_duplicates.cached_classifications([email_data(incoming)], fingerprint) == {}
+    # 대표의 캐시 항목이 없어도 복사본을 LLM 이 분류한 결과를 쓴다
+    classification_cache.set_many(account, {classification_cache.content_key(email_data(copy), fingerprint): "spam"})
+    assert near_duplicates.cached_classifications([email_data(incoming)], fingerprint) == {str(incoming.id): "spam"}
+    # 다른 프로필의 결과는 쓰지 않는다
+    assert near_duplicates.cached_classifications([email_data(incoming)], "other") == {}
+
+
+def test_reusable_summary_is_shared_only_within_the_user(db):
+    mine, theirs = make_account("mine"), make_account("theirs")
+    root, copy, unrelated = make_content(1), make_content(2), make_content(3, OTHER)
+    near_duplicates.index([root, copy, unrelated])
+
+    receive(theirs, root, is_summarized=True, summarized_content="다른 사용자의 요약")
+    target = receive(mine, copy)
+    assert near_duplicates.reusable_summary(target, mine.user) is None
+
+    receive(mine, root, is_summarized=True, summarized_content="겨울 특가 안내")
+    assert near_duplicates.reusable_summary(target, mine.user) == "겨울 특가 안내"
+    assert near_duplicates.reusable_summary(receive(mine, unrelated), mine.user) is None
+
+
+def test_collapse_keeps_latest_mail_per_group(db):
+    account = make_account("collapse")
+    root, copy, other = make_content(1), make_content(2), make_content(3, OTHER)
+    near_duplicates.index([root, copy, other])
+    older = receive(account, root, minutes=0)
+    newer = receive(account, copy, minutes=5)
+    unrelated = receive(account, other, minutes=1)
+
+    client = APIClient()
+    client.force_authenticate(account.user)
+    ids = [row["id"] for row in client.get("/api/email/", {"folder": "inbox", "collapse": "duplicates"}).json()]
+    assert sorted(ids) == sorted([newer.id, unrelated.id])
+    ids = [row["id"] for row in client.get("/api/email/", {"folder": "inbox"}).json()]
+    assert sorted(ids) == sorted([older.id, newer.id, unrelated.id])
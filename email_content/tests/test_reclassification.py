@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import override_settings
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent, ReclassificationJob
+from email_content.service import reclassification
+from email_content.service.reclassification import run_chunk, run_due_jobs, start_job
+from email_metadata.services import create_metadata
+from user.models import User
+
+
+def make_account():
+    user = User.objects.create(user_id="reclassify")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, subject, folder="inbox"):
+    content = EmailContent.objects.create(
+        message_id=f"<{subject}@example.com>",
+        subject=subject,
+        from_header=f"{subject} <news@{subject}.example.com>",
+        to_header=[account.address],
+        text_body=f"{subject} 본문입니다.",
+        date=timezone.now(),
+    )
+    return create_metadata(account=account, email=content, uid=subject, folder=folder, received_at=timezone.now())
+
+
+def folder(metadata):
+    metadata.refresh_from_db()
+    return metadata.folder
+
+
+def reloaded(job):
+    return ReclassificationJob.objects.get(id=job.id)
+
+
+@override_settings(RECLASSIFY_CHUNK_SIZE=3)
+def test_cursor_stops_before_first_failed_mail(db, llm):
+    account = make_account()
+    # id 내림차순으로 진행하므로 c, b, a 순서로 분류된다
+    a, b, c = (make_mail(account, subject) for subject in ("a", "b", "c"))
+    llm.update({"a": "spam", "c": "spam"})
+    job = start_job(account)
+    assert job.total == 3
+
+    assert run_chunk(job) is True
+    job = reloaded(job)
+    assert (job.cursor, job.processed, job.moved_to_spam) == (c.id, 1, 1)
+    # b 가 실패했으므로 그 뒤의 a 는 이번 청크에서 옮기지 않는다
+    assert (folder(c), folder(b), folder(a)) == ("spam", "inbox", "inbox")
+
+    llm["b"] = "inbox"
+    assert run_chunk(job) is True
+    job = reloaded(job)
+    assert (job.cursor, job.processed, job.moved_to_spam) == (a.id, 3, 2)
+    assert folder(a) == "spam"
+
+    assert run_chunk(job) is False
+    assert reloaded(job).status == "completed"
+
+
+def test_llm_outage_keeps_cursor(db, llm):
+    account = make_account()
+    make_mail(account, "a")
+    job = start_job(account)
+
+    assert run_chunk(job) is True
+    job = reloaded(job)
+    assert (job.status, job.cursor, job.processed) == ("running", None, 0)
+    assert job.error
+
+
+@override_settings(RECLASSIFY_CHUNK_SIZE=3, RECLASSIFY_MAX_ATTEMPTS=2)
+def test_mail_that_keeps_failing_is_skipped(db, llm):
+    account = make_account()
+    a, b, c = (make_mail(account, subject) for subject in ("a", "b", "c"))
+    llm.update({"a": "spam", "b": "spam"})
+    job = start_job(account)
+
+    assert run_chunk(job) is True
+    job = reloaded(job)
+    assert (job.cursor, job.failures) == (None, 1)
+    # 실패할 때마다 청크 간격이 두 배로 늘어난다
+    assert reclassification._interval(job) == 2 * settings.RECLASSIFY_CHUNK_INTERVAL
+
+    # 마지막 시도까지 실패하면 c 만 건너뛰고 b, a 는 다음 청크에서 분류한다
+    assert run_chunk(job) is True
+    job = reloaded(job)
+    assert (job.cursor, job.failures, job.skipped, job.processed, job.error) == (c.id, 0, 1, 0, "")
+    assert run_chunk(job) is True
+    assert run_chunk(reloaded(job)) is False
+    job = reloaded(job)
+    assert (job.status, job.processed, job.skipped, job.moved_to_spam) == ("completed", 2, 1, 2)
+    assert (folder(c), folder(b), folder(a)) == ("inbox", "spam", "spam")
+
+
+@override_settings(RECLASSIFY_MAX_ATTEMPTS=3)
+def test_persistent_outage_fails_job(db, llm):
+    account = make_account()
+    make_mail(account, "a")
+    job = start_job(account)
+
+    assert run_chunk(job) is True
+    assert run_chunk(reloaded(job)) is True
+    # 청크 전체가 계속 실패하면 running 으로 남지 않고 실패로 끝난다
+    assert run_chunk(reloaded(job)) is False
+    job = reloaded(job)
+    assert (job.status, job.failures, job.cursor) == ("failed", 3, None)
+    assert job.error and job.finished_at
+    assert run_due_jobs() is False
+
+
+@override_settings(RECLASSIFY_CHUNK_SIZE=1)
+def test_restart_resumes_from_cursor(db, llm):
+    account = make_account()
+    old, new = make_mail(account, "old", folder="spam"), make_mail(account, "new")
+    llm.update({"old": "inbox", "new": "inbox"})
+    job = start_job(account)
+    run_chunk(job)
+    assert reloaded(job).cursor == new.id
+
+    # 작업자가 재시작되어도 DB 에 저장된 cursor 부터 이어서 진행한다
+    with override_settings(RECLASSIFY_CHUNK_INTERVAL=0):
+        assert run_due_jobs() is True
+        assert run_due_jobs() is False
+    job = reloaded(job)
+    assert (job.status, job.cursor, job.processed, job.moved_to_inbox) == ("completed", old.id, 2, 1)
+    assert folder(old) == "inbox"
+
+
+def test_claim_is_exclusive_and_rate_limited(db):
+    job = start_job(make_account())
+    other = reloaded(job)
+
+    assert reclassification._claim(job, interval=60) is True
+    # 같은 updated_at 을 본 다른 작업자는 가져가지 못한다
+    assert reclassification._claim(other, interval=0) is False
+
+    ReclassificationJob.objects.filter(id=job.id).update(status="running")
+    job = reloaded(job)
+    assert reclassification._claim(job, interval=60) is False
+    ReclassificationJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timedelta(seconds=61))
+    assert reclassification._claim(reloaded(job), interval=60) is True
+
+
+def test_new_job_cancels_running_job(db, llm):
+    account = make_account()
+    make_mail(account, "a")
+    first = start_job(account)
+    second = start_job(account)
+
+    assert reloaded(first).status == "cancelled"
+    # 취소된 작업의 객체로 청크를 돌려도 되살아나지 않는다
+    assert run_chunk(first) is False
+    assert reloaded(first).status == "cancelled"
+    assert reloaded(second).status == "pending"
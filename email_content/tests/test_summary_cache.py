@@ -0,0 +1,58 @@
+import threading
+import time
+
+from email_content.service import summary_cache
+from email_content.service.summary_cache import put, summarize_once
+
+
+def run(results, name, *args, **kwargs):
+    def target():
+        entry = summarize_once(*args, **kwargs)
+        results[name] = entry.summary if entry else None
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def test_concurrent_requests_share_one_call(db):
+    calls, release = [], threading.Event()
+
+    def summarize():
+        calls.append(1)
+        release.wait(5)
+        return "요약"
+
+    results = {}
+    threads = [run(results, name, "key", summarize) for name in ("a", "b")]
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == {"a": "요약", "b": "요약"}
+    assert len(calls) == 1
+
+
+def test_resummarize_does_not_take_in_flight_summary(db, monkeypatch):
+    put("key", "이전 요약")
+    started, release = threading.Event(), threading.Event()
+    original_get = summary_cache.get
+
+    def slow_get(key):
+        # 일반 요약 요청이 저장된 요약을 꺼내는 도중에 재요약 요청이 들어온 경우
+        started.set()
+        release.wait(5)
+        return original_get(key)
+
+    monkeypatch.setattr(summary_cache, "get", slow_get)
+    results = {}
+    normal = run(results, "normal", "key", lambda: "쓰이지 않음")
+    started.wait(5)
+    refresh = run(results, "refresh", "key", lambda: "새 요약", refresh=True)
+    time.sleep(0.2)
+    release.set()
+    normal.join(5)
+    refresh.join(5)
+
+    assert results == {"normal": "이전 요약", "refresh": "새 요약"}
+    assert original_get("key").summary == "새 요약"
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_content.service import classification_worker, summaries
+from email_content.service.summaries import summarize_metadata
+from email_content.service.summary_prefetch import prefetch_account
+from email_metadata.services import create_metadata
+from user.models import User
+
+BODY = "다음 주 회의 일정과 준비물을 안내드립니다. 자료는 미리 검토해 주세요. " * 20
+
+
+@pytest.fixture
+def llm_summaries(monkeypatch):
+    calls = []
+
+    def summarize_email_content(subject, body):
+        calls.append(subject)
+        return f"{subject} 요약"
+
+    monkeypatch.setattr(summaries, "summarize_email_content", summarize_email_content)
+    return calls
+
+
+def make_account(prefetch=True):
+    user = User.objects.create(user_id="prefetch")
+    return EmailAccount.objects.create(
+        user=user, address="me@example.com", domain="imap.gmail.com", prefetch_summaries=prefetch
+    )
+
+
+def make_mail(account, subject, body=BODY, **fields):
+    content = EmailContent.objects.create(
+        message_id=f"<{subject}@example.com>",
+        subject=subject,
+        from_header=f"{subject} <news@{subject}.example.com>",
+        to_header=[account.address],
+        text_body=body,
+        date=timezone.now(),
+    )
+    fields.setdefault("folder", "inbox")
+    return create_metadata(account=account, email=content, uid=subject, received_at=timezone.now(), **fields)
+
+
+def test_prefetch_summarizes_only_candidates(db, llm_summaries):
+    account = make_account()
+    make_mail(account, "new")
+    make_mail(account, "read", is_read=True)
+    make_mail(account, "pending", classification_pending=True)
+    make_mail(account, "short", body="짧은 메일입니다.")
+    make_mail(account, "spam", folder="spam")
+
+    assert prefetch_account(account.id) == 1
+    assert llm_summaries == ["new"]
+
+
+def test_prefetch_is_off_unless_enabled(db, llm_summaries):
+    account = make_account(prefetch=False)
+    make_mail(account, "new")
+
+    assert prefetch_account(account.id) == 0
+    assert llm_summaries == []
+
+
+@override_settings(SUMMARY_PREFETCH_DAILY_TOKENS=10)
+def test_prefetch_stops_at_daily_budget(db, llm_summaries):
+    account = make_account()
+    metadata = make_mail(account, "new")
+
+    assert prefetch_account(account.id) == 0
+    assert llm_summaries == []
+    metadata.refresh_from_db()
+    assert not metadata.is_summarized
+
+
+def test_budget_rejection_does_not_fail_waiting_request(db, llm_summaries):
+    account = make_account()
+    metadata = make_mail(account, "new")
+    checking, release = threading.Event(), threading.Event()
+
+    def before_llm(subject, body):
+        # 미리 요약이 예산을 확인하는 동안 사용자가 같은 메일의 요약을 요청한다
+        checking.set()
+        release.wait(5)
+        return False
+
+    results = {}
+    prefetch = threading.Thread(
+        target=lambda: results.setdefault("prefetch", summarize_metadata(metadata, account.user, before_llm=before_llm))
+    )
+    prefetch.start()
+    checking.wait(5)
+    user = threading.Thread(
+        target=lambda: results.setdefault(
+            "user", summarize_metadata(type(metadata).objects.get(id=metadata.id), account.user)
+        )
+    )
+    user.start()
+    time.sleep(0.2)
+    release.set()
+    prefetch.join(5)
+    user.join(5)
+
+    assert results == {"prefetch": "", "user": "new 요약"}
+
+
+def test_classified_pending_mail_wakes_prefetcher(db, llm, monkeypatch):
+    woken = []
+    monkeypatch.setattr(classification_worker.summary_prefetcher, "wake", woken.append)
+    account = make_account()
+    make_mail(account, "ham", classification_pending=True)
+    make_mail(account, "spam", classification_pending=True)
+    llm.update({"ham": "inbox", "spam": "spam"})
+
+    assert classification_worker.classify_pending() == 2
+    assert woken == [account.id]
+
+
+def test_spam_only_batch_does_not_wake_prefetcher(db, llm, monkeypatch):
+    woken = []
+    monkeypatch.setattr(classification_worker.summary_prefetcher, "wake", woken.append)
+    account = make_account()
+    make_mail(account, "spam", classification_pending=True)
+    llm["spam"] = "spam"
+
+    classification_worker.classify_pending()
+    assert woken == []
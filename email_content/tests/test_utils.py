@@ -0,0 +1,25 @@
+from email_content.utils import decode_subject, make_preview, parse_participants
+
+
+def test_make_preview_prefers_text_body():
+    assert make_preview("  안녕하세요\n\n  반갑습니다  ", "<p>html</p>") == "안녕하세요 반갑습니다"
+
+
+def test_make_preview_strips_html():
+    body = "<html><STYLE>p{color:red}</style><script>alert(1)</script><!-- c --><p>Hello&nbsp;<b>world</b></p></html>"
+    assert make_preview("", body) == "Hello world"
+
+
+def test_make_preview_truncates():
+    assert len(make_preview("a" * 500, "")) == 150
+    assert make_preview("", "") == ""
+
+
+def test_decode_subject():
+    assert decode_subject("=?utf-8?b?7ZqM7J2YIOyekOujjA==?=") == "회의 자료"
+    assert decode_subject(None) == ""
+
+
+def test_parse_participants_dedupes_and_lowercases():
+    header = ["Kim <Kim@Example.com>", "kim@example.com, Lee <lee@example.com>", "not-an-address"]
+    assert parse_participants(header) == [("Kim", "kim@example.com"), ("Lee", "lee@example.com")]
@@ -1,3 +1,17 @@
+import html
+import re
+from email.header import decode_header, make_header
+from email.utils import getaddresses
+
+# 로컬 파트 + @ + 점이 있는 도메인으로 이루어진 완전한 주소
+_COMPLETE_ADDRESS = re.compile(r"^[^@\s]+@[^@\s.]+(\.[^@\s.]+)+$")
+# 미리보기 생성용 정규식 (목록 조회마다 쓰이므로 미리 컴파일)
+_STYLE_SCRIPT = re.compile(r"<(style|script).*?</\1>", re.DOTALL | re.IGNORECASE)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+
+
 # domain에 따른 IMAP 설정
 def get_imap_config(domain: str):
     """
@@ -50,3 +64,70 @@ def get_smtp_config(domain: str):
         raise ValueError(f"지원하지 않는 도메인: {domain}")
 
     # return table.get(domain, {"host": f"smtp.{domain}.com", "port": 587, "starttls": True})
+
+
+def _decode_display_name(name: str) -> str:
+    """RFC 2047로 인코딩된 표시 이름을 디코딩한다. 실패하면 원본을 그대로 사용한다."""
+    if not name:
+        return ""
+    try:
+        return str(make_header(decode_header(name))).strip()
+    except Exception:
+        return name.strip()
+
+
+def decode_subject(subject: str) -> str:
+    """RFC 2047 형식으로 인코딩된 제목을 디코딩한다. 실패하면 원본을 그대로 사용한다."""
+    if not subject:
+        return ""
+    try:
+        return str(make_header(decode_header(subject)))
+    except Exception:
+        return subject
+
+
+def parse_participants(header) -> list[tuple[str, str]]:
+    """
+    RFC 5322 주소 헤더를 파싱하여 (표시 이름, 소문자 주소) 튜플 목록을 반환한다.
+    header는 원본 헤더 문자열이거나, 헤더 문자열들의 리스트(to_header 등 JSON 필드)일 수 있다.
+    """
+    if not header:
+        return []
+    values = header if isinstance(header, (list, tuple)) else [header]
+
+    participants = []
+    seen = set()
+    for name, addr in getaddresses([str(v) for v in values if v]):
+        addr = addr.strip().lower()
+        if "@" not in addr or addr in seen:
+            continue
+        seen.add(addr)
+        participants.append((_decode_display_name(name)[:255], addr[:255]))
+    return participants
+
+
+def is_complete_address(term: str) -> bool:
+    """
+    검색어가 완전한 이메일 주소(예: kim@example.com)인지 확인한다.
+    "@gmail.com", "kim@" 같은 일부 주소는 False 이며, 부분 일치로 검색해야 한다.
+    """
+    return bool(_COMPLETE_ADDRESS.match(term or ""))
+
+
+def make_preview(text_body: str, html_body: str, length: int = 150) -> str:
+    """
+    목록 조회용 본문 미리보기를 만든다.
+    text_body가 있으면 사용하고, 없으면 html_body에서 style/script/주석/태그를 제거하여 사용한다.
+    """
+    if text_body:
+        source_text = text_body
+    elif html_body:
+        # HTML 엔티티 디코딩 (e.g., &nbsp; -> ' ') 후 불필요한 부분 제거
+        text = html.unescape(html_body)
+        text = _STYLE_SCRIPT.sub("", text)
+        text = _HTML_COMMENT.sub("", text)
+        source_text = _HTML_TAG.sub("", text)
+    else:
+        return ""
+    # 여러 공백과 개행을 하나의 스페이스로 합치고 양 끝 공백 제거
+    return _WHITESPACE.sub(" ", source_text).strip()[:length]
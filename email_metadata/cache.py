@@ -0,0 +1,78 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from utils import metrics
+
+# 메일 목록 응답 캐시.
+# 사용자마다 '세대(generation)' 번호를 두고 캐시 키에 포함시킨다.
+# 메일이 들어오거나 상태가 바뀌면 해당 사용자의 세대 번호만 올리면 되므로,
+# 어떤 폴더/검색어 조합이 캐시되어 있는지 몰라도 O(1)로 무효화된다. (이전 세대 항목은 TTL 로 자연히 사라진다)
+# 캐시 백엔드는 settings.EMAIL_LIST_CACHE_ALIAS 로 고른다. (기본 locmem, 여러 프로세스면 공유 캐시 사용)
+
+GENERATION_TIMEOUT = None  # 세대 번호는 만료시키지 않는다
+
+
+def _cache():
+    return caches[settings.EMAIL_LIST_CACHE_ALIAS]
+
+
+def _generation_key(user_id):
+    return f"email:list:gen:{user_id}"
+
+
+def generation(user_id):
+    """사용자의 현재 세대 번호를 반환합니다."""
+    cache = _cache()
+    value = cache.get(_generation_key(user_id))
+    if value is None:
+        # 세대 키가 밀려났다가 다시 만들어질 때 예전 번호와 겹치지 않도록 현재 시각으로 시작한다
+        value = time.time_ns()
+        if not cache.add(_generation_key(user_id), value, GENERATION_TIMEOUT):
+            value = cache.get(_generation_key(user_id), value)
+    return value
+
+
+def bump_generation(user_ids):
+    """사용자들의 세대 번호를 올려 캐시된 목록을 모두 무효화합니다."""
+    cache = _cache()
+    for user_id in set(user_ids):
+        try:
+            cache.incr(_generation_key(user_id))
+        except ValueError:
+            cache.set(_generation_key(user_id), time.time_ns(), GENERATION_TIMEOUT)
+    metrics.increment("email_list_cache.invalidate", len(set(user_ids)))
+
+
+def invalidate_accounts(account_ids):
+    """
+    계정들의 소유자 목록 캐시를 무효화합니다.
+    트랜잭션 안에서 호출되면 커밋된 뒤에 무효화하여, 커밋 전 상태가 다시 캐시되지 않도록 합니다.
+    """
+    from email_account.models import EmailAccount
+
+    account_ids = {account_id for account_id in account_ids if account_id is not None}
+    if not account_ids:
+        return
+    user_ids = list(EmailAccount.objects.filter(id__in=account_ids).values_list("user_id", flat=True).distinct())
+    transaction.on_commit(lambda: bump_generation(user_ids))
+
+
+def list_cache_key(user_id, params):
+    """세대 번호와 정렬된 쿼리 파라미터로 목록 캐시 키를 만듭니다."""
+    encoded = "&".join(f"{key}={value}" for key, value in sorted(params))
+    digest = hashlib.sha1(encoded.encode()).hexdigest()
+    return f"email:list:{user_id}:{generation(user_id)}:{digest}"
+
+
+def get_list(key):
+    data = _cache().get(key)
+    metrics.increment("email_list_cache.hit" if data is not None else "email_list_cache.miss")
+    return data
+
+
+def set_list(key, data):
+    _cache().set(key, data, settings.EMAIL_LIST_CACHE_TIMEOUT)
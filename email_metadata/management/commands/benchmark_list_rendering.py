@@ -0,0 +1,105 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.models import EmailMetadata
+from email_metadata.serializers import EmailMetadataListSerializer
+from email_metadata.views import EmailMetadataListView
+from user.models import User
+from utils.renderers import ORJSONRenderer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "메일 목록 응답을 기존 ModelSerializer 경로와 values() 기반 빠른 경로로 각각 만들어 시간을 비교합니다. "
+        "벤치마크용 데이터는 트랜잭션 안에서 만들고 끝나면 롤백합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="목록 행 수 (기본 1000)")
+        parser.add_argument("--repeat", type=int, default=5, help="반복 횟수 (기본 5, 최솟값을 출력)")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["rows"], options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows):
+        # 롤백될 데이터이므로 services 를 거치지 않고 bulk_create 로 바로 만든다
+        user = User.objects.create(user_id="__benchmark__")
+        account = EmailAccount.objects.create(user=user, address="benchmark@example.com", domain="gmail")
+        now = timezone.now()
+        body = "안녕하세요. 이번 주 회의 자료를 공유드립니다. " * 40
+        html_body = "<html><style>p{color:red}</style><body><p>" + body + "</p></body></html>"
+        contents = EmailContent.objects.bulk_create(
+            EmailContent(
+                message_id=f"<bench-{i}@example.com>",
+                subject=f"=?utf-8?b?7ZqM7J2YIOyekOujjA==?= #{i}",
+                from_header="Kim <kim@example.com>",
+                to_header=["benchmark@example.com"],
+                text_body=body if i % 2 else "",
+                html_body="" if i % 2 else html_body,
+                date=now - timedelta(minutes=i),
+            )
+            for i in range(rows)
+        )
+        EmailMetadata.objects.bulk_create(
+            EmailMetadata(
+                account=account,
+                email=content,
+                uid=str(i),
+                folder="inbox",
+                is_read=bool(i % 3),
+                received_at=now - timedelta(minutes=i),
+            )
+            for i, content in enumerate(contents)
+        )
+        return account
+
+    def _measure(self, func, repeat):
+        best, result = None, None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    def _run(self, rows, repeat):
+        account = self._seed(rows)
+        queryset = EmailMetadata.objects.filter(account=account).order_by("-received_at")
+        view = EmailMetadataListView()
+
+        def serializer_path():
+            return JSONRenderer().render(EmailMetadataListSerializer(queryset.all(), many=True).data)
+
+        def projection_path():
+            data = [view.project_row(row) for row in view.project_queryset(queryset.all())]
+            return ORJSONRenderer().render(data)
+
+        old_time, old_body = self._measure(serializer_path, repeat)
+        new_time, new_body = self._measure(projection_path, repeat)
+
+        self.stdout.write(f"행 수: {rows}, 반복: {repeat} (최솟값)")
+        self.stdout.write(f"ModelSerializer + JSONRenderer : {old_time * 1000:8.1f} ms ({len(old_body)} bytes)")
+        self.stdout.write(f"values() 투영 + ORJSONRenderer : {new_time * 1000:8.1f} ms ({len(new_body)} bytes)")
+        self.stdout.write(f"속도 향상: {old_time / new_time:.1f}배")
+
+        if json.loads(old_body) == json.loads(new_body):
+            self.stdout.write(self.style.SUCCESS("두 경로의 응답이 일치합니다."))
+        else:
+            self.stdout.write(self.style.ERROR("두 경로의 응답이 다릅니다."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from email_account.models import EmailAccount
+from email_metadata.threads import rebuild_threads
+
+
+class Command(BaseCommand):
+    help = "계정의 스레드를 처음부터 다시 배정합니다. 스레딩 도입 이전에 저장된 메일을 채울 때 사용합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, action="append", help="대상 EmailAccount ID (생략 시 전체 계정)")
+
+    def handle(self, *args, **options):
+        accounts = EmailAccount.objects.all()
+        if options["account"]:
+            accounts = accounts.filter(id__in=options["account"])
+
+        for account in accounts:
+            count = rebuild_threads(account)
+            self.stdout.write(f"{account.address}: 메일 {count}건 스레드 배정")
+        self.stdout.write(self.style.SUCCESS("스레드 재구성 완료"))
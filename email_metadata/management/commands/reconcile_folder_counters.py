@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from email_metadata.services import recount_folder_counters
+
+
+class Command(BaseCommand):
+    help = "EmailMetadata 를 다시 집계하여 계정/폴더별 카운터(FolderCounter)의 어긋난 값을 복구합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--account", type=int, action="append", help="복구할 EmailAccount ID (여러 번 지정 가능)")
+
+    def handle(self, *args, **options):
+        repaired = recount_folder_counters(account_ids=options["account"])
+        for account_id, folder in sorted(repaired):
+            self.stdout.write(f"복구됨: account={account_id} folder={folder}")
+        self.stdout.write(self.style.SUCCESS(f"카운터 점검 완료 ({len(repaired)}건 복구)"))
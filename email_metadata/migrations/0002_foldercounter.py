@@ -0,0 +1,71 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_folder_counters(apps, schema_editor):
+    """기존 메일로 초기 카운터 값을 채운다."""
+    EmailMetadata = apps.get_model("email_metadata", "EmailMetadata")
+    FolderCounter = apps.get_model("email_metadata", "FolderCounter")
+    rows = (
+        EmailMetadata.objects.filter(deleted_at__isnull=True)
+        .values("account_id", "folder")
+        .annotate(total=Count("id"), unread=Count("id", filter=Q(is_read=False)))
+    )
+    FolderCounter.objects.bulk_create(
+        FolderCounter(
+            account_id=row["account_id"],
+            folder=row["folder"],
+            total_count=row["total"],
+            unread_count=row["unread"],
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0001_initial"),
+        ("email_metadata", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FolderCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "folder",
+                    models.CharField(
+                        choices=[
+                            ("inbox", "받은 편지함"),
+                            ("sent", "보낸 편지함"),
+                            ("spam", "스팸 편지함"),
+                            ("starred", "별표 편지함"),
+                            ("trash", "휴지통"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("total_count", models.IntegerField(default=0, help_text="삭제되지 않은 메일 수")),
+                ("unread_count", models.IntegerField(default=0, help_text="삭제되지 않은 메일 중 안읽은 메일 수")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="folder_counters",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(fields=("account", "folder"), name="uniq_account_folder_counter")
+                ],
+            },
+        ),
+        migrations.RunPython(fill_folder_counters, migrations.RunPython.noop),
+    ]
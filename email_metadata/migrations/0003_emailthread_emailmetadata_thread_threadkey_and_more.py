@@ -0,0 +1,78 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0001_initial"),
+        ("email_metadata", "0002_foldercounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EmailThread",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "subject",
+                    models.CharField(blank=True, default="", help_text="Re:, Fwd: 등을 제거한 제목", max_length=255),
+                ),
+                ("last_message_at", models.DateTimeField(blank=True, null=True)),
+                ("message_count", models.IntegerField(default=0, help_text="삭제되지 않은 메일 수")),
+                ("unread_count", models.IntegerField(default=0, help_text="삭제되지 않은 메일 중 안읽은 메일 수")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="threads",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="thread",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="messages",
+                to="email_metadata.emailthread",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ThreadKey",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("key", models.CharField(max_length=255)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="thread_keys",
+                        to="email_account.emailaccount",
+                    ),
+                ),
+                (
+                    "thread",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="keys",
+                        to="email_metadata.emailthread",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="emailthread",
+            index=models.Index(fields=["account", "-last_message_at"], name="thread_account_last_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="threadkey",
+            constraint=models.UniqueConstraint(fields=("account", "key"), name="uniq_thread_key_per_account"),
+        ),
+    ]
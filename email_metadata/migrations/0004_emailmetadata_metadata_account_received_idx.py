@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0001_initial"),
+        ("email_content", "0004_alter_emailcontent_has_attachment"),
+        ("email_metadata", "0003_emailthread_emailmetadata_thread_threadkey_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="emailmetadata",
+            index=models.Index(fields=["account", "-received_at"], name="metadata_account_received_idx"),
+        ),
+    ]
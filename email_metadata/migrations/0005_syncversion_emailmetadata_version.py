@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0001_initial"),
+        ("email_content", "0004_alter_emailcontent_has_attachment"),
+        ("email_metadata", "0004_emailmetadata_metadata_account_received_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="version",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="emailmetadata",
+            index=models.Index(fields=["account", "version"], name="metadata_account_version_idx"),
+        ),
+    ]
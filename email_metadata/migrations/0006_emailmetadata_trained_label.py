@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_metadata", "0005_syncversion_emailmetadata_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="trained_label",
+            field=models.CharField(blank=True, default="", help_text="spam / ham / 빈 값(학습 안 됨)", max_length=4),
+        ),
+    ]
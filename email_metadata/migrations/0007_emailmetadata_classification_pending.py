@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_account", "0003_spammodel"),
+        ("email_content", "0005_classificationcache"),
+        ("email_metadata", "0006_emailmetadata_trained_label"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="classification_pending",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="emailmetadata",
+            index=models.Index(
+                condition=models.Q(("classification_pending", True)),
+                fields=["id"],
+                name="metadata_classify_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 16:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_content", "0008_summarycache"),
+        ("email_metadata", "0007_emailmetadata_classification_pending"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="shared_summary",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="metadata",
+                to="email_content.summarycache",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.6 on 2026-10-19 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("email_metadata", "0008_emailmetadata_shared_summary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="classification_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="emailmetadata",
+            name="classification_retry_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -28,12 +28,102 @@ class EmailMetadata(models.Model):
     is_read = models.BooleanField(default=False, help_text="읽음 상태 여부")
     is_summarized = models.BooleanField(default=False, help_text="요약 여부")
     summarized_content = models.TextField(null=True, blank=True)
+    # 같은 내용의 메일이 함께 쓰는 요약. 있으면 summarized_content 보다 우선한다. (재요약하면 공유 요약이 갱신됨)
+    shared_summary = models.ForeignKey(
+        "email_content.SummaryCache", on_delete=models.SET_NULL, null=True, blank=True, related_name="metadata"
+    )
+    thread = models.ForeignKey("EmailThread", on_delete=models.SET_NULL, null=True, blank=True, related_name="messages")
     received_at = models.DateTimeField()
     synced_at = models.DateTimeField(auto_now=True)
     deleted_at = models.DateTimeField(null=True, blank=True)  # null이면 삭제 안된 상태
+    # 생성/수정될 때마다 SyncVersion.next() 값으로 갱신된다. 클라이언트 증분 동기화(changes API)용
+    version = models.BigIntegerField(default=0)
+    # 사용자가 스팸함으로/스팸함에서 옮겨서 로컬 스팸 모델(SpamModel)에 학습된 라벨. 다시 옮기면 이전 학습을 되돌린다.
+    trained_label = models.CharField(max_length=4, blank=True, default="", help_text="spam / ham / 빈 값(학습 안 됨)")
+    # LLM 스팸 분류를 기다리는 중. 동기화 시 임시 폴더(inbox)로 먼저 저장되고, classification_worker 가 처리한다.
+    classification_pending = models.BooleanField(default=False)
+    # LLM 분류에 실패한 횟수와 다음 시도 시각. 실패할 때마다 간격을 늘리고, 너무 많이 실패하면 inbox 로 확정한다.
+    classification_attempts = models.PositiveSmallIntegerField(default=0)
+    classification_retry_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         constraints = [
             # ✅ 같은 계정에 같은 이메일 중복 방지
             models.UniqueConstraint(fields=["account", "email"], name="uniq_account_email"),
         ]
+        indexes = [
+            # 목록 정렬 및 before:/after: 검색용
+            models.Index(fields=["account", "-received_at"], name="metadata_account_received_idx"),
+            models.Index(fields=["account", "version"], name="metadata_account_version_idx"),
+            # 분류 대기 메일은 항상 소수이므로 부분 인덱스로 둔다
+            models.Index(
+                fields=["id"],
+                condition=models.Q(classification_pending=True),
+                name="metadata_classify_pending_idx",
+            ),
+        ]
+
+
+# EmailMetadata.version 에 쓰이는 전역 증가 번호 (단일 행).
+# 값을 올리는 UPDATE 가 트랜잭션이 끝날 때까지 행을 잠그므로, 커밋 순서와 번호 순서가 어긋나지 않는다.
+class SyncVersion(models.Model):
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def next(cls):
+        """다음 버전 번호를 발급합니다. 메타데이터 변경과 같은 트랜잭션 안에서 호출해야 합니다."""
+        if not cls.objects.filter(pk=1).update(value=models.F("value") + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(value=models.F("value") + 1)
+        return cls.objects.values_list("value", flat=True).get(pk=1)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+
+
+# 계정/폴더별 전체·안읽음 메일 수. 배지 표시용으로 매번 COUNT(*) 하지 않도록 유지되는 카운터.
+# 값은 email_metadata.services 를 통해서만 갱신하고, 어긋나면 reconcile_folder_counters 명령으로 복구한다.
+class FolderCounter(models.Model):
+    account = models.ForeignKey(EmailAccount, on_delete=models.CASCADE, related_name="folder_counters")
+    folder = models.CharField(max_length=20, choices=EmailMetadata.FOLDER_CHOICES)
+    total_count = models.IntegerField(default=0, help_text="삭제되지 않은 메일 수")
+    unread_count = models.IntegerField(default=0, help_text="삭제되지 않은 메일 중 안읽은 메일 수")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "folder"], name="uniq_account_folder_counter"),
+        ]
+
+
+# 대화(스레드). 수신 시점에 email_metadata.threads.assign_thread 가 증분 방식으로 배정한다.
+# 메시지 수/안읽음 수/마지막 메일 시각은 목록 조회용으로 미리 유지하는 집계값이다.
+class EmailThread(models.Model):
+    account = models.ForeignKey(EmailAccount, on_delete=models.CASCADE, related_name="threads")
+    subject = models.CharField(max_length=255, blank=True, default="", help_text="Re:, Fwd: 등을 제거한 제목")
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    message_count = models.IntegerField(default=0, help_text="삭제되지 않은 메일 수")
+    unread_count = models.IntegerField(default=0, help_text="삭제되지 않은 메일 중 안읽은 메일 수")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["account", "-last_message_at"], name="thread_account_last_idx"),
+        ]
+
+    def __str__(self):
+        return self.subject or f"Thread#{self.id}"
+
+
+# 스레드를 찾기 위한 키. Message-ID(References/In-Reply-To 에 등장한 것 포함) 또는 정규화된 제목.
+# 같은 키를 가진 메일은 같은 스레드에 속하며, 서로 다른 스레드가 같은 키를 만나면 하나로 합쳐진다.
+class ThreadKey(models.Model):
+    account = models.ForeignKey(EmailAccount, on_delete=models.CASCADE, related_name="thread_keys")
+    key = models.CharField(max_length=255)
+    thread = models.ForeignKey(EmailThread, on_delete=models.CASCADE, related_name="keys")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["account", "key"], name="uniq_thread_key_per_account"),
+        ]
@@ -0,0 +1,118 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# 메일 열람 시 '읽음' 처리를 모아서 쓰는 write-behind 버퍼.
+# 상세 조회마다 UPDATE 를 바로 실행하면 동기화가 DB 쓰기 잠금을 잡고 있을 때 조회 응답까지 기다리게 된다.
+# 대신 열람한 메일 ID 를 프로세스 메모리에 모아 두고, 백그라운드 스레드가 주기적으로
+# services.bulk_update_metadata(ids, is_read=True) 한 번으로 반영한다. (카운터/스레드/버전/캐시도 함께 처리됨)
+#
+# 반영 전까지는 같은 프로세스의 목록/상세/카운터 응답에 pending 상태를 덧씌워 자신이 읽은 메일이 읽음으로 보이게 한다.
+# 버퍼는 프로세스 단위이므로 종료 시(atexit) 남은 항목을 한 번 더 반영한다.
+#   READ_BUFFER_ENABLED        : False 면 바로 반영 (기존 동작)
+#   READ_BUFFER_FLUSH_INTERVAL : 반영 주기(초)
+#   READ_BUFFER_MAX_PENDING    : 이 개수 이상 쌓이면 주기를 기다리지 않고 반영
+
+
+class ReadBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 반영 중에는 discard 가 기다리도록 하여, '읽음 반영'이 '안읽음 변경'보다 늦게 적용되지 않게 한다
+        # (반영 중 bulk_update_metadata 가 다시 take 를 부르므로 재진입 가능한 잠금)
+        self._flush_lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._pending = {}  # metadata_id -> (user_id, account_id, folder, thread_id)
+        self._thread = None
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="read-buffer-flush", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.READ_BUFFER_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def mark_read(self, metadata, user_id):
+        """메일을 읽음으로 표시합니다. 반영은 나중에 일괄로 이루어집니다."""
+        if not settings.READ_BUFFER_ENABLED:
+            from .services import update_metadata
+
+            update_metadata(metadata, is_read=True)
+            return
+
+        with self._lock:
+            self._pending[metadata.pk] = (user_id, metadata.account_id, metadata.folder, metadata.thread_id)
+            size = len(self._pending)
+            self._ensure_worker()
+        if size >= settings.READ_BUFFER_MAX_PENDING:
+            self._wakeup.set()
+
+    def take(self, metadata_ids):
+        """
+        반영 대기 중인 읽음 표시를 버퍼에서 꺼내고, 꺼낸 ID 집합을 반환합니다.
+        services 가 같은 메일을 수정하기 직전에 호출하여, 대기 중이던 읽음 표시를 그 수정에 합치거나
+        (안읽음으로 바꾸는 경우) 버리도록 합니다.
+        진행 중인 반영이 있으면 끝날 때까지 기다리므로 DB 트랜잭션 밖에서 호출해야 합니다.
+        """
+        with self._flush_lock:
+            with self._lock:
+                return {metadata_id for metadata_id in metadata_ids if self._pending.pop(metadata_id, None)}
+
+    def pending(self, user_id):
+        """사용자의 반영 대기 중인 항목 {metadata_id: (account_id, folder, thread_id)}"""
+        with self._lock:
+            return {metadata_id: entry[1:] for metadata_id, entry in self._pending.items() if entry[0] == user_id}
+
+    def flush(self):
+        """대기 중인 읽음 표시를 한 번의 UPDATE 로 반영하고, 반영한 메일 수를 반환합니다."""
+        from .services import bulk_update_metadata
+
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+            try:
+                return len(bulk_update_metadata(list(batch), is_read=True))
+            except Exception:
+                logger.exception("read buffer flush failed (%d items), will retry", len(batch))
+                with self._lock:
+                    for metadata_id, entry in batch.items():
+                        self._pending.setdefault(metadata_id, entry)
+                return 0
+
+
+read_buffer = ReadBuffer()
+atexit.register(read_buffer.flush)
+
+
+def overlay_rows(rows, user_id):
+    """목록 응답(dict 목록)에 반영 대기 중인 읽음 상태를 덧씌웁니다."""
+    pending = read_buffer.pending(user_id)
+    if not pending:
+        return rows
+    return [{**row, "is_read": True} if row.get("id") in pending and "is_read" in row else row for row in rows]
+
+
+def pending_unread_deltas(user_id):
+    """
+    반영 대기 중인 읽음 표시로 줄어들 안읽음 수.
+    ({(account_id, folder): n}, {thread_id: n}) 형태로, 카운터 응답을 보정할 때 사용합니다.
+    """
+    folders, threads = {}, {}
+    for account_id, folder, thread_id in read_buffer.pending(user_id).values():
+        folders[(account_id, folder)] = folders.get((account_id, folder), 0) + 1
+        if thread_id is not None:
+            threads[thread_id] = threads.get(thread_id, 0) + 1
+    return folders, threads
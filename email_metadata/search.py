@@ -0,0 +1,253 @@
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from email_content.utils import is_complete_address
+
+# Gmail 스타일 검색어 파서.
+#   from:kim@corp.com to:me subject:"주간 보고" has:attachment is:unread
+#   after:2025-01-01 before:2025/02/01 folder:inbox -from:noreply (a OR b)
+# 검색어를 AST 로 파싱한 뒤 Django Q 로 컴파일한다. 파서는 DB 와 무관하므로
+# 목록 조회 외에 저장된 검색 같은 기능에서도 parse_query / compile_query 를 그대로 재사용할 수 있다.
+
+FOLDERS = {"inbox", "sent", "spam", "starred", "trash"}
+FIELD_ALIASES = {"in": "folder"}
+FIELDS = {"from", "to", "cc", "bcc", "subject", "has", "is", "before", "after", "folder"}
+HAS_VALUES = {"attachment"}
+IS_VALUES = {"read", "unread", "important", "pinned", "starred"}
+
+# 파싱 결과 캐시 (사용자별). 같은 검색어로 목록을 새로고침할 때 다시 파싱하지 않는다.
+PARSE_CACHE_TIMEOUT = 60 * 10
+
+TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<lparen>\()
+    |(?P<rparen>\))
+    |(?P<or>OR(?=[\s()]|$)|\|)
+    |(?P<neg>-(?=\S))
+    |(?P<field>[A-Za-z_]+):(?:"(?P<fquoted>[^"]*)"|(?P<fvalue>[^\s()]+))
+    |"(?P<quoted>[^"]*)"?
+    |(?P<word>[^\s()]+)
+    """,
+    re.VERBOSE,
+)
+
+
+class SearchQueryError(ValueError):
+    """검색어 문법이 잘못되었거나 지원하지 않는 값이 들어온 경우"""
+
+
+@dataclass(frozen=True)
+class Term:
+    field: str | None  # None 이면 자유 검색어 (제목/본문/주소)
+    value: str
+
+
+@dataclass(frozen=True)
+class Not:
+    node: object
+
+
+@dataclass(frozen=True)
+class And:
+    nodes: tuple
+
+
+@dataclass(frozen=True)
+class Or:
+    nodes: tuple
+
+
+def _tokenize(text):
+    tokens = []
+    for match in TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind == "space":
+            continue
+        if kind in ("fquoted", "fvalue"):
+            field = match.group("field").lower()
+            field = FIELD_ALIASES.get(field, field)
+            value = match.group(kind)
+            if field in FIELDS:
+                tokens.append(("term", Term(field, value)))
+            else:
+                # 지원하지 않는 연산자(예: http://...)는 일반 검색어로 취급한다
+                tokens.append(("term", Term(None, match.group(0))))
+        elif kind == "quoted":
+            if match.group("quoted"):
+                tokens.append(("term", Term(None, match.group("quoted"))))
+        elif kind == "word":
+            tokens.append(("term", Term(None, match.group("word"))))
+        else:
+            tokens.append((kind, None))
+    return tokens
+
+
+class _Parser:
+    """
+    query   := or_expr
+    or_expr := and_expr ("OR" and_expr)*
+    and_expr:= unary+
+    unary   := "-" unary | "(" or_expr ")" | term
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.or_expr()
+        if self.peek() is not None:
+            raise SearchQueryError("괄호가 맞지 않습니다.")
+        return node
+
+    def or_expr(self):
+        nodes = [self.and_expr()]
+        while self.peek() == "or":
+            self.take()
+            nodes.append(self.and_expr())
+        return nodes[0] if len(nodes) == 1 else Or(tuple(nodes))
+
+    def and_expr(self):
+        nodes = []
+        while self.peek() in ("term", "neg", "lparen"):
+            nodes.append(self.unary())
+        if not nodes:
+            raise SearchQueryError("검색어가 비어 있거나 OR 앞뒤에 조건이 없습니다.")
+        return nodes[0] if len(nodes) == 1 else And(tuple(nodes))
+
+    def unary(self):
+        kind, value = self.take()
+        if kind == "neg":
+            if self.peek() not in ("term", "neg", "lparen"):
+                raise SearchQueryError("'-' 뒤에 조건이 필요합니다.")
+            return Not(self.unary())
+        if kind == "lparen":
+            node = self.or_expr()
+            if self.peek() != "rparen":
+                raise SearchQueryError("괄호가 닫히지 않았습니다.")
+            self.take()
+            return node
+        _validate(value)
+        return value
+
+
+def _parse_date(value):
+    for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise SearchQueryError(f"날짜 형식이 잘못되었습니다: {value} (YYYY-MM-DD)")
+
+
+def _validate(term):
+    field, value = term.field, term.value.lower()
+    if field == "has" and value not in HAS_VALUES:
+        raise SearchQueryError(f"지원하지 않는 has: 값입니다: {term.value}")
+    if field == "is" and value not in IS_VALUES:
+        raise SearchQueryError(f"지원하지 않는 is: 값입니다: {term.value}")
+    if field == "folder" and value not in FOLDERS:
+        raise SearchQueryError(f"존재하지 않는 폴더입니다: {term.value}")
+    if field in ("before", "after"):
+        _parse_date(term.value)
+
+
+def parse_query(text):
+    """검색어 문자열을 AST(Term / Not / And / Or)로 파싱합니다. 빈 검색어는 None 을 반환합니다."""
+    tokens = _tokenize(text or "")
+    if not tokens:
+        return None
+    return _Parser(tokens).parse()
+
+
+def parse_query_cached(user_id, text):
+    """사용자별로 캐시된 파싱 결과를 반환합니다. 문법 오류는 캐시하지 않습니다."""
+    digest = hashlib.sha1((text or "").encode()).hexdigest()
+    key = f"search:ast:{user_id}:{digest}"
+    node = cache.get(key)
+    if node is None:
+        node = parse_query(text)
+        if node is not None:
+            cache.set(key, node, PARSE_CACHE_TIMEOUT)
+    return node
+
+
+def _participants(roles, value, my_addresses):
+    """주소 조건 서브쿼리. 완전한 주소는 정규화된 주소 인덱스로, 그 외는 주소/표시 이름 부분 일치로 찾는다."""
+    from email_content.models import EmailParticipant
+
+    participants = EmailParticipant.objects.filter(email=OuterRef("email"), role__in=roles)
+    term = value.strip().lower()
+    if term == "me":
+        return Exists(participants.filter(address__in=my_addresses))
+    if is_complete_address(term):
+        return Exists(participants.filter(address=term))
+    return Exists(participants.filter(Q(address__icontains=term) | Q(display_name__icontains=term)))
+
+
+def _compile_term(term, my_addresses):
+    field, value = term.field, term.value
+    lowered = value.lower()
+
+    if field is None:
+        return (
+            Q(email__subject__icontains=value)
+            | Q(email__text_body__icontains=value)
+            | _participants(("from", "to", "cc", "bcc"), value, my_addresses)
+        )
+    if field in ("from", "to", "cc", "bcc"):
+        return Q(_participants((field,), value, my_addresses))
+    if field == "subject":
+        return Q(email__subject__icontains=value)
+    if field == "has":
+        return Q(email__has_attachment=True)
+    if field == "is":
+        return {
+            "read": Q(is_read=True),
+            "unread": Q(is_read=False),
+            "important": Q(is_important=True),
+            "pinned": Q(is_pinned=True),
+            "starred": Q(folder="starred"),
+        }[lowered]
+    if field in ("before", "after"):
+        moment = timezone.make_aware(_parse_date(value), timezone.get_current_timezone())
+        return Q(received_at__lt=moment) if field == "before" else Q(received_at__gte=moment)
+    if field == "folder":
+        if lowered == "sent":
+            return Q(_participants(("from",), "me", my_addresses))
+        return Q(folder=lowered)
+    raise SearchQueryError(f"지원하지 않는 검색 조건입니다: {field}")
+
+
+def compile_query(node, my_addresses=()):
+    """
+    AST 를 EmailMetadata 용 Q 객체로 컴파일합니다.
+    my_addresses 는 from:me / folder:sent 해석에 쓰이는 사용자 본인의 주소 목록입니다. (소문자)
+    """
+    if node is None:
+        return Q()
+    if isinstance(node, Term):
+        return _compile_term(node, my_addresses)
+    if isinstance(node, Not):
+        return ~compile_query(node.node, my_addresses)
+
+    compiled = [compile_query(child, my_addresses) for child in node.nodes]
+    result = compiled[0]
+    for q in compiled[1:]:
+        result = (result & q) if isinstance(node, And) else (result | q)
+    return result
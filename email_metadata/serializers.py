@@ -1,13 +1,12 @@
 from rest_framework import serializers
 from email_content.models import EmailContent
-from .models import EmailMetadata
-import re
-import html
-from email.header import decode_header, make_header
+from email_content.utils import decode_subject, make_preview
+from utils.sparse_fields import SparseFieldsMixin
+from .models import EmailMetadata, EmailThread
 
 
 # 목록 조회를 위해 이메일 본문 미리보기를 하는 시리얼라이저.
-class EmailPreviewSerializer(serializers.ModelSerializer):
+class EmailPreviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     preview = serializers.SerializerMethodField()
     subject = serializers.SerializerMethodField()
 
@@ -22,43 +21,18 @@ class EmailPreviewSerializer(serializers.ModelSerializer):
 
     def get_subject(self, obj) -> str:
         """RFC 2047 형식으로 인코딩된 이메일 제목을 디코딩하여 반환합니다."""
-        if not obj.subject:
-            return ""
-        # decode_header는 (디코딩된 바이트, 인코딩)의 리스트를 반환
-        decoded_parts = decode_header(obj.subject)
-        # make_header를 사용하여 올바르게 문자열로 조합
-        return str(make_header(decoded_parts))
+        return decode_subject(obj.subject)
 
     def get_preview(self, obj) -> str:
         """
         본문 내용의 미리보기를 생성합니다.
         text_body가 있으면 사용하고, 없으면 html_body에서 불필요한 부분을 제거하여 사용합니다.
         """
-        source_text = ""
-        if obj.text_body:
-            source_text = obj.text_body
-        elif obj.html_body:
-            # 0. HTML 엔티티 디코딩 (e.g., &nbsp; -> ' ')
-            text = html.unescape(obj.html_body)
-            # 1. <style>과 <script> 블록 제거
-            text = re.sub(r"<style.*?</style>", "", text, flags=re.DOTALL | re.IGNORECASE)
-            text = re.sub(r"<script.*?</script>", "", text, flags=re.DOTALL | re.IGNORECASE)
-            # 2. HTML 주석 제거
-            text = re.sub(r"<!--.*?-->", "", text, flags=re.DOTALL)
-            # 3. 나머지 HTML 태그 제거
-            text = re.sub(r"<[^>]+>", "", text)
-            source_text = text
-
-        if source_text:
-            # 4. 여러 공백과 개행을 하나의 스페이스로 합치고 양 끝 공백 제거
-            clean_text = re.sub(r"\s+", " ", source_text).strip()
-            return clean_text[:150]
-
-        return ""
+        return make_preview(obj.text_body, obj.html_body)
 
 
 # 간단한 목록 조회용 시리얼라이저
-class EmailMetadataListSerializer(serializers.ModelSerializer):
+class EmailMetadataListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     email = EmailPreviewSerializer(read_only=True)  # 위에서 만든 preview버전 사용.
     account_address = serializers.CharField(source="account.address", read_only=True)
 
@@ -72,15 +46,32 @@ class EmailMetadataListSerializer(serializers.ModelSerializer):
             "is_important",
             "is_pinned",
             "received_at",
+            "thread_id",
             "email",  # 가벼운 EmailPreviewSerializer를 사용
         ]
 
 
+# 스레드 목록 조회용 시리얼라이저
+class EmailThreadSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    account_address = serializers.CharField(source="account.address", read_only=True)
+
+    class Meta:
+        model = EmailThread
+        fields = [
+            "id",
+            "account_address",
+            "subject",
+            "last_message_at",
+            "message_count",
+            "unread_count",
+        ]
+
+
 ######################################################################
 
 
 # 상세 조회 및 수정용 시리얼라이저
-class EmailContentSerializer(serializers.ModelSerializer):
+class EmailContentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmailContent
         fields = [
@@ -96,7 +87,7 @@ class EmailContentSerializer(serializers.ModelSerializer):
 
 
 # 메일 세부정보 조회를 위한 시리얼라이저
-class EmailDetailSerializer(serializers.ModelSerializer):
+class EmailDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     email = EmailContentSerializer(read_only=True)
     account_address = serializers.CharField(source="account.address", read_only=True)
 
@@ -137,7 +128,56 @@ class EmailUpdateSerializer(serializers.ModelSerializer):
 
 # 메일 요약 생성 및 조회를 위한 시리얼라이저
 class EmailSummarySerializer(serializers.ModelSerializer):
+    summarized_content = serializers.SerializerMethodField()
+
     class Meta:
         model = EmailMetadata
         fields = ["id", "summarized_content", "is_summarized"]
         read_only_fields = ["id", "summarized_content", "is_summarized"]
+
+    def get_summarized_content(self, obj) -> str | None:
+        """공유 요약이 있으면 그 값을 반환합니다. (같은 내용의 다른 메일에서 재요약하면 함께 갱신됨)"""
+        if obj.shared_summary_id and obj.shared_summary:
+            return obj.shared_summary.summary
+        return obj.summarized_content
+
+
+# 일괄 작업 요청용 시리얼라이저
+class EmailBulkFilterSerializer(serializers.Serializer):
+    folder = serializers.ChoiceField(choices=EmailMetadata.FOLDER_CHOICES, required=False)
+    accounts = serializers.CharField(required=False, help_text="콤마(,)로 구분된 이메일 주소 목록")
+    query = serializers.CharField(required=False, help_text="목록 조회와 같은 검색어 문법")
+    thread = serializers.IntegerField(required=False)
+
+
+class EmailBulkActionSerializer(serializers.Serializer):
+    ACTION_CHOICES = [
+        ("read", "읽음"),
+        ("unread", "안읽음"),
+        ("move", "폴더 이동"),
+        ("important", "중요 표시/해제"),
+        ("pin", "고정/해제"),
+        ("trash", "휴지통으로 이동"),
+        ("purge", "영구 삭제 (휴지통에 있는 메일만)"),
+    ]
+    MAX_IDS = 5000
+
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=MAX_IDS)
+    filter = EmailBulkFilterSerializer(required=False, help_text="ids 대신 목록 조회 조건으로 대상을 지정합니다.")
+    exclude_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    folder = serializers.ChoiceField(choices=EmailMetadata.FOLDER_CHOICES, required=False, help_text="move 대상 폴더")
+    value = serializers.BooleanField(required=False, default=True, help_text="important/pin 설정값")
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("ids 와 filter 중 하나만 지정해야 합니다.")
+        if attrs["action"] == "move" and not attrs.get("folder"):
+            raise serializers.ValidationError({"folder": "move 작업에는 대상 폴더가 필요합니다."})
+        return attrs
+
+
+class EmailBulkResultSerializer(serializers.Serializer):
+    action = serializers.CharField()
+    count = serializers.IntegerField()
+    affected_ids = serializers.ListField(child=serializers.IntegerField())
@@ -0,0 +1,258 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Subquery
+from django.utils import timezone
+
+from .cache import invalidate_accounts
+from .models import EmailMetadata, EmailThread, FolderCounter, SyncVersion
+from .read_buffer import read_buffer
+from .threads import assign_thread
+
+# EmailMetadata 의 생성/수정은 이 모듈의 함수를 거쳐야 한다.
+# 폴더 카운터, 스레드 집계, 동기화 버전처럼 메타데이터에서 파생되는 값들을 같은 트랜잭션 안에서 함께 맞추고,
+# 목록 캐시(cache.py)를 무효화하기 위함이다.
+
+
+def _counted(folder, is_read, deleted_at):
+    """카운터에 반영될 (folder, unread) 상태를 반환한다. 삭제된 메일은 어디에도 세지 않는다."""
+    if deleted_at is not None:
+        return None
+    return folder, not is_read
+
+
+def _add_delta(deltas, account_id, state, sign):
+    if state is None:
+        return
+    folder, unread = state
+    delta = deltas[(account_id, folder)]
+    delta[0] += sign
+    if unread:
+        delta[1] += sign
+
+
+def _merge_folders(deltas):
+    """{(key, folder): delta} 를 {key: delta} 로 합친다."""
+    merged = defaultdict(lambda: [0, 0])
+    for (key, _folder), (total, unread) in deltas.items():
+        merged[key][0] += total
+        merged[key][1] += unread
+    return merged
+
+
+def apply_counter_deltas(deltas):
+    """
+    {(account_id, folder): [total 증감, unread 증감]} 형태의 변화를 FolderCounter 에 반영합니다.
+    F() 표현식으로 갱신하므로 동시에 여러 요청이 카운터를 바꿔도 값이 덮어써지지 않습니다.
+    """
+    now = timezone.now()
+    for (account_id, folder), (total, unread) in deltas.items():
+        if not total and not unread:
+            continue
+        FolderCounter.objects.get_or_create(account_id=account_id, folder=folder)
+        FolderCounter.objects.filter(account_id=account_id, folder=folder).update(
+            total_count=F("total_count") + total,
+            unread_count=F("unread_count") + unread,
+            updated_at=now,
+        )
+
+
+def _last_message_at(thread_id):
+    """스레드에서 삭제되지 않은 메일 중 가장 최근 수신 시각 (서브쿼리)"""
+    return Subquery(
+        EmailMetadata.objects.filter(thread_id=thread_id, deleted_at__isnull=True)
+        .order_by()
+        .values("thread_id")
+        .annotate(last=Max("received_at"))
+        .values("last")[:1]
+    )
+
+
+def apply_thread_deltas(deltas):
+    """
+    {thread_id: [message_count 증감, unread_count 증감]} 형태의 변화를 EmailThread 집계값에 반영합니다.
+    메일 수가 바뀐 스레드(삭제/영구 삭제/복원)는 last_message_at 도 남은 메일 기준으로 다시 계산합니다.
+    """
+    for thread_id, (total, unread) in deltas.items():
+        if thread_id is None or (not total and not unread):
+            continue
+        updates = {"message_count": F("message_count") + total, "unread_count": F("unread_count") + unread}
+        if total:
+            # 가장 최근 메일이 삭제되면 스레드 목록(-last_message_at) 정렬이 삭제된 메일을 따르지 않도록 한다
+            updates["last_message_at"] = _last_message_at(thread_id)
+        EmailThread.objects.filter(id=thread_id).update(**updates)
+
+
+def create_metadata(**fields):
+    """EmailMetadata 를 생성하고 폴더 카운터를 올린 뒤, 스레드를 배정합니다."""
+    with transaction.atomic():
+        metadata = EmailMetadata.objects.create(version=SyncVersion.next(), **fields)
+        deltas = defaultdict(lambda: [0, 0])
+        _add_delta(deltas, metadata.account_id, _counted(metadata.folder, metadata.is_read, metadata.deleted_at), 1)
+        apply_counter_deltas(deltas)
+        assign_thread(metadata)
+        invalidate_accounts([metadata.account_id])
+    return metadata
+
+
+def update_metadata(instance, **changes):
+    """
+    메타데이터 한 건을 수정하고, 폴더/읽음/삭제 상태 변화를 카운터에 반영합니다.
+
+    다른 요청이 먼저 같은 행을 바꿨다면(읽어온 상태와 DB 상태가 다르면) 최신 상태를 다시 읽어 재시도합니다.
+    같은 메일을 동시에 두 번 '읽음' 처리해도 unread 카운터가 두 번 줄지 않습니다.
+
+    DB 트랜잭션 안에서 호출하면 안 됩니다. read_buffer.take 가 진행 중인 읽음 반영(다른 스레드의 DB 쓰기)이
+    끝나기를 기다리므로, 트랜잭션이 잡은 쓰기 잠금과 서로 기다리게 됩니다.
+    """
+    if not changes:
+        return instance
+    # 폴더를 직접 옮긴 메일은 분류 대기 중이더라도 그 결정을 따른다
+    if "folder" in changes:
+        changes.setdefault("classification_pending", False)
+
+    # 열람 후 아직 반영되지 않은 읽음 표시가 있으면 이번 수정에 합친다 (안읽음으로 바꾸는 경우는 버린다)
+    if read_buffer.take([instance.pk]) and "is_read" not in changes:
+        changes = {**changes, "is_read": True}
+
+    while True:
+        with transaction.atomic():
+            before = _counted(instance.folder, instance.is_read, instance.deleted_at)
+            version = SyncVersion.next()
+            updated = EmailMetadata.objects.filter(
+                pk=instance.pk,
+                folder=instance.folder,
+                is_read=instance.is_read,
+                deleted_at=instance.deleted_at,
+            ).update(version=version, **changes)
+            if updated:
+                instance.version = version
+                invalidate_accounts([instance.account_id])
+                for field, value in changes.items():
+                    setattr(instance, field, value)
+                after = _counted(instance.folder, instance.is_read, instance.deleted_at)
+                if before != after:
+                    deltas = defaultdict(lambda: [0, 0])
+                    _add_delta(deltas, instance.account_id, before, -1)
+                    _add_delta(deltas, instance.account_id, after, 1)
+                    apply_counter_deltas(deltas)
+                    thread_deltas = defaultdict(lambda: [0, 0])
+                    _add_delta(thread_deltas, instance.thread_id, before, -1)
+                    _add_delta(thread_deltas, instance.thread_id, after, 1)
+                    # 스레드는 폴더와 무관하게 세므로 키를 thread_id 하나로 합친다
+                    apply_thread_deltas(_merge_folders(thread_deltas))
+                return instance
+        instance.refresh_from_db()
+
+
+def bulk_update_metadata(ids, **changes):
+    """
+    여러 메타데이터에 같은 변경을 한 번의 UPDATE 로 적용하고, 카운터/스레드 변화를 모아서 반영합니다.
+    이미 변경하려는 값과 같은 행은 건너뛰며, 실제로 바뀐 id 목록을 반환합니다.
+
+    update_metadata 와 마찬가지로 읽어온 뒤 다른 요청이 행을 바꿨다면(UPDATE 건수가 다르면) 롤백 후 재시도합니다.
+    update_metadata 와 같은 이유로 DB 트랜잭션 안에서 호출하면 안 됩니다.
+    """
+    if not ids or not changes:
+        return []
+    if "folder" in changes:
+        changes.setdefault("classification_pending", False)
+
+    # update_metadata 와 같은 이유로, 대기 중인 읽음 표시를 먼저 반영하거나 버린다
+    pending_reads = read_buffer.take(ids)
+    if pending_reads and "is_read" not in changes:
+        bulk_update_metadata(list(pending_reads), is_read=True)
+
+    # 변경할 값과 하나라도 다른 행만 대상으로 한다
+    differs = Q()
+    for field, value in changes.items():
+        # NULL 로 바꾸는 경우 아직 NULL 이 아닌 행이 대상이다 (NULL 과의 비교는 참이 되지 않으므로 따로 처리)
+        differs |= Q(**{f"{field}__isnull": False}) if value is None else ~Q(**{field: value})
+
+    while True:
+        with transaction.atomic():
+            rows = list(
+                EmailMetadata.objects.select_for_update()
+                .filter(differs, id__in=ids)
+                .values("id", "account_id", "thread_id", "folder", "is_read", "deleted_at")
+            )
+            if not rows:
+                return []
+            changed_ids = [row["id"] for row in rows]
+
+            updated = EmailMetadata.objects.filter(differs, id__in=changed_ids).update(
+                version=SyncVersion.next(), **changes
+            )
+            if updated != len(rows):
+                transaction.set_rollback(True)
+                continue
+
+            deltas = defaultdict(lambda: [0, 0])
+            thread_deltas = defaultdict(lambda: [0, 0])
+            for row in rows:
+                before = _counted(row["folder"], row["is_read"], row["deleted_at"])
+                after_row = {**row, **changes}
+                after = _counted(after_row["folder"], after_row["is_read"], after_row["deleted_at"])
+                if before == after:
+                    continue
+                _add_delta(deltas, row["account_id"], before, -1)
+                _add_delta(deltas, row["account_id"], after, 1)
+                _add_delta(thread_deltas, row["thread_id"], before, -1)
+                _add_delta(thread_deltas, row["thread_id"], after, 1)
+            apply_counter_deltas(deltas)
+            apply_thread_deltas(_merge_folders(thread_deltas))
+            invalidate_accounts({row["account_id"] for row in rows})
+            return changed_ids
+
+
+def recount_folder_counters(account_ids=None):
+    """
+    EmailMetadata 를 직접 집계하여 FolderCounter 를 다시 맞춥니다.
+    수정된 (account_id, folder) 목록을 반환합니다.
+    """
+    metadata = EmailMetadata.objects.filter(deleted_at__isnull=True)
+    counters = FolderCounter.objects.all()
+    if account_ids is not None:
+        metadata = metadata.filter(account_id__in=account_ids)
+        counters = counters.filter(account_id__in=account_ids)
+
+    actual = {
+        (row["account_id"], row["folder"]): (row["total"], row["unread"])
+        for row in metadata.values("account_id", "folder").annotate(
+            total=Count("id"), unread=Count("id", filter=Q(is_read=False))
+        )
+    }
+    stored = {(c.account_id, c.folder): c for c in counters}
+
+    repaired = []
+    with transaction.atomic():
+        for key in set(actual) | set(stored):
+            total, unread = actual.get(key, (0, 0))
+            counter = stored.get(key)
+            if counter and (counter.total_count, counter.unread_count) == (total, unread):
+                continue
+            FolderCounter.objects.update_or_create(
+                account_id=key[0], folder=key[1], defaults={"total_count": total, "unread_count": unread}
+            )
+            repaired.append(key)
+    return repaired
+
+
+# 카운터가 있는 폴더. sent 는 저장된 폴더가 아니라 보낸 사람(participants)으로 구하는 목록이므로 세지 않는다.
+COUNTED_FOLDERS = tuple(folder for folder, _label in EmailMetadata.FOLDER_CHOICES if folder != "sent")
+
+
+def folder_counts(rows, pending_reads=None):
+    """
+    (folder, total_count, unread_count) 목록을 {"inbox": {"total": n, "unread": m}, ...} 형태로 바꿉니다.
+    카운터 행이 없는 폴더는 0으로 채웁니다. (sent 는 포함하지 않습니다)
+    pending_reads({folder: n})가 주어지면 아직 반영되지 않은 읽음 표시(read_buffer)만큼 unread 를 줄입니다.
+    """
+    counts = {folder: {"total": 0, "unread": 0} for folder in COUNTED_FOLDERS}
+    for folder, total, unread in rows:
+        if folder in counts:
+            counts[folder] = {"total": total, "unread": unread}
+    for folder, n in (pending_reads or {}).items():
+        if folder in counts:
+            counts[folder]["unread"] = max(counts[folder]["unread"] - n, 0)
+    return counts
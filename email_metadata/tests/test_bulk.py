@@ -0,0 +1,80 @@
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.models import EmailMetadata
+from email_metadata.services import create_metadata, recount_folder_counters
+from user.models import User
+
+
+def make_account(user_id):
+    user = User.objects.create(user_id=user_id)
+    return EmailAccount.objects.create(user=user, address=f"{user_id}@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, uid, **fields):
+    content = EmailContent.objects.create(
+        message_id=f"<{account.id}.{uid}@example.com>",
+        subject=f"제목 {uid}",
+        from_header="kim@example.com",
+        date=timezone.now(),
+    )
+    fields.setdefault("folder", "inbox")
+    return create_metadata(account=account, email=content, uid=uid, received_at=timezone.now(), **fields)
+
+
+def bulk(account, **payload):
+    client = APIClient()
+    client.force_authenticate(account.user)
+    return client.post("/api/email/bulk/", payload, format="json")
+
+
+def state(metadata):
+    metadata = EmailMetadata.objects.get(id=metadata.id)
+    return metadata.folder, metadata.is_read, metadata.deleted_at is not None
+
+
+def test_read_returns_only_changed_ids(db):
+    account = make_account("bulk")
+    unread, read = make_mail(account, "1"), make_mail(account, "2", is_read=True)
+
+    response = bulk(account, action="read", ids=[unread.id, read.id])
+    assert response.status_code == 200
+    assert response.json() == {"action": "read", "count": 1, "affected_ids": [unread.id]}
+    assert state(unread) == ("inbox", True, False)
+    assert recount_folder_counters([account.id]) == []
+
+
+def test_filter_with_exclusions_then_purge_only_trash(db):
+    account = make_account("bulk")
+    kept, trashed, other = make_mail(account, "1"), make_mail(account, "2"), make_mail(account, "3", folder="spam")
+
+    response = bulk(account, action="trash", filter={"folder": "inbox"}, exclude_ids=[kept.id])
+    assert response.json()["affected_ids"] == [trashed.id]
+    assert state(kept) == ("inbox", False, False)
+
+    # 휴지통에 없는 메일은 영구 삭제 대상에서 빠진다
+    response = bulk(account, action="purge", ids=[trashed.id, other.id])
+    assert response.json()["affected_ids"] == [trashed.id]
+    assert state(trashed) == ("trash", False, True)
+    assert state(other) == ("spam", False, False)
+    assert recount_folder_counters([account.id]) == []
+
+
+def test_other_users_mail_is_rejected(db):
+    account, stranger = make_account("bulk"), make_account("stranger")
+    mine, theirs = make_mail(account, "1"), make_mail(stranger, "1")
+
+    response = bulk(account, action="read", ids=[mine.id, theirs.id])
+    assert response.status_code == 400
+    assert state(mine) == ("inbox", False, False)
+    assert state(theirs) == ("inbox", False, False)
+
+
+def test_invalid_requests(db):
+    account = make_account("bulk")
+    mail = make_mail(account, "1")
+
+    assert bulk(account, action="read", ids=[mail.id], filter={"folder": "inbox"}).status_code == 400
+    assert bulk(account, action="move", ids=[mail.id]).status_code == 400
@@ -0,0 +1,54 @@
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.services import bulk_update_metadata, create_metadata
+from user.models import User
+
+
+def make_account():
+    user = User.objects.create(user_id="changes")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, uid):
+    content = EmailContent.objects.create(
+        message_id=f"<{uid}@example.com>", subject=f"제목 {uid}", from_header="kim@example.com", date=timezone.now()
+    )
+    return create_metadata(account=account, email=content, uid=uid, received_at=timezone.now(), folder="inbox")
+
+
+def changes(account, cursor, limit):
+    client = APIClient()
+    client.force_authenticate(account.user)
+    response = client.get("/api/email/changes/", {"cursor": cursor, "limit": limit})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_paging_does_not_skip_rows_sharing_a_version(db):
+    account = make_account()
+    mails = [make_mail(account, str(uid)) for uid in range(5)]
+    start = changes(account, "", 1)["cursor"]
+
+    # 한 번의 일괄 변경은 모든 행에 같은 버전을 매긴다
+    bulk_update_metadata([m.id for m in mails], is_read=True)
+    bulk_update_metadata([mails[0].id], deleted_at=timezone.now())
+
+    seen, deleted, cursor, pages = [], [], start, 0
+    while True:
+        page = changes(account, cursor, 2)
+        seen += [row["id"] for row in page["changed"]]
+        deleted += page["deleted"]
+        cursor, pages = page["cursor"], pages + 1
+        if not page["has_more"]:
+            break
+
+    assert pages == 3
+    assert sorted(seen) == sorted(m.id for m in mails[1:])
+    # 삭제된 행은 changed 대신 deleted 에 한 번만 나온다
+    assert deleted == [mails[0].id]
+
+    # 마지막 커서로 다시 물으면 새 변경이 없다
+    assert changes(account, cursor, 2) == {"cursor": cursor, "has_more": False, "changed": [], "deleted": []}
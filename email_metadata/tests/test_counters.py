@@ -0,0 +1,109 @@
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.models import EmailMetadata, FolderCounter
+from email_metadata.services import (
+    bulk_update_metadata,
+    create_metadata,
+    folder_counts,
+    recount_folder_counters,
+    update_metadata,
+)
+from user.models import User
+
+# services 를 거친 생성/수정 뒤의 FolderCounter 가 EmailMetadata 를 직접 센 값(recount_folder_counters)과 같은지 확인한다.
+
+
+def make_account():
+    user = User.objects.create(user_id="counters")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, uid, **fields):
+    content = EmailContent.objects.create(
+        message_id=f"<{uid}@example.com>", subject=f"제목 {uid}", from_header="kim@example.com", date=timezone.now()
+    )
+    fields.setdefault("folder", "inbox")
+    return create_metadata(account=account, email=content, uid=uid, received_at=timezone.now(), **fields)
+
+
+def counters(account):
+    return {
+        c.folder: (c.total_count, c.unread_count)
+        for c in FolderCounter.objects.filter(account=account)
+        if c.total_count or c.unread_count
+    }
+
+
+def assert_consistent(account):
+    # 다시 센 값과 다르면 recount 가 고친 키를 반환한다
+    assert recount_folder_counters([account.id]) == []
+
+
+def test_counters_follow_read_move_and_delete(db):
+    account = make_account()
+    first, second = make_mail(account, "1"), make_mail(account, "2")
+    make_mail(account, "3", folder="spam", is_read=True)
+    assert counters(account) == {"inbox": (2, 2), "spam": (1, 0)}
+
+    update_metadata(first, is_read=True)
+    assert counters(account) == {"inbox": (2, 1), "spam": (1, 0)}
+    update_metadata(first, folder="trash")
+    assert counters(account) == {"inbox": (1, 1), "spam": (1, 0), "trash": (1, 0)}
+    update_metadata(second, deleted_at=timezone.now())
+    assert counters(account) == {"spam": (1, 0), "trash": (1, 0)}
+    assert_consistent(account)
+
+
+def test_stale_instance_does_not_count_twice(db):
+    account = make_account()
+    metadata = make_mail(account, "1")
+    stale = EmailMetadata.objects.get(id=metadata.id)
+
+    update_metadata(metadata, is_read=True)
+    # 다른 요청이 먼저 읽음 처리한 행을 옛 상태로 다시 읽음 처리해도 unread 는 한 번만 준다
+    update_metadata(stale, is_read=True)
+    assert counters(account) == {"inbox": (1, 0)}
+    update_metadata(stale, folder="spam")
+    assert counters(account) == {"spam": (1, 0)}
+    assert_consistent(account)
+
+
+def test_bulk_update_skips_unchanged_rows(db):
+    account = make_account()
+    rows = [make_mail(account, str(i), is_read=i == 0) for i in range(3)]
+    ids = [metadata.id for metadata in rows]
+
+    assert sorted(bulk_update_metadata(ids, is_read=True)) == ids[1:]
+    assert bulk_update_metadata(ids, is_read=True) == []
+    bulk_update_metadata(ids[:2], folder="spam", is_read=False)
+    assert counters(account) == {"inbox": (1, 0), "spam": (2, 2)}
+    assert_consistent(account)
+
+
+def test_bulk_restore_counts_deleted_rows_again(db):
+    account = make_account()
+    ids = [make_mail(account, str(i)).id for i in range(2)]
+
+    assert sorted(bulk_update_metadata(ids, deleted_at=timezone.now())) == ids
+    assert counters(account) == {}
+    assert sorted(bulk_update_metadata(ids, deleted_at=None)) == ids
+    assert bulk_update_metadata(ids, deleted_at=None) == []
+    assert counters(account) == {"inbox": (2, 2)}
+    assert_consistent(account)
+
+
+def test_recount_repairs_drift(db):
+    account = make_account()
+    make_mail(account, "1")
+    FolderCounter.objects.filter(account=account, folder="inbox").update(total_count=5, unread_count=0)
+
+    assert recount_folder_counters([account.id]) == [(account.id, "inbox")]
+    assert counters(account) == {"inbox": (1, 1)}
+
+
+def test_folder_counts_has_no_sent_entry():
+    counts = folder_counts([("inbox", 3, 1)], {"inbox": 2})
+    assert counts["inbox"] == {"total": 3, "unread": 0}
+    assert "sent" not in counts
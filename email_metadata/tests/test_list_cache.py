@@ -0,0 +1,69 @@
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.services import create_metadata, update_metadata
+from user.models import User
+
+
+def make_account(user_id):
+    user = User.objects.create(user_id=user_id)
+    return EmailAccount.objects.create(user=user, address=f"{user_id}@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, uid):
+    content = EmailContent.objects.create(
+        message_id=f"<{account.id}.{uid}@example.com>",
+        subject=f"제목 {uid}",
+        from_header="kim@example.com",
+        date=timezone.now(),
+    )
+    return create_metadata(account=account, email=content, uid=uid, received_at=timezone.now(), folder="inbox")
+
+
+def list_mail(account, **params):
+    client = APIClient()
+    client.force_authenticate(account.user)
+    response = client.get("/api/email/", params)
+    assert response.status_code == 200
+    return response["X-Cache"], response.json()
+
+
+def ids(body):
+    return [row["id"] for row in body]
+
+
+def test_list_is_cached_until_the_users_mail_changes(db):
+    account = make_account("cache")
+    first = make_mail(account, "1")
+
+    state, body = list_mail(account, folder="inbox")
+    assert state == "MISS"
+    assert ids(body) == [first.id]
+    assert list_mail(account, folder="inbox") == ("HIT", body)
+    # 파라미터가 다르면 다른 캐시 항목이다
+    assert list_mail(account, folder="spam") == ("MISS", [])
+
+    # 새 메일이 들어오면 무효화된다
+    second = make_mail(account, "2")
+    state, body = list_mail(account, folder="inbox")
+    assert state == "MISS"
+    assert sorted(ids(body)) == [first.id, second.id]
+
+    # 상태 변경도 무효화하고, 다음 응답부터는 다시 캐시된다
+    update_metadata(first, folder="spam")
+    state, body = list_mail(account, folder="inbox")
+    assert state == "MISS"
+    assert ids(body) == [second.id]
+    assert list_mail(account, folder="inbox") == ("HIT", body)
+    assert ids(list_mail(account, folder="spam")[1]) == [first.id]
+
+
+def test_other_users_changes_keep_the_cache(db):
+    mine, theirs = make_account("mine"), make_account("theirs")
+    make_mail(mine, "1")
+    list_mail(mine)
+
+    make_mail(theirs, "1")
+    assert list_mail(mine)[0] == "HIT"
@@ -0,0 +1,83 @@
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from contact.models import Contact
+from contact.serializers import ContactSerializer
+from contact.views import ContactListCreateView
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.models import EmailMetadata, EmailThread
+from email_metadata.serializers import EmailMetadataListSerializer, EmailThreadSerializer
+from email_metadata.services import create_metadata
+from email_metadata.views import EmailMetadataListView, EmailThreadListView
+from user.models import User
+from utils.renderers import ORJSONRenderer
+
+# values() 투영 경로(project_queryset + project_row)의 응답이 serializer_class 의 응답과 같은지 확인한다.
+
+
+def rendered(data, renderer):
+    return json.loads(renderer.render(data))
+
+
+def projected(view, queryset):
+    return [view.project_row(row) for row in view.project_queryset(queryset.all())]
+
+
+def make_account():
+    user = User.objects.create(user_id="projection")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def test_email_list_projection_matches_serializer(db):
+    account = make_account()
+    now = timezone.now()
+    bodies = [
+        {"text_body": "안녕하세요.\n\n  회의 자료입니다. " * 30, "html_body": ""},
+        {"text_body": "", "html_body": "<html><style>p{color:red}</style><p>Hello&nbsp;<b>world</b></p></html>"},
+        {"text_body": "", "html_body": ""},
+    ]
+    for i, body in enumerate(bodies):
+        content = EmailContent.objects.create(
+            message_id=f"<p{i}@example.com>",
+            subject="=?utf-8?b?7ZqM7J2YIOyekOujjA==?=" if i == 0 else f"제목 {i}",
+            from_header="Kim <kim@example.com>",
+            to_header=["me@example.com"],
+            date=None if i == 2 else now - timedelta(minutes=i),
+            **body,
+        )
+        create_metadata(
+            account=account, email=content, uid=str(i), folder="inbox", received_at=now - timedelta(minutes=i)
+        )
+
+    queryset = EmailMetadata.objects.filter(account=account).order_by("-received_at")
+    expected = rendered(EmailMetadataListSerializer(queryset, many=True).data, JSONRenderer())
+    assert rendered(projected(EmailMetadataListView(), queryset), ORJSONRenderer()) == expected
+    assert any(row["thread_id"] for row in expected)
+
+
+def test_thread_list_projection_matches_serializer(db):
+    account = make_account()
+    EmailThread.objects.create(
+        account=account, subject="회의", last_message_at=timezone.now(), message_count=3, unread_count=2
+    )
+    EmailThread.objects.create(account=account, subject="", last_message_at=None)
+
+    view = EmailThreadListView()
+    view.pending_reads = {}
+    queryset = EmailThread.objects.filter(account=account).order_by("id")
+    expected = rendered(EmailThreadSerializer(queryset, many=True).data, JSONRenderer())
+    assert rendered(projected(view, queryset), ORJSONRenderer()) == expected
+
+
+def test_contact_list_projection_matches_serializer(db):
+    account = make_account()
+    Contact.objects.create(account=account, address="friend@example.com")
+    Contact.objects.create(account=account, address="other@example.com")
+
+    queryset = Contact.objects.filter(account=account).order_by("id")
+    expected = rendered(ContactSerializer(queryset, many=True).data, JSONRenderer())
+    assert rendered(projected(ContactListCreateView(), queryset), ORJSONRenderer()) == expected
@@ -0,0 +1,110 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from django.test import override_settings
+
+from email_metadata import read_buffer as read_buffer_module
+from email_metadata import services
+from email_metadata.read_buffer import ReadBuffer, overlay_rows, pending_unread_deltas
+
+
+@pytest.fixture
+def buffer(monkeypatch):
+    buffer = ReadBuffer()
+    monkeypatch.setattr(read_buffer_module, "read_buffer", buffer)
+    # 주기 반영 스레드가 테스트 도중 끼어들지 않도록 주기를 길게 둔다
+    with override_settings(READ_BUFFER_ENABLED=True, READ_BUFFER_FLUSH_INTERVAL=3600, READ_BUFFER_MAX_PENDING=1000):
+        yield buffer
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    calls = []
+
+    def bulk_update_metadata(ids, **changes):
+        calls.append((sorted(ids), changes))
+        return ids
+
+    monkeypatch.setattr(services, "bulk_update_metadata", bulk_update_metadata)
+    return calls
+
+
+def metadata(pk, account_id=1, folder="inbox", thread_id=None):
+    return SimpleNamespace(pk=pk, account_id=account_id, folder=folder, thread_id=thread_id)
+
+
+def test_pending_reads_are_overlaid_per_user(buffer):
+    buffer.mark_read(metadata(1, thread_id=7), user_id=10)
+    buffer.mark_read(metadata(2, thread_id=7), user_id=10)
+    buffer.mark_read(metadata(3), user_id=20)
+
+    rows = [{"id": 1, "is_read": False}, {"id": 3, "is_read": False}, {"id": 4}]
+    assert overlay_rows(rows, 10) == [{"id": 1, "is_read": True}, {"id": 3, "is_read": False}, {"id": 4}]
+    assert pending_unread_deltas(10) == ({(1, "inbox"): 2}, {7: 2})
+    assert pending_unread_deltas(30) == ({}, {})
+
+
+def test_take_removes_only_pending_ids(buffer):
+    buffer.mark_read(metadata(1), user_id=10)
+    buffer.mark_read(metadata(2), user_id=10)
+    assert buffer.take([1, 5]) == {1}
+    assert buffer.take([1]) == set()
+    assert set(buffer.pending(10)) == {2}
+
+
+def test_flush_writes_pending_reads_once(buffer, updates):
+    buffer.mark_read(metadata(1), user_id=10)
+    buffer.mark_read(metadata(2), user_id=10)
+    assert buffer.flush() == 2
+    assert updates == [([1, 2], {"is_read": True})]
+    assert buffer.pending(10) == {}
+    assert buffer.flush() == 0
+    assert len(updates) == 1
+
+
+def test_failed_flush_requeues_without_overwriting_newer_marks(buffer, monkeypatch):
+    def failing(ids, **changes):
+        # 반영 중에 같은 메일이 다른 폴더 정보로 다시 열람됨
+        buffer.mark_read(metadata(1, folder="archive"), user_id=10)
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(services, "bulk_update_metadata", failing)
+    buffer.mark_read(metadata(1), user_id=10)
+    buffer.mark_read(metadata(2), user_id=10)
+    assert buffer.flush() == 0
+    assert buffer.pending(10) == {1: (1, "archive", None), 2: (1, "inbox", None)}
+
+
+def test_take_waits_for_flush_in_progress(buffer, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(ids, **changes):
+        started.set()
+        release.wait(1)
+        return ids
+
+    monkeypatch.setattr(services, "bulk_update_metadata", slow)
+    buffer.mark_read(metadata(1), user_id=10)
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    assert started.wait(1)
+
+    taken = []
+    taker = threading.Thread(target=lambda: taken.append(buffer.take([1])))
+    taker.start()
+    time.sleep(0.05)
+    assert taken == []  # '안읽음' 변경이 진행 중인 '읽음' 반영보다 먼저 적용되지 않는다
+    release.set()
+    flusher.join(1)
+    taker.join(1)
+    assert taken == [set()]
+
+
+def test_disabled_buffer_updates_immediately(monkeypatch):
+    calls = []
+    monkeypatch.setattr(services, "update_metadata", lambda instance, **changes: calls.append((instance.pk, changes)))
+    with override_settings(READ_BUFFER_ENABLED=False):
+        ReadBuffer().mark_read(metadata(1), user_id=10)
+    assert calls == [(1, {"is_read": True})]
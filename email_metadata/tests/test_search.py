@@ -0,0 +1,102 @@
+import pytest
+from django.db.models import Q
+from email_metadata.search import And, Not, Or, SearchQueryError, Term, compile_query, parse_query
+
+
+def test_parse_operators_and_free_text():
+    """연산자와 일반 검색어가 AND 로 묶인 AST 로 파싱되는지 테스트"""
+    node = parse_query('from:Kim@Corp.com subject:"주간 보고" has:attachment 회의')
+    assert node == And(
+        (
+            Term("from", "Kim@Corp.com"),
+            Term("subject", "주간 보고"),
+            Term("has", "attachment"),
+            Term(None, "회의"),
+        )
+    )
+
+
+def test_parse_negation_or_and_parentheses():
+    node = parse_query("-is:read (from:a@x.com OR from:b@x.com) in:spam")
+    assert node == And(
+        (
+            Not(Term("is", "read")),
+            Or((Term("from", "a@x.com"), Term("from", "b@x.com"))),
+            Term("folder", "spam"),
+        )
+    )
+
+
+def test_unknown_operator_is_free_text():
+    """지원하지 않는 연산자(예: URL)는 일반 검색어로 취급"""
+    assert parse_query("https://example.com") == Term(None, "https://example.com")
+
+
+def test_empty_query():
+    assert parse_query("   ") is None
+    assert compile_query(None) == Q()
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["is:unknown", "has:video", "folder:nowhere", "before:2025-13-01", "(from:a@x.com", "a OR", "a)"],
+)
+def test_invalid_queries(text):
+    with pytest.raises(SearchQueryError):
+        parse_query(text)
+
+
+def test_compile_simple_flags():
+    """인덱스 컬럼을 쓰는 조건이 해당 필드 조건으로 컴파일되는지 테스트"""
+    assert compile_query(parse_query("is:unread")) == Q(is_read=False)
+    assert compile_query(parse_query("has:attachment")) == Q(email__has_attachment=True)
+    assert compile_query(parse_query("-folder:spam")) == ~Q(folder="spam")
+
+
+def _search_db(text):
+    from email_metadata.models import EmailMetadata
+
+    return set(
+        EmailMetadata.objects.filter(compile_query(parse_query(text), ["me@example.com"])).values_list("uid", flat=True)
+    )
+
+
+@pytest.fixture
+def mailbox(db):
+    from django.utils import timezone
+
+    from email_account.models import EmailAccount
+    from email_content.models import EmailContent
+    from email_content.service.imap import create_participants
+    from email_metadata.services import create_metadata
+    from user.models import User
+
+    account = EmailAccount.objects.create(
+        user=User.objects.create(user_id="search"), address="me@example.com", domain="imap.gmail.com"
+    )
+    for uid, sender in (("kim", "Kim <kim@corp.com>"), ("lee", "이영희 <lee@gmail.com>")):
+        content = EmailContent.objects.create(
+            message_id=f"<{uid}@example.com>",
+            subject="안내",
+            from_header=sender,
+            to_header=["Me <me@example.com>"],
+            date=timezone.now(),
+        )
+        create_participants(content)
+        create_metadata(account=account, email=content, uid=uid, folder="inbox", received_at=timezone.now())
+    return account
+
+
+def test_complete_address_matches_exactly(mailbox):
+    assert _search_db("from:kim@corp.com") == {"kim"}
+    assert _search_db("from:im@corp.com") == set()
+    assert _search_db("to:me@example.com") == {"kim", "lee"}
+
+
+def test_domain_and_partial_address_match_as_substring(mailbox):
+    # 완전한 주소가 아니면 부분 일치로 찾는다 (기존 from_header/to_header icontains 검색과 같게)
+    assert _search_db("@gmail.com") == {"lee"}
+    assert _search_db("from:@corp.com") == {"kim"}
+    assert _search_db("kim@") == {"kim"}
+    assert _search_db("from:corp.com") == {"kim"}
+    assert _search_db("from:이영희") == {"lee"}
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from email_account.models import EmailAccount
+from email_content.models import EmailContent
+from email_metadata.models import EmailThread
+from email_metadata.services import bulk_update_metadata, create_metadata, update_metadata
+from user.models import User
+
+NOW = timezone.now().replace(microsecond=0)
+
+
+def make_account():
+    user = User.objects.create(user_id="threads")
+    return EmailAccount.objects.create(user=user, address="me@example.com", domain="imap.gmail.com")
+
+
+def make_mail(account, message_id, subject="회의", minutes=0, headers=None, **fields):
+    content = EmailContent.objects.create(
+        message_id=message_id, subject=subject, from_header="kim@example.com", date=NOW, headers=headers or {}
+    )
+    return create_metadata(
+        account=account,
+        email=content,
+        uid=message_id,
+        folder="inbox",
+        received_at=NOW + timedelta(minutes=minutes),
+        **fields,
+    )
+
+
+def thread_of(metadata):
+    metadata.refresh_from_db()
+    return EmailThread.objects.get(id=metadata.thread_id)
+
+
+def test_reply_chain_merges_threads(db):
+    account = make_account()
+    # 답장이 원본보다 먼저 도착해 스레드가 둘로 나뉜 상태
+    reply = make_mail(account, "<b@x>", "Re: 회의", minutes=2, headers={"In-Reply-To": "<a@x>"})
+    other = make_mail(account, "<c@x>", "안건", minutes=1, is_read=True)
+    assert thread_of(reply).id != thread_of(other).id
+
+    original = make_mail(account, "<a@x>", "회의", minutes=0, headers={"References": "<c@x>"})
+    thread = thread_of(original)
+    assert thread_of(reply).id == thread_of(other).id == thread.id
+    assert (thread.message_count, thread.unread_count) == (3, 2)
+    assert thread.last_message_at == NOW + timedelta(minutes=2)
+    assert EmailThread.objects.filter(account=account).count() == 1
+
+
+def test_subject_only_reply_joins_thread(db):
+    account = make_account()
+    first = make_mail(account, "<a@x>", "주간 보고")
+    reply = make_mail(account, "<b@x>", "RE: 주간 보고", minutes=5)
+    assert thread_of(first).id == thread_of(reply).id
+
+
+def test_deleting_latest_message_recomputes_last_message_at(db):
+    account = make_account()
+    first = make_mail(account, "<a@x>")
+    latest = make_mail(account, "<b@x>", "Re: 회의", minutes=10, headers={"In-Reply-To": "<a@x>"})
+    assert thread_of(first).last_message_at == NOW + timedelta(minutes=10)
+
+    update_metadata(latest, deleted_at=timezone.now())
+    thread = thread_of(first)
+    assert (thread.message_count, thread.unread_count, thread.last_message_at) == (1, 1, NOW)
+
+    # 복원하면 다시 최근 메일을 따른다
+    update_metadata(latest, deleted_at=None)
+    thread = thread_of(first)
+    assert (thread.message_count, thread.last_message_at) == (2, NOW + timedelta(minutes=10))
+
+    bulk_update_metadata([first.id, latest.id], deleted_at=timezone.now())
+    thread = thread_of(first)
+    assert (thread.message_count, thread.unread_count, thread.last_message_at) == (0, 0, None)
@@ -0,0 +1,148 @@
+import re
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from email_content.utils import decode_subject
+from .cache import invalidate_accounts
+from .models import EmailMetadata, EmailThread, SyncVersion, ThreadKey
+
+# 대화 스레드 배정.
+# Message-ID / In-Reply-To / References 를 키로 삼는 union-find 방식이다.
+# 새 메일이 들어오면 자신의 키들로 기존 스레드를 찾고,
+#   - 하나도 없으면 새 스레드를 만들고
+#   - 하나면 거기에 붙이고
+#   - 여러 개면(답장이 원본보다 먼저 도착한 경우 등) 가장 큰 스레드로 나머지를 합친다.
+# 메일 한 통마다 키 개수만큼의 인덱스 조회만 하므로, 전체 메일함을 다시 계산할 필요가 없다.
+
+REPLY_PREFIX = re.compile(r"^\s*((re|fw|fwd|aw|sv|답장|회신|전달)\s*(\[\d+\])?\s*[:：]\s*)+", re.IGNORECASE)
+MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+
+# 참조 헤더 없이 제목만으로 스레드를 이어붙일 때 허용하는 최대 간격
+SUBJECT_MATCH_WINDOW = timedelta(days=30)
+
+
+def normalize_subject(subject: str) -> tuple[str, bool]:
+    """제목에서 Re:/Fwd:/회신: 등의 접두어를 떼어낸 제목과, 접두어가 있었는지 여부를 반환한다."""
+    decoded = decode_subject(subject)
+    stripped = REPLY_PREFIX.sub("", decoded)
+    normalized = re.sub(r"\s+", " ", stripped).strip()
+    return normalized[:200], stripped != decoded
+
+
+def parse_message_ids(value) -> list[str]:
+    """헤더 값에서 <...> 형태의 Message-ID 들을 순서대로 추출한다."""
+    if not value:
+        return []
+    ids = MESSAGE_ID.findall(str(value))
+    if not ids and str(value).strip():
+        ids = [f"<{str(value).strip().strip('<>')}>"]
+    return [mid[:255] for mid in ids]
+
+
+def _message_keys(email_obj) -> list[str]:
+    headers = email_obj.headers or {}
+    keys = parse_message_ids(email_obj.message_id)
+    keys += parse_message_ids(headers.get("References"))
+    keys += parse_message_ids(headers.get("In-Reply-To"))
+    return list(dict.fromkeys(keys))
+
+
+def _merge_threads(target, others):
+    """others 스레드들을 target 으로 합친다. 메시지와 키를 옮기고 집계값을 더한다."""
+    other_ids = [t.id for t in others]
+    # 옮겨진 메일은 thread_id 가 바뀌므로 동기화 버전도 올린다
+    EmailMetadata.objects.filter(thread_id__in=other_ids).update(thread=target, version=SyncVersion.next())
+    ThreadKey.objects.filter(thread_id__in=other_ids).update(thread=target)
+
+    last_dates = [t.last_message_at for t in [target, *others] if t.last_message_at]
+    target.message_count += sum(t.message_count for t in others)
+    target.unread_count += sum(t.unread_count for t in others)
+    target.last_message_at = max(last_dates) if last_dates else None
+    if not target.subject:
+        target.subject = next((t.subject for t in others if t.subject), "")
+    target.save(update_fields=["message_count", "unread_count", "last_message_at", "subject"])
+    EmailThread.objects.filter(id__in=other_ids).delete()
+
+
+def _find_by_subject(account_id, subject_key, received_at):
+    """참조 헤더가 없는 답장 메일을 같은 제목의 최근 스레드에 붙이기 위해 찾는다."""
+    key = ThreadKey.objects.select_related("thread").filter(account_id=account_id, key=subject_key).first()
+    if not key:
+        return None
+    last = key.thread.last_message_at
+    if received_at and last and abs(received_at - last) > SUBJECT_MATCH_WINDOW:
+        return None
+    return key.thread
+
+
+def assign_thread(metadata):
+    """
+    새로 저장된 EmailMetadata 에 스레드를 배정하고 스레드 집계값을 갱신합니다.
+    services.create_metadata 의 트랜잭션 안에서 호출됩니다.
+    """
+    email_obj = metadata.email
+    account_id = metadata.account_id
+    subject, is_reply = normalize_subject(email_obj.subject)
+    subject_key = f"subject:{subject.lower()}" if subject else None
+    keys = _message_keys(email_obj)
+
+    with transaction.atomic():
+        thread_ids = set(
+            ThreadKey.objects.filter(account_id=account_id, key__in=keys).values_list("thread_id", flat=True)
+        )
+        threads = list(EmailThread.objects.filter(id__in=thread_ids).order_by("-message_count", "id"))
+
+        if threads:
+            thread = threads[0]
+            if len(threads) > 1:
+                # union by size: 큰 스레드를 남기고 작은 스레드들을 옮긴다
+                _merge_threads(thread, threads[1:])
+        else:
+            thread = None
+            # 참조 헤더가 하나도 없는 답장(Re: ...)은 제목으로 찾아본다
+            if is_reply and subject_key and len(keys) <= 1:
+                thread = _find_by_subject(account_id, subject_key, metadata.received_at)
+            if thread is None:
+                thread = EmailThread.objects.create(account_id=account_id, subject=subject)
+
+        new_keys = keys + ([subject_key] if subject_key and not is_reply else [])
+        ThreadKey.objects.bulk_create(
+            [ThreadKey(account_id=account_id, key=key, thread=thread) for key in new_keys],
+            ignore_conflicts=True,
+        )
+
+        updates = {"message_count": F("message_count") + 1}
+        if not metadata.is_read:
+            updates["unread_count"] = F("unread_count") + 1
+        if metadata.received_at:
+            if thread.last_message_at:
+                updates["last_message_at"] = Greatest(F("last_message_at"), metadata.received_at)
+            else:
+                updates["last_message_at"] = metadata.received_at
+        EmailThread.objects.filter(id=thread.id).update(**updates)
+
+        EmailMetadata.objects.filter(id=metadata.id).update(thread=thread)
+        metadata.thread = thread
+    return thread
+
+
+def rebuild_threads(account):
+    """계정의 스레드를 모두 지우고, 수신 순서대로 다시 배정합니다. (기존 메일 backfill / 복구용)"""
+    with transaction.atomic():
+        EmailThread.objects.filter(account=account).delete()
+        queryset = (
+            EmailMetadata.objects.filter(account=account, deleted_at__isnull=True)
+            .select_related("email")
+            .order_by("received_at", "id")
+        )
+        count = 0
+        for metadata in queryset.iterator(chunk_size=500):
+            assign_thread(metadata)
+            count += 1
+        # thread_id 가 모두 바뀌었으므로 클라이언트가 다시 받아가도록 버전을 올린다
+        EmailMetadata.objects.filter(account=account).update(version=SyncVersion.next())
+        invalidate_accounts([account.id])
+    return count
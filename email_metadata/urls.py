@@ -1,11 +1,30 @@
 from django.urls import path
-from .views import EmailMetadataListView, EmailUpdateView, EmailSummarizeView
+from .views import (
+    EmailBulkActionView,
+    EmailChangesView,
+    EmailMetadataListView,
+    EmailThreadListView,
+    EmailUpdateView,
+    EmailSummarizeView,
+    EmailSummaryStreamView,
+)
 
 app_name = "email_metadata"
 
 urlpatterns = [
     path("", EmailMetadataListView.as_view(), name="email-list"),
+    path("bulk/", EmailBulkActionView.as_view(), name="email-bulk"),
+    path("changes/", EmailChangesView.as_view(), name="email-changes"),
+    path("threads/", EmailThreadListView.as_view(), name="email-thread-list"),
     path("<int:pk>/", EmailUpdateView.as_view(), name="email-detail"),
     path("<int:pk>/summarize/", EmailSummarizeView.as_view(resummarize=False), name="email-summarize"),
     path("<int:pk>/resummarize/", EmailSummarizeView.as_view(resummarize=True), name="email-resummarize"),
+    path(
+        "<int:pk>/summarize/stream/", EmailSummaryStreamView.as_view(resummarize=False), name="email-summarize-stream"
+    ),
+    path(
+        "<int:pk>/resummarize/stream/",
+        EmailSummaryStreamView.as_view(resummarize=True),
+        name="email-resummarize-stream",
+    ),
 ]
@@ -1,29 +1,58 @@
+import logging
+
 from rest_framework import generics, permissions, serializers, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.db import connection
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
-from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
+from drf_spectacular.utils import extend_schema, inline_serializer, OpenApiParameter, OpenApiExample
 from drf_spectacular.types import OpenApiTypes
 
-from django.db.models import Q
-from .models import EmailMetadata
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.functions import Substr
+from .models import EmailMetadata, EmailThread, SyncVersion
 from .serializers import (
+    EmailBulkActionSerializer,
+    EmailBulkResultSerializer,
     EmailDetailSerializer,
+    EmailThreadSerializer,
     EmailUpdateSerializer,
     EmailMetadataListSerializer,
     EmailSummarySerializer,
 )
+from .cache import get_list, list_cache_key, set_list
+from .read_buffer import overlay_rows, pending_unread_deltas, read_buffer
+from .search import SearchQueryError, compile_query, parse_query_cached
+from .services import bulk_update_metadata, update_metadata
 from email_account.models import EmailAccount
+from email_content.models import EmailParticipant
+from email_content.service import near_duplicates
+from email_content.service.summaries import summarize_metadata
+from email_content.service.summary_cache import SummaryWaitTimeout
+from email_content.service.spam_model import learn_from_moves
+from email_content.utils import decode_subject, make_preview
+from utils.summarizer import summarize_locally
+from utils.async_stream import stream_from_thread
+from utils.projection import ProjectionListMixin, format_datetime
+from utils.renderers import EventStreamRenderer, ORJSONRenderer, format_event
+from utils.sparse_fields import SPARSE_FIELD_PARAMETERS, is_selected, sparse_fields
 
 # 메일 요약을 위해 import한 부분
-from utils.summarizer import summarize_email_content
 from rest_framework.views import APIView
 
 #############################
 
+logger = logging.getLogger(__name__)
+
 User = get_user_model()
 
+# 목록 미리보기(150자)를 만들 때 읽어오는 본문 앞부분 길이. HTML 은 태그/스타일을 걷어내야 하므로 넉넉히 읽는다.
+PREVIEW_TEXT_HEAD = 2000
+PREVIEW_HTML_HEAD = 50000
+
 
 class TestPermission(permissions.BasePermission):
     """
@@ -47,6 +76,69 @@ class TestPermission(permissions.BasePermission):
         return False
 
 
+def filter_email_list(user, params):
+    """
+    목록 조회 조건(folder, accounts, query, thread)으로 사용자의 메일을 필터링하고 정렬한 쿼리셋을 반환합니다.
+    목록 조회와 일괄 작업(필터 지정 방식)이 같은 조건 해석을 쓰도록 분리했습니다.
+    """
+    # 소프트 딜리트된 메일 제외
+    base_queryset = EmailMetadata.objects.filter(account__user=user, deleted_at__isnull=True)
+
+    folder = params.get("folder", None)
+    accounts_param = params.get("accounts", None)
+    search_query = params.get("query", None)
+    thread_id = params.get("thread", None)
+
+    if folder == "sent":
+        # 내 계정 주소 중 하나가 보낸 사람(from)인 메일. participants의 (address, role) 인덱스를 사용한다.
+        user_email_addresses = [
+            addr.lower() for addr in EmailAccount.objects.filter(user=user).values_list("address", flat=True)
+        ]
+        sent_by_me = EmailParticipant.objects.filter(
+            email=OuterRef("email"), role="from", address__in=user_email_addresses
+        )
+        queryset = base_queryset.filter(Exists(sent_by_me))
+        order_by_field = "-email__date"
+        account_filter_field = "account__address__in"
+
+    else:
+        queryset = base_queryset
+        order_by_field = "-received_at"
+        account_filter_field = "account__address__in"
+
+    if folder and folder != "sent":
+        queryset = queryset.filter(folder=folder)
+
+    if accounts_param:
+        requested_emails = set(accounts_param.split(","))
+        user_emails = set(EmailAccount.objects.filter(user=user).values_list("address", flat=True))
+
+        if not requested_emails.issubset(user_emails):
+            invalid_accounts = sorted(list(requested_emails - user_emails))
+            raise serializers.ValidationError(
+                f"You do not have permission for the following accounts: {invalid_accounts}"
+            )
+
+        queryset = queryset.filter(**{account_filter_field: list(requested_emails)})
+
+    if thread_id:
+        if not thread_id.isdigit():
+            raise serializers.ValidationError({"thread": "thread must be an integer id."})
+        queryset = queryset.filter(thread_id=int(thread_id))
+
+    if search_query:
+        try:
+            node = parse_query_cached(user.pk, search_query)
+        except SearchQueryError as e:
+            raise serializers.ValidationError({"query": str(e)})
+        my_addresses = [
+            addr.lower() for addr in EmailAccount.objects.filter(user=user).values_list("address", flat=True)
+        ]
+        queryset = queryset.filter(compile_query(node, my_addresses))
+
+    return queryset.order_by(order_by_field)
+
+
 @extend_schema(
     description="""
         메일 통합 조회를 위핸 API View입니다. 해당 API로 가능한 것:
@@ -75,10 +167,29 @@ class TestPermission(permissions.BasePermission):
         ),
         OpenApiParameter(
             name="query",
-            description="검색어로 필터링합니다. 보낸사람, 제목, 내용, 수신자 필드를 대상으로 검색합니다.",
+            description="""검색어로 필터링합니다. 일반 단어는 보낸사람, 제목, 내용, 수신자를 대상으로 검색합니다.
+            Gmail 스타일 연산자를 지원합니다: `from:` `to:` `cc:` `bcc:` (주소 또는 이름, `me` 사용 가능),
+            `subject:`, `has:attachment`, `is:unread|read|important|pinned|starred`,
+            `before:YYYY-MM-DD`, `after:YYYY-MM-DD`, `folder:` (`in:`), 따옴표 구문("..."), `-` (제외), `OR`, 괄호.
+            예) `from:kim@corp.com has:attachment after:2025-01-01 -is:read`""",
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="thread",
+            description="스레드 ID로 필터링합니다. 스레드에 속한 메일만 조회합니다.",
+            required=False,
+            type=OpenApiTypes.INT,
+        ),
+        OpenApiParameter(
+            name="collapse",
+            description="""`duplicates` 이면 추적 링크/수신자 이름만 다른 유사 메일(같은 광고 메일 등)을 묶어,
+            같은 폴더에서 가장 최근에 받은 메일 하나만 보여줍니다.""",
             required=False,
             type=OpenApiTypes.STR,
+            enum=["duplicates"],
         ),
+        *SPARSE_FIELD_PARAMETERS,
     ],
     responses={
         200: EmailMetadataListSerializer(many=True),
@@ -86,7 +197,7 @@ class TestPermission(permissions.BasePermission):
         401: OpenApiTypes.OBJECT,
     },
 )
-class EmailMetadataListView(generics.ListAPIView):
+class EmailMetadataListView(ProjectionListMixin, generics.ListAPIView):
     """메일 통합 조회를 위한 API View"""
 
     serializer_class = EmailMetadataListSerializer
@@ -102,53 +213,247 @@ class EmailMetadataListView(generics.ListAPIView):
         if not user.is_authenticated:
             return EmailMetadata.objects.none()
 
-        # 소프트 딜리트된 메일 제외
-        base_queryset = EmailMetadata.objects.filter(account__user=user, deleted_at__isnull=True)
+        queryset = filter_email_list(user, self.request.query_params)
+        if self.request.query_params.get("collapse") == "duplicates":
+            queryset = near_duplicates.collapse(queryset, user)
+        return queryset
+
+    def project_queryset(self, queryset):
+        # 미리보기에는 본문 앞부분만 필요하므로 본문 전체를 읽지 않는다
+        return queryset.values(
+            "id",
+            "account__address",
+            "folder",
+            "is_read",
+            "is_important",
+            "is_pinned",
+            "received_at",
+            "thread_id",
+            "email__subject",
+            "email__from_header",
+            "email__date",
+            text_head=Substr("email__text_body", 1, PREVIEW_TEXT_HEAD),
+            html_head=Substr("email__html_body", 1, PREVIEW_HTML_HEAD),
+        )
+
+    def project_row(self, row):
+        """EmailMetadataListSerializer 와 같은 형식의 dict 를 만듭니다."""
+        return {
+            "id": row["id"],
+            "account_address": row["account__address"],
+            "folder": row["folder"],
+            "is_read": row["is_read"],
+            "is_important": row["is_important"],
+            "is_pinned": row["is_pinned"],
+            "received_at": format_datetime(row["received_at"]),
+            "thread_id": row["thread_id"],
+            "email": {
+                "subject": decode_subject(row["email__subject"]),
+                "from_header": row["email__from_header"],
+                "date": format_datetime(row["email__date"]) if row["email__date"] else None,
+                "preview": make_preview(row["text_head"], row["html_head"]),
+            },
+        }
+
+    def list(self, request, *args, **kwargs):
+        """
+        같은 사용자/파라미터의 목록 응답을 캐시에서 돌려줍니다.
+        메일이 들어오거나 상태가 바뀌면 services 에서 사용자 세대 번호를 올려 무효화합니다. (cache.py)
+        """
+        key = list_cache_key(request.user.pk, request.query_params.lists())
+        data = get_list(key)
+        if data is not None:
+            return Response(overlay_rows(data, request.user.pk), headers={"X-Cache": "HIT"})
+
+        response = super().list(request, *args, **kwargs)
+        set_list(key, response.data)
+        # 아직 DB 에 반영되지 않은 읽음 표시는 캐시에 넣지 않고 응답에만 덧씌운다
+        response.data = overlay_rows(response.data, request.user.pk)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ThreadPagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-last_message_at", "-id")
+
+
+@extend_schema(
+    summary="스레드(대화) 목록 조회",
+    description="""메일을 대화 단위로 묶은 스레드 목록을 최근 메일 순으로 조회합니다.
+        스레드는 메일 수신 시점에 In-Reply-To/References 헤더와 제목으로 배정되며,
+        메시지 수/안읽음 수/마지막 메일 시각은 미리 집계되어 있습니다.
+        스레드에 속한 메일은 `GET /api/email/?thread=<id>` 로 조회합니다.
+        커서 기반 페이지네이션을 사용합니다. (`next`/`previous` 링크 사용)""",
+    parameters=[
+        OpenApiParameter(
+            name="accounts",
+            description="콤마(,)로 구분된 이메일 주소 목록으로 필터링합니다. 생략 시 모든 계정을 포함합니다.",
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="folder",
+            description="해당 폴더의 메일을 하나 이상 포함한 스레드만 조회합니다.",
+            required=False,
+            type=OpenApiTypes.STR,
+            enum=[choice[0] for choice in EmailMetadata.FOLDER_CHOICES if choice[0] != "sent"],
+        ),
+        *SPARSE_FIELD_PARAMETERS,
+    ],
+)
+class EmailThreadListView(ProjectionListMixin, generics.ListAPIView):
+    """스레드 목록 조회를 위한 API View"""
+
+    serializer_class = EmailThreadSerializer
+    permission_classes = [TestPermission]
+    pagination_class = ThreadPagination
+
+    def get_queryset(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return EmailThread.objects.none()
+
+        queryset = EmailThread.objects.filter(account__user=user, message_count__gt=0).select_related("account")
 
-        folder = self.request.query_params.get("folder", None)
         accounts_param = self.request.query_params.get("accounts", None)
-        search_query = self.request.query_params.get("query", None)
+        if accounts_param:
+            queryset = queryset.filter(account__address__in=accounts_param.split(","))
 
-        if folder == "sent":
-            user_email_addresses = list(EmailAccount.objects.filter(user=user).values_list("address", flat=True))
-            from_filters = [Q(email__from_header__icontains=addr) for addr in user_email_addresses]
-            from_query = Q()
-            for f in from_filters:
-                from_query |= f
+        folder = self.request.query_params.get("folder", None)
+        if folder:
+            in_folder = EmailMetadata.objects.filter(thread=OuterRef("pk"), folder=folder, deleted_at__isnull=True)
+            queryset = queryset.filter(Exists(in_folder))
 
-            queryset = base_queryset.filter(from_query)
-            order_by_field = "-email__date"
-            account_filter_field = "account__address__in"
+        return queryset
 
-        else:
-            queryset = base_queryset
-            order_by_field = "-received_at"
-            account_filter_field = "account__address__in"
+    def list(self, request, *args, **kwargs):
+        # 반영 대기 중인 읽음 표시만큼 스레드 안읽음 수를 보정한다 (read_buffer)
+        _folders, self.pending_reads = pending_unread_deltas(request.user.pk)
+        return super().list(request, *args, **kwargs)
+
+    def project_queryset(self, queryset):
+        return queryset.values("id", "account__address", "subject", "last_message_at", "message_count", "unread_count")
+
+    def project_row(self, row):
+        """EmailThreadSerializer 와 같은 형식의 dict 를 만듭니다."""
+        return {
+            "id": row["id"],
+            "account_address": row["account__address"],
+            "subject": row["subject"],
+            "last_message_at": format_datetime(row["last_message_at"]) if row["last_message_at"] else None,
+            "message_count": row["message_count"],
+            "unread_count": max(row["unread_count"] - self.pending_reads.get(row["id"], 0), 0),
+        }
+
+
+def _parse_sync_cursor(value):
+    """
+    changes API 커서를 (version, id) 로 해석합니다.
+    "<version>" 은 해당 버전 이후 전체, "<version>:<id>" 는 같은 버전 안에서 id 이후부터를 뜻합니다.
+    """
+    try:
+        version, _, last_id = value.partition(":")
+        return int(version), int(last_id) if last_id else None
+    except ValueError:
+        raise serializers.ValidationError({"cursor": "잘못된 커서입니다."})
+
+
+@extend_schema(
+    summary="변경분 동기화 (changes since cursor)",
+    description="""클라이언트가 마지막으로 받은 커서 이후에 생성/수정/삭제된 메일만 반환합니다.
+        1. `cursor` 없이 호출하면 변경 목록 없이 현재 커서만 반환합니다. (전체 목록을 받은 직후 호출)
+        2. 이후에는 응답의 `cursor` 를 그대로 넘겨 변경분을 받습니다.
+        3. `has_more` 가 true 이면 즉시 다시 호출하여 나머지를 받습니다.
+        - `changed`: 새로 들어왔거나 상태(폴더/읽음/중요/고정/스레드)가 바뀐 메일. 목록 조회와 같은 형식입니다.
+        - `deleted`: 영구 삭제된 메일의 ID 목록.""",
+    parameters=[
+        OpenApiParameter(
+            name="cursor",
+            description="이전 응답의 `cursor` 값. 생략 시 현재 커서만 반환합니다.",
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+        OpenApiParameter(
+            name="limit",
+            description="한 번에 받을 최대 변경 수 (기본 500, 최대 2000)",
+            required=False,
+            type=OpenApiTypes.INT,
+        ),
+        OpenApiParameter(
+            name="accounts",
+            description="콤마(,)로 구분된 이메일 주소 목록으로 필터링합니다. 생략 시 모든 계정을 포함합니다.",
+            required=False,
+            type=OpenApiTypes.STR,
+        ),
+    ],
+    responses={
+        200: inline_serializer(
+            name="EmailChangesResponse",
+            fields={
+                "cursor": serializers.CharField(),
+                "has_more": serializers.BooleanField(),
+                "changed": EmailMetadataListSerializer(many=True),
+                "deleted": serializers.ListField(child=serializers.IntegerField()),
+            },
+        ),
+        400: OpenApiTypes.OBJECT,
+        401: OpenApiTypes.OBJECT,
+    },
+)
+class EmailChangesView(APIView):
+    """마지막 커서 이후의 메일 변경분을 반환하는 API View"""
+
+    permission_classes = [TestPermission]
+    default_limit = 500
+    max_limit = 2000
 
-        if folder and folder != "sent":
-            queryset = queryset.filter(folder=folder)
+    def get(self, request, *args, **kwargs):
+        cursor_param = request.query_params.get("cursor")
+        if not cursor_param:
+            return Response({"cursor": str(SyncVersion.current()), "has_more": False, "changed": [], "deleted": []})
+
+        version, last_id = _parse_sync_cursor(cursor_param)
+        try:
+            limit = min(int(request.query_params.get("limit", self.default_limit)), self.max_limit)
+        except ValueError:
+            raise serializers.ValidationError({"limit": "정수여야 합니다."})
+        limit = max(limit, 1)
 
+        queryset = EmailMetadata.objects.filter(account__user=request.user)
+        accounts_param = request.query_params.get("accounts")
         if accounts_param:
-            requested_emails = set(accounts_param.split(","))
-            user_emails = set(EmailAccount.objects.filter(user=user).values_list("address", flat=True))
-
-            if not requested_emails.issubset(user_emails):
-                invalid_accounts = sorted(list(requested_emails - user_emails))
-                raise serializers.ValidationError(
-                    f"You do not have permission for the following accounts: {invalid_accounts}"
-                )
-
-            queryset = queryset.filter(**{account_filter_field: list(requested_emails)})
-
-        if search_query:
-            queryset = queryset.filter(
-                Q(email__subject__icontains=search_query)
-                | Q(email__from_header__icontains=search_query)
-                | Q(email__text_body__icontains=search_query)
-                | Q(email__to_header__icontains=search_query)
-            )
+            queryset = queryset.filter(account__address__in=accounts_param.split(","))
+
+        if last_id is None:
+            queryset = queryset.filter(version__gt=version)
+        else:
+            queryset = queryset.filter(Q(version__gt=version) | Q(version=version, id__gt=last_id))
+
+        rows = list(queryset.select_related("email", "account").order_by("version", "id")[: limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if has_more:
+            # 같은 버전(일괄 변경)의 행이 limit 경계에 걸쳐 있을 수 있으므로 id 까지 커서에 담는다
+            next_cursor = f"{rows[-1].version}:{rows[-1].id}"
+        elif rows:
+            next_cursor = str(rows[-1].version)
+        else:
+            next_cursor = cursor_param
 
-        return queryset.order_by(order_by_field)
+        changed = [m for m in rows if m.deleted_at is None]
+        deleted = [m.id for m in rows if m.deleted_at is not None]
+        return Response(
+            {
+                "cursor": next_cursor,
+                "has_more": has_more,
+                "changed": EmailMetadataListSerializer(changed, many=True, context={"request": request}).data,
+                "deleted": deleted,
+            }
+        )
 
 
 @extend_schema(
@@ -160,7 +465,9 @@ class EmailMetadataListView(generics.ListAPIView):
 3. DELETE:
     - 휴지통에 있지 않은 경우: 휴지통으로 이동시키고, 수정된 이메일 정보를 반환합니다. (상태 코드 200)
     - 휴지통에 있는 경우: 영구 삭제(소프트 딜리트)하고, 내용 없는 응답을 반환합니다. (상태 코드 204)
+`fields` / `exclude` 로 필요한 필드만 받을 수 있습니다. (예: `exclude=email.text_body`)
     """,
+    parameters=SPARSE_FIELD_PARAMETERS,
     request=EmailUpdateSerializer,
     responses={
         200: EmailDetailSerializer,
@@ -185,7 +492,20 @@ class EmailUpdateView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """요청한 사용자가 소유하고, 영구 삭제되지 않은 이메일만 조회하도록 쿼리셋을 필터링합니다."""
-        return super().get_queryset().filter(account__user=self.request.user, deleted_at__isnull=True)
+        queryset = (
+            super()
+            .get_queryset()
+            .filter(account__user=self.request.user, deleted_at__isnull=True)
+            .select_related("email", "account")
+        )
+        # 응답에서 빠지는 본문 컬럼은 DB 에서도 읽지 않는다 (HTML 뉴스레터는 수백 KB)
+        include, exclude = sparse_fields(self.request)
+        deferred = [
+            f"email__{name}"
+            for name in ("text_body", "html_body")
+            if not is_selected(include, exclude, ("email", name))
+        ]
+        return queryset.defer(*deferred) if deferred else queryset
 
     def partial_update(self, request, *args, **kwargs):
         kwargs["partial"] = True
@@ -194,18 +514,28 @@ class EmailUpdateView(generics.RetrieveUpdateDestroyAPIView):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
 
-        response_serializer = EmailDetailSerializer(instance)
+        response_serializer = EmailDetailSerializer(instance, context=self.get_serializer_context())
         return Response(response_serializer.data)
 
+    def perform_update(self, serializer):
+        """폴더 카운터가 함께 갱신되도록 services.update_metadata 를 통해 저장합니다."""
+        instance = serializer.instance
+        old_folder = instance.folder
+        update_metadata(instance, **serializer.validated_data)
+        # 스팸함으로/스팸함에서 옮긴 경우 로컬 스팸 모델에 학습시킨다
+        learn_from_moves([(instance.pk, old_folder, instance.folder)])
+
     def retrieve(self, request, *args, **kwargs):
         """
         상세 조회 시, 해당 이메일을 '읽음' 상태로 자동 변경합니다.
         """
         instance = self.get_object()
         if not instance.is_read:
+            # DB 반영은 read_buffer 가 모아서 처리한다. 응답에는 바로 읽음으로 보여준다.
+            read_buffer.mark_read(instance, request.user.pk)
             instance.is_read = True
-            instance.save(update_fields=["is_read"])
-        return super().retrieve(request, *args, **kwargs)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -216,18 +546,99 @@ class EmailUpdateView(generics.RetrieveUpdateDestroyAPIView):
         instance = self.get_object()
         if instance.folder != "trash":
             # 휴지통으로 이동
-            instance.folder = "trash"
-            instance.save(update_fields=["folder"])
+            update_metadata(instance, folder="trash")
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
         else:
             # 영구 삭제
             # 소프트 딜리트 방식. 새로 imap sync를 해도 복구되지 않음.
-            instance.deleted_at = timezone.now()
-            instance.save(update_fields=["deleted_at"])
+            update_metadata(instance, deleted_at=timezone.now())
             return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@extend_schema(
+    summary="메일 일괄 작업",
+    description="""여러 메일에 같은 작업을 한 번에 적용합니다.
+        대상은 `ids` 로 직접 지정하거나, `filter` (목록 조회와 같은 folder/accounts/query/thread 조건)와
+        `exclude_ids` 로 지정합니다. ('전체 선택 후 일부 제외')
+        작업: `read`, `unread`, `move` (`folder` 필요), `important`/`pin` (`value` 로 설정/해제),
+        `trash`, `purge` (휴지통에 있는 메일만 영구 삭제)
+        이미 해당 상태인 메일은 건너뛰며, 실제로 변경된 메일의 ID 와 개수만 반환합니다.""",
+    request=EmailBulkActionSerializer,
+    responses={
+        200: EmailBulkResultSerializer,
+        400: OpenApiTypes.OBJECT,
+        401: OpenApiTypes.OBJECT,
+    },
+    examples=[
+        OpenApiExample(
+            "선택한 메일 읽음 처리",
+            value={"action": "read", "ids": [101, 102, 103]},
+            request_only=True,
+        ),
+        OpenApiExample(
+            "검색 결과 전체를 휴지통으로 (일부 제외)",
+            value={"action": "trash", "filter": {"folder": "inbox", "query": "from:noreply"}, "exclude_ids": [7]},
+            request_only=True,
+        ),
+        OpenApiExample(
+            "일괄 작업 결과",
+            value={"action": "read", "count": 2, "affected_ids": [101, 103]},
+            response_only=True,
+        ),
+    ],
+)
+class EmailBulkActionView(APIView):
+    """여러 메일의 상태를 한 번에 바꾸는 API View"""
+
+    permission_classes = [TestPermission]
+
+    def post(self, request, *args, **kwargs):
+        serializer = EmailBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        action = data["action"]
+
+        if "ids" in data:
+            queryset = EmailMetadata.objects.filter(
+                id__in=data["ids"], account__user=request.user, deleted_at__isnull=True
+            )
+        else:
+            queryset = filter_email_list(request.user, data["filter"]).order_by()
+        if data["exclude_ids"]:
+            queryset = queryset.exclude(id__in=data["exclude_ids"])
+
+        # 소유권 확인과 대상 확정을 한 번의 쿼리로 처리한다
+        rows = list(queryset.values_list("id", "folder")[: EmailBulkActionSerializer.MAX_IDS + 1])
+        if len(rows) > EmailBulkActionSerializer.MAX_IDS:
+            raise serializers.ValidationError(
+                f"한 번에 처리할 수 있는 메일은 최대 {EmailBulkActionSerializer.MAX_IDS}개입니다."
+            )
+        if "ids" in data:
+            missing = set(data["ids"]) - {pk for pk, _folder in rows} - set(data["exclude_ids"])
+            if missing:
+                raise serializers.ValidationError({"ids": f"Not found or no permission: {sorted(missing)}"})
+
+        # 영구 삭제는 DELETE 와 마찬가지로 휴지통에 있는 메일에만 적용한다
+        target_ids = [pk for pk, folder in rows if action != "purge" or folder == "trash"]
+
+        changes = {
+            "read": {"is_read": True},
+            "unread": {"is_read": False},
+            "move": {"folder": data.get("folder")},
+            "important": {"is_important": data["value"]},
+            "pin": {"is_pinned": data["value"]},
+            "trash": {"folder": "trash"},
+            "purge": {"deleted_at": timezone.now()},
+        }[action]
+        affected_ids = bulk_update_metadata(target_ids, **changes)
+        if "folder" in changes:
+            old_folders = dict(rows)
+            learn_from_moves([(pk, old_folders[pk], changes["folder"]) for pk in affected_ids])
+
+        return Response({"action": action, "count": len(affected_ids), "affected_ids": affected_ids})
+
+
 # 메일 요약을 위한 view
 # ----------------------------------------------------------------
 class EmailSummarizeView(APIView):
@@ -238,13 +649,22 @@ class EmailSummarizeView(APIView):
         summary="메일 요약 요청 / 재생성 요청",
         description="""특정 메일(`email_metadata_id`)의 요약을 LLM에 요청하고 결과를 받아 DB에 저장한 후, 프론트엔드로 리턴합니다.
         기본적으로 `is_summarized` 필드를 확인하여, `False`일 경우에만 LLM을 호출합니다. `True`라면 DB에 저장된 기존 요약본을 즉시 반환합니다.
-        `/resummarize/` 엔드포인트로 요청 시, `is_summarized` 필드와 관계없이 항상 LLM을 새로 호출하여 기존 `summarized_content`를 덮어씁니다.""",
+        같은 내용의 메일(연동된 다른 계정이나 다른 사용자가 받은 같은 뉴스레터 등)이 이미 요약되었으면 공유된 요약을 바로 반환하고,
+        같은 사용자가 받은 유사 메일(추적 링크/수신자 이름만 다른 메일)에 요약이 있으면 그 요약을 씁니다.
+        `/resummarize/` 엔드포인트로 요청 시, `is_summarized` 필드와 관계없이 항상 LLM을 새로 호출하여 기존 `summarized_content`를 덮어씁니다.
+        공유된 요약도 함께 갱신되므로, 같은 내용의 다른 메일에도 새 요약이 보입니다.
+        같은 내용의 요약 요청이 동시에 여러 번 오면 LLM 은 한 번만 호출하고 나머지 요청은 그 결과를 기다려 함께 받습니다.
+        기다리는 시간이 너무 길어지면 504 를 반환하므로 잠시 후(`Retry-After`) 다시 요청하면 됩니다.
+        504 응답의 `preview` 에는 LLM 없이 본문에서 중요한 문장을 골라 만든 임시 요약이 담깁니다.
+        짧은 메일(인용문/서명을 뺀 본문이 400자 미만)은 LLM 없이 본문에서 중요한 문장을 골라 요약합니다.
+        LLM 장애 중에는 503 대신 이렇게 만든 임시 요약을 `is_summarized: false` 로 반환하며, 저장하지 않습니다.""",
         responses={
             200: EmailSummarySerializer,
             400: OpenApiTypes.OBJECT,
             401: OpenApiTypes.OBJECT,
             404: OpenApiTypes.OBJECT,
             503: OpenApiTypes.OBJECT,
+            504: OpenApiTypes.OBJECT,
         },
         examples=[
             OpenApiExample(
@@ -258,6 +678,24 @@ class EmailSummarizeView(APIView):
                 response_only=True,
                 status_codes=["503"],
             ),
+            OpenApiExample(
+                "LLM 장애 중 임시 요약 (저장하지 않음)",
+                value={
+                    "id": 123,
+                    "summarized_content": "다음 주 화요일 오후 3시에 예산 회의가 있습니다.",
+                    "is_summarized": False,
+                },
+                response_only=True,
+            ),
+            OpenApiExample(
+                "같은 메일 요약 대기 시간 초과",
+                value={
+                    "error": "The summary is still being generated. try again shortly.",
+                    "preview": "다음 주 화요일 오후 3시에 예산 회의가 있습니다.",
+                },
+                response_only=True,
+                status_codes=["504"],
+            ),
         ],
     )
     def post(self, request, *args, **kwargs):
@@ -280,7 +718,18 @@ class EmailSummarizeView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        summary = summarize_email_content(email_content.subject, email_content.text_body)
+        try:
+            summary = summarize_metadata(metadata, request.user, refresh=resummarize_flag, fallback=True)
+        except SummaryWaitTimeout:
+            # 같은 내용의 요약이 다른 요청에서 아직 만들어지는 중이다
+            return Response(
+                {
+                    "error": "The summary is still being generated. try again shortly.",
+                    "preview": summarize_locally(email_content.subject, email_content.text_body),
+                },
+                status=status.HTTP_504_GATEWAY_TIMEOUT,
+                headers={"Retry-After": "5"},
+            )
 
         if not summary:
             return Response(
@@ -288,9 +737,96 @@ class EmailSummarizeView(APIView):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
 
-        metadata.summarized_content = summary
-        metadata.is_summarized = True
-        metadata.save(update_fields=["summarized_content", "is_summarized"])
-
         serializer = EmailSummarySerializer(metadata)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+def _summary_events(metadata, user, refresh, preview, emit):
+    """요약을 만들며 SSE 이벤트를 emit 합니다. (stream_from_thread 의 스레드에서 실행)"""
+
+    def send_preview(subject, body):
+        emit(format_event("preview", {"text": summarize_locally(subject, body)}))
+        return True
+
+    try:
+        if not refresh and metadata.is_summarized and metadata.summarized_content:
+            summary = metadata.summarized_content
+            emit(format_event("delta", {"text": summary}))
+        else:
+            summary = summarize_metadata(
+                metadata,
+                user,
+                refresh=refresh,
+                before_llm=send_preview if preview else None,
+                on_text=lambda part: emit(format_event("delta", {"text": part})),
+                fallback=True,
+            )
+        if summary:
+            emit(format_event("done", EmailSummarySerializer(metadata).data))
+        else:
+            emit(format_event("error", {"error": "The summarization service got error. try again."}))
+    except SummaryWaitTimeout:
+        emit(format_event("error", {"error": "The summary is still being generated. try again shortly."}))
+    except Exception:
+        logger.exception("summary stream failed for metadata %s", metadata.id)
+        emit(format_event("error", {"error": "The summarization service got error. try again."}))
+    finally:
+        connection.close()
+
+
+class EmailSummaryStreamView(APIView):
+    permission_classes = [TestPermission]
+    renderer_classes = [ORJSONRenderer, EventStreamRenderer]
+    resummarize = False  # Default value, will be overridden by as_view()
+
+    @extend_schema(
+        summary="메일 요약 스트리밍 요청 / 재생성 요청",
+        description="""`/summarize/`, `/resummarize/` 와 같은 요약을 Server-Sent Events(`text/event-stream`)로 보냅니다.
+        LLM 이 요약을 만드는 대로 조각을 보내므로, 전체 요약을 기다리지 않고 첫 글자부터 화면에 표시할 수 있습니다.
+        이벤트의 `data` 는 JSON 입니다.
+        - `delta`: `{"text": "..."}` 요약 조각. 차례로 이어 붙이면 요약이 됩니다.
+        - `preview`: `{"text": "..."}` `preview=true` 일 때, LLM 을 부르기 직전에 LLM 없이 만든 임시 요약. 첫 `delta` 가 오면 바꿔 표시합니다.
+        - `done`: 저장된 요약 (`/summarize/` 의 200 응답과 같은 형식). 스트림의 마지막 이벤트입니다.
+          LLM 장애 중에는 저장하지 않은 임시 요약이 `is_summarized: false` 로 옵니다.
+        - `error`: `{"error": "..."}` 실패. 이미 받은 조각은 버려야 합니다. (요약은 저장되지 않음)
+        이미 요약된 메일이나 공유/유사 메일의 요약을 쓰는 경우, 같은 내용의 요약이 다른 요청에서 만들어지는 중인 경우에는
+        `delta` 하나에 완성된 요약을 담아 보냅니다. 요약이 끝나면 DB 에 저장되며, 도중에 연결이 끊겨도 요약은 끝까지 만들어 저장합니다.
+        조각 단위로 보내려면 ASGI 서버(`config.asgi:application`)로 실행해야 합니다. WSGI(`runserver`)에서는 요약이 끝난 뒤 한 번에 전송됩니다.""",
+        request=None,
+        parameters=[
+            OpenApiParameter(
+                name="preview",
+                description="`true` 이면 LLM 요약을 기다리는 동안 보여줄 임시 요약(`preview` 이벤트)을 먼저 보냅니다.",
+                required=False,
+                type=OpenApiTypes.BOOL,
+            ),
+        ],
+        responses={
+            (200, "text/event-stream"): OpenApiTypes.STR,
+            400: OpenApiTypes.OBJECT,
+            401: OpenApiTypes.OBJECT,
+            404: OpenApiTypes.OBJECT,
+        },
+    )
+    def post(self, request, *args, **kwargs):
+        try:
+            metadata = EmailMetadata.objects.select_related("email").get(pk=kwargs["pk"], account__user=request.user)
+        except EmailMetadata.DoesNotExist:
+            return Response({"error": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if not metadata.email.text_body:
+            return Response(
+                {"error": "Email body is empty."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        user, refresh = request.user, getattr(self, "resummarize", False)
+        preview = request.query_params.get("preview", "").lower() in ("1", "true")
+        events = stream_from_thread(
+            lambda emit: _summary_events(metadata, user, refresh, preview, emit), name=f"summary-stream-{metadata.id}"
+        )
+        response = StreamingHttpResponse(events, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # 프록시(nginx)가 조각을 모아 보내지 않도록
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -1,15 +1,16 @@
 from rest_framework import serializers
 from .models import Template
 from email_account.models import EmailAccount
+from utils.sparse_fields import SparseFieldsMixin
 
 
-class EmailAccountInfoSerializer(serializers.ModelSerializer):
+class EmailAccountInfoSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = EmailAccount
         fields = ["id", "address"]
 
 
-class MyTemplateSerializer(serializers.ModelSerializer):
+class MyTemplateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Template model serializer"""
 
     email_account = EmailAccountInfoSerializer()
@@ -28,7 +29,7 @@ class MyTemplateSerializer(serializers.ModelSerializer):
         ]
 
 
-class ViewTemplateSerializer(serializers.ModelSerializer):
+class ViewTemplateSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Template model serializer for viewing templates"""
 
     class Meta:
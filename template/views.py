@@ -22,7 +22,7 @@ class ViewTemplateListView(APIView):
         except Template.DoesNotExist:
             return Response({"error": "No templates found for admin user"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = ViewTemplateSerializer(templates, many=True)
+        serializer = ViewTemplateSerializer(templates, many=True, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -33,7 +33,7 @@ class ViewTemplateDetailView(APIView):
         except Template.DoesNotExist:
             return Response({"error": "Template not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = ViewTemplateSerializer(template)
+        serializer = ViewTemplateSerializer(template, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def post(self, request, pk):
@@ -114,7 +114,7 @@ class MyTemplateListView(APIView):
         except Template.DoesNotExist:
             return Response({"error": "No templates found for user"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = MyTemplateSerializer(templates, many=True)
+        serializer = MyTemplateSerializer(templates, many=True, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -161,7 +161,7 @@ class MyTemplateDetailView(APIView):
         except Template.DoesNotExist:
             return Response({"error": "Template not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = MyTemplateSerializer(template)
+        serializer = MyTemplateSerializer(template, context={"request": request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     def put(self, request, pk):
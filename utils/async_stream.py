@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+# 동기 코드(DB 조회, LLM 호출)가 만드는 결과를 async 응답(StreamingHttpResponse)으로 흘려보내기 위한 다리.
+# produce(emit) 를 전용 스레드 하나에서 실행하고, emit(항목) 으로 넘긴 항목을 이벤트 루프에서 차례로 내보낸다.
+#   - 한 스레드에서 끝까지 실행하므로 Django DB 연결도 그 스레드의 연결 하나만 쓴다.
+#   - 받는 쪽(클라이언트)이 먼저 끊겨도 produce 는 끝까지 실행된다. (예: 요약은 끝까지 만들어 저장한다)
+
+_END = object()
+
+
+async def stream_from_thread(produce, name="stream-producer"):
+    """
+    produce(emit) 를 스레드에서 실행하며 emit 된 항목을 내보내는 async 제너레이터입니다.
+    produce 가 예외를 내면 그때까지 emit 된 항목을 모두 내보낸 뒤 같은 예외를 냅니다.
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+
+    def put(item, error=None):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            pass  # 이벤트 루프가 이미 닫혔다 (받는 쪽이 사라짐)
+
+    def run():
+        try:
+            produce(put)
+        except BaseException as exc:
+            put(_END, exc)
+        else:
+            put(_END)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    while True:
+        item, error = await queue.get()
+        if item is _END:
+            if error is not None:
+                raise error
+            return
+        yield item
@@ -0,0 +1,330 @@
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+from utils import metrics
+
+# LLM 호출 게이트웨이. 스팸 분류(spam_filter.py)와 요약(summarizer.py)은 이 모듈을 통해서만 LLM 을 부른다.
+#   - 프로세스 전체에서 클라이언트 하나를 재사용한다. (호출마다 genai.Client 를 만들지 않음)
+#   - 호출마다 마감 시간(deadline)이 있고, 재시도/대기 시간도 그 안에서만 쓴다.
+#   - 일시적인 오류(시간 초과, 429, 5xx)는 지수 backoff 로 재시도한다.
+#   - 연속으로 실패하면 circuit breaker 가 열려, 장애 중에는 기다리지 않고 바로 LLMUnavailable 을 낸다.
+#   - 동시에 진행되는 호출 수를 세마포어로 제한한다.
+#   - stream() 은 응답을 조각으로 받는다. 이미 내보낸 조각은 되돌릴 수 없으므로 첫 조각을 받기 전까지만 재시도한다.
+#
+# 백엔드는 LLM_BACKEND 환경 변수로 고른다. "fake" 면 네트워크 없이 FakeBackend 로 동작하므로 오프라인 부하 테스트에 쓴다.
+# 설정: LLM_BACKEND(gemini), LLM_MODEL, LLM_TIMEOUT(초), LLM_MAX_RETRIES, LLM_MAX_CONCURRENCY,
+#       LLM_BREAKER_THRESHOLD(연속 실패 수), LLM_BREAKER_RESET(초)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gemini-2.5-pro"
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMUnavailable(LLMError):
+    """API 키가 없거나 circuit breaker 가 열려 있어 호출하지 않은 경우"""
+
+
+class LLMTimeout(LLMError):
+    """마감 시간 안에 응답을 받지 못한 경우"""
+
+
+class LLMBackendError(LLMError):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, api_key):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key)
+
+    @staticmethod
+    def _config(system_instruction, timeout):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            system_instruction=system_instruction or None,
+            http_options=types.HttpOptions(timeout=max(int(timeout * 1000), 1)),
+        )
+
+    @staticmethod
+    def _error(exc):
+        from google.genai import errors
+
+        if isinstance(exc, errors.APIError):
+            # 요청 자체가 잘못된 4xx 는 재시도해도 같으므로 바로 실패시킨다 (429 제외)
+            return LLMBackendError(str(exc), retryable=not (400 <= (exc.code or 0) < 500) or exc.code == 429)
+        if "timeout" in type(exc).__name__.lower():
+            return LLMTimeout(str(exc))
+        return LLMBackendError(str(exc))
+
+    def generate(self, model, prompt, system_instruction, timeout):
+        config = self._config(system_instruction, timeout)
+        try:
+            response = self.client.models.generate_content(model=model, config=config, contents=prompt)
+        except Exception as exc:
+            raise self._error(exc) from exc
+        return response.text or ""
+
+    def stream(self, model, prompt, system_instruction, timeout):
+        config = self._config(system_instruction, timeout)
+        try:
+            for chunk in self.client.models.generate_content_stream(model=model, config=config, contents=prompt):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as exc:
+            raise self._error(exc) from exc
+
+
+class FakeBackend:
+    """
+    네트워크 없이 동작하는 백엔드. latency 만큼 기다린 뒤 responder(prompt, system_instruction) 의 결과를 반환하고,
+    failure_rate 확률로 일시적 오류를 낸다. 마감 시간보다 latency 가 길면 LLMTimeout 을 낸다.
+    stream() 은 같은 결과를 단어 단위 조각으로 나눠 chunk_latency 간격으로 내보낸다.
+    """
+
+    name = "fake"
+
+    def __init__(self, responder=None, latency=0.0, failure_rate=0.0, chunk_latency=0.0):
+        self.responder = responder or (lambda prompt, system_instruction: "{}")
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+
+    def generate(self, model, prompt, system_instruction, timeout):
+        self.calls += 1
+        latency = self.latency() if callable(self.latency) else self.latency
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            raise LLMTimeout(f"fake backend took {latency:.2f}s")
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise LLMBackendError("fake transient failure")
+        return self.responder(prompt, system_instruction)
+
+    def stream(self, model, prompt, system_instruction, timeout):
+        deadline = time.monotonic() + timeout
+        text = self.generate(model, prompt, system_instruction, timeout)
+        for i, piece in enumerate(re.findall(r"\s*\S+", text) or [text]):
+            if i and self.chunk_latency:
+                if time.monotonic() + self.chunk_latency > deadline:
+                    raise LLMTimeout("fake backend stream exceeded the deadline")
+                time.sleep(self.chunk_latency)
+            yield piece
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 번 쌓이면 열리고(open), reset_timeout 이 지나면 한 번의 시험 호출만 허용한다(half-open).
+    시험 호출이 성공하면 닫히고, 실패하면 다시 reset_timeout 동안 열린다.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None  # half-open 상태에서 시험 호출을 허용한 시각
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            # 시험 호출은 한 번에 하나만. 결과가 기록되지 않은 채 reset_timeout 이 지나면 다시 허용한다
+            if self._trial_at is not None and now - self._trial_at < self.reset_timeout:
+                return False
+            self._trial_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_at is not None or self._failures >= self.threshold:
+                logger.warning("LLM circuit opened after %d consecutive failures", self._failures)
+                self._opened_at = time.monotonic()
+                self._trial_at = None
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        backend_factory,
+        model=DEFAULT_MODEL,
+        timeout=60.0,
+        max_retries=2,
+        backoff=1.0,
+        max_concurrency=8,
+        breaker=None,
+    ):
+        self._backend_factory = backend_factory
+        self._backend = None
+        self._backend_lock = threading.Lock()
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = self._backend_factory()
+        return self._backend
+
+    def _acquire(self, deadline):
+        """circuit breaker 를 확인하고 호출 슬롯을 잡습니다."""
+        if not self.breaker.allow():
+            metrics.increment("llm.rejected")
+            raise LLMUnavailable("LLM circuit is open")
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+            metrics.increment("llm.timeouts")
+            raise LLMTimeout("deadline exceeded while waiting for a free LLM slot")
+
+    def _retry_delay(self, error, attempt, deadline, retryable=True):
+        """실패를 기록하고 다시 시도하기 전에 기다릴 시간을 반환합니다. 다시 시도할 수 없으면 error 를 냅니다."""
+        metrics.increment("llm.failures")
+        # 잘못된 요청(4xx)은 장애가 아니므로 circuit breaker 에 세지 않는다
+        if getattr(error, "retryable", True):
+            self.breaker.record_failure()
+        else:
+            retryable = False
+        delay = self.backoff * 2**attempt * random.uniform(0.5, 1.0)
+        if not retryable or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+            if isinstance(error, LLMTimeout):
+                metrics.increment("llm.timeouts")
+            raise error
+        return delay
+
+    def generate(self, prompt, system_instruction="", timeout=None, model=None):
+        """
+        프롬프트를 보내고 응답 텍스트를 반환합니다.
+        timeout(초)은 대기/재시도를 포함한 전체 마감 시간입니다. 실패하면 LLMError 의 하위 예외를 냅니다.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        backend = self.backend
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            started = time.monotonic()
+            try:
+                metrics.increment("llm.calls")
+                text = backend.generate(model or self.model, prompt, system_instruction, deadline - started)
+            except LLMError as exc:
+                error = exc
+            else:
+                self.breaker.record_success()
+                return text
+            finally:
+                self._slots.release()
+                metrics.increment("llm.latency_ms", int((time.monotonic() - started) * 1000))
+
+            time.sleep(self._retry_delay(error, attempt, deadline))
+            attempt += 1
+
+    def stream(self, prompt, system_instruction="", timeout=None, model=None):
+        """
+        generate 의 스트리밍 버전. 응답 텍스트를 받는 대로 조각(str)으로 내보내는 제너레이터입니다.
+        첫 조각을 받은 뒤에 실패하면 재시도하지 않고 LLMError 를 냅니다. 슬롯은 스트림이 끝나거나 닫힐 때까지 잡고 있습니다.
+        """
+        deadline = time.monotonic() + (timeout or self.timeout)
+        backend = self.backend
+        attempt = 0
+        while True:
+            self._acquire(deadline)
+            started = time.monotonic()
+            received = False
+            try:
+                metrics.increment("llm.calls")
+                for chunk in backend.stream(model or self.model, prompt, system_instruction, deadline - started):
+                    if not received:
+                        received = True
+                        metrics.increment("llm.first_chunk_ms", int((time.monotonic() - started) * 1000))
+                    yield chunk
+            except LLMError as exc:
+                error = exc
+            else:
+                self.breaker.record_success()
+                return
+            finally:
+                self._slots.release()
+                metrics.increment("llm.latency_ms", int((time.monotonic() - started) * 1000))
+
+            time.sleep(self._retry_delay(error, attempt, deadline, retryable=not received))
+            attempt += 1
+
+
+def _default_backend():
+    if os.environ.get("LLM_BACKEND", "gemini") == "fake":
+        return FakeBackend()
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise LLMUnavailable("GOOGLE_API_KEY not found in .env file")
+    return GeminiBackend(api_key)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    """프로세스 전체에서 공유하는 게이트웨이를 반환합니다."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    _default_backend,
+                    model=os.environ.get("LLM_MODEL", DEFAULT_MODEL),
+                    timeout=float(os.environ.get("LLM_TIMEOUT", 60)),
+                    max_retries=int(os.environ.get("LLM_MAX_RETRIES", 2)),
+                    max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", 8)),
+                    breaker=CircuitBreaker(
+                        threshold=int(os.environ.get("LLM_BREAKER_THRESHOLD", 5)),
+                        reset_timeout=float(os.environ.get("LLM_BREAKER_RESET", 30)),
+                    ),
+                )
+    return _gateway
+
+
+def set_gateway(gateway):
+    """게이트웨이를 교체합니다. (FakeBackend 로 부하 테스트를 하거나 테스트에서 쓰기 위함) 이전 게이트웨이를 반환합니다."""
+    global _gateway
+    with _gateway_lock:
+        previous, _gateway = _gateway, gateway
+    return previous
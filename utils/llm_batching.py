@@ -0,0 +1,116 @@
+import html
+import logging
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# LLM 에 메일 여러 통을 나눠 보내기 위한 공통 도구.
+#   1. clean_body     : HTML/인용문/서명을 걷어내고 길이를 제한한다.
+#   2. estimate_tokens: 토크나이저 없이 토큰 수를 어림한다.
+#   3. pack_chunks    : 토큰 예산 안에 들어가도록 메일들을 청크로 묶는다.
+#   4. run_chunks     : 청크들을 제한된 병렬도로 보내고, 실패한 청크만 다시 보낸다.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BODY_CHARS = 2000
+
+_STYLE_SCRIPT = re.compile(r"<(style|script|head)\b.*?</\1>", re.DOTALL | re.IGNORECASE)
+_HTML_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+_BLOCK_TAG = re.compile(r"<(br|/p|/div|/tr|/li|/h\d)\b[^>]*>", re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_LOOKS_LIKE_HTML = re.compile(r"<(html|body|div|p|br|table|span|a)\b", re.IGNORECASE)
+# 답장/전달 시 원문이 시작되는 줄. 이 줄부터 아래는 버린다.
+_QUOTE_HEADER = re.compile(
+    r"^\s*(On .{0,200}wrote:|-{2,}\s*(Original|Forwarded) Message\s*-{2,}|From: .+|보낸 사람: .+|.{0,100}님이 작성:|-{2,}\s*원본 메일\s*-{2,})\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# "-- " 로 시작하는 서명 구분선 (RFC 3676)
+_SIGNATURE = re.compile(r"^-- ?$", re.MULTILINE)
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SPACES = re.compile(r"[ \t ]+")
+
+
+def html_to_text(value: str) -> str:
+    text = _STYLE_SCRIPT.sub("", value)
+    text = _HTML_COMMENT.sub("", text)
+    text = _BLOCK_TAG.sub("\n", text)
+    return html.unescape(_HTML_TAG.sub("", text))
+
+
+def clean_body(body: str, limit: int = DEFAULT_BODY_CHARS) -> str:
+    """분류/요약에 필요 없는 부분(HTML 태그, 인용된 원문, 서명)을 제거하고 limit 글자로 자른다."""
+    if not body:
+        return ""
+    text = html_to_text(body) if _LOOKS_LIKE_HTML.search(body[:5000]) else body
+    text = text.replace("\r\n", "\n")
+
+    cut = _QUOTE_HEADER.search(text)
+    if cut and cut.start() > 0:
+        text = text[: cut.start()]
+    signature = _SIGNATURE.search(text)
+    if signature and signature.start() > 0:
+        text = text[: signature.start()]
+    text = "\n".join(line for line in text.split("\n") if not line.lstrip().startswith(">"))
+
+    text = _BLANK_LINES.sub("\n", _SPACES.sub(" ", text)).strip()
+    return text[:limit]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토큰 수를 어림합니다. 영문/숫자/기호는 4글자에 1토큰, 한글 등 그 밖의 문자는 1글자에 1토큰으로 셉니다.
+    실제보다 약간 크게 잡히도록 한 값이라 예산 계산에 써도 넘치지 않습니다.
+    """
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch.isascii())
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def pack_chunks(items, budget, max_items, cost=estimate_tokens):
+    """
+    items 를 순서대로 묶어, 각 청크의 cost 합이 budget 을, 개수가 max_items 를 넘지 않게 나눕니다.
+    혼자서 budget 을 넘는 항목은 단독 청크가 됩니다.
+    """
+    chunks, current, used = [], [], 0
+    for item in items:
+        size = cost(item)
+        if current and (used + size > budget or len(current) >= max_items):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def run_chunks(chunks, worker, max_workers=4, retries=2, backoff=1.0):
+    """
+    worker(chunk) -> dict 를 청크마다 병렬로 실행하고 결과를 합쳐 반환합니다.
+    예외가 난 청크만 backoff 간격을 두 배씩 늘리며 retries 번까지 다시 실행하고, 끝내 실패한 청크는 결과에서 빠집니다.
+    """
+    results = {}
+    lock = threading.Lock()
+
+    def attempt(chunk):
+        for tries in range(retries + 1):
+            try:
+                outcome = worker(chunk)
+            except Exception as exc:
+                if tries == retries:
+                    logger.warning("chunk of %d items failed after %d tries: %s", len(chunk), tries + 1, exc)
+                    return False
+                time.sleep(backoff * 2**tries)
+                continue
+            with lock:
+                results.update(outcome)
+            return True
+
+    if not chunks:
+        return results
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        list(executor.map(attempt, chunks))
+    return results
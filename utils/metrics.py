@@ -0,0 +1,31 @@
+import threading
+from collections import Counter
+
+# 프로세스 단위의 간단한 카운터 모음. (캐시 적중률, LLM 호출 수 등)
+# 외부 모니터링 시스템 없이도 관리 명령어나 로그에서 현재 값을 확인하기 위한 용도이며,
+# 프로세스가 재시작되면 초기화된다.
+
+_lock = threading.Lock()
+_counters = Counter()
+
+
+def increment(name: str, value: int = 1) -> None:
+    with _lock:
+        _counters[name] += value
+
+
+def get(name: str) -> int:
+    with _lock:
+        return _counters[name]
+
+
+def snapshot(prefix: str = "") -> dict:
+    """prefix 로 시작하는 카운터들의 현재 값을 반환합니다."""
+    with _lock:
+        return {name: value for name, value in _counters.items() if name.startswith(prefix)}
+
+
+def reset(prefix: str = "") -> None:
+    with _lock:
+        for name in [name for name in _counters if name.startswith(prefix)]:
+            del _counters[name]
@@ -0,0 +1,81 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli 가 없으면 gzip 만 사용한다
+    brotli = None
+
+# 응답 압축 미들웨어.
+# Django 의 GZipMiddleware 와 달리 brotli 를 우선 지원하고, 작은 응답은 압축하지 않는다.
+# (수백 바이트짜리 응답은 압축해도 줄어드는 양보다 CPU 비용이 더 크다)
+#   RESPONSE_COMPRESSION_MIN_SIZE       : 이 크기(바이트) 미만의 응답은 그대로 보낸다
+#   RESPONSE_COMPRESSION_GZIP_LEVEL     : gzip 압축 레벨 (1~9)
+#   RESPONSE_COMPRESSION_BROTLI_QUALITY : brotli 품질 (0~11, 높을수록 느리다)
+
+_ACCEPT_ENCODING = re.compile(r"\s*([a-z*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?")
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _accepted_encodings(header):
+    """Accept-Encoding 헤더에서 q=0 이 아닌 인코딩 이름 집합을 반환한다."""
+    accepted = set()
+    for part in header.lower().split(","):
+        match = _ACCEPT_ENCODING.match(part)
+        if not match:
+            continue
+        name, quality = match.groups()
+        try:
+            if quality is not None and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name)
+    return accepted
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if not response.get("Content-Type", "").startswith(_COMPRESSIBLE_TYPES):
+            return response
+
+        # 압축 여부와 관계없이 캐시가 인코딩별로 구분되도록 한다
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if len(response.content) < settings.RESPONSE_COMPRESSION_MIN_SIZE:
+            return response
+
+        accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+            compressed = brotli.compress(response.content, quality=settings.RESPONSE_COMPRESSION_BROTLI_QUALITY)
+        elif "gzip" in accepted:
+            encoding = "gzip"
+            compressed = gzip.compress(
+                response.content, compresslevel=settings.RESPONSE_COMPRESSION_GZIP_LEVEL, mtime=0
+            )
+        else:
+            return response
+
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        # 압축된 본문은 원본과 바이트가 다르므로 강한 ETag 를 약한 ETag 로 바꾼다
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,105 @@
+import re
+import zlib
+
+import numpy as np
+
+# 거의 같은 메일(near-duplicate) 찾기용 MinHash/LSH.
+# 마케팅 메일은 수신자 이름, 추적 링크, 숫자 정도만 다른 본문으로 여러 사용자에게 간다.
+#   1. normalize    : 소문자화, URL/주소/숫자 제거. 달라지는 부분을 걷어낸다.
+#   2. shingles     : 연속된 SHINGLE_WORDS 단어 묶음의 crc32 집합
+#   3. signatures   : NUM_PERM 개의 해시 함수 각각의 최솟값. 여러 메일을 한 번의 numpy 연산으로 계산한다.
+#   4. band_buckets : 서명을 BANDS 개 구간으로 나눠 구간별 버킷 값을 만든다. 버킷이 하나라도 같으면 후보다.
+#                     (BANDS=16, ROWS=4 이면 유사도 0.5 부근부터 후보로 잡히기 시작한다)
+#   5. similarity   : 서명이 같은 자리의 비율 = Jaccard 유사도 추정값. 후보는 이것으로 다시 확인한다.
+# DB 저장/조회는 email_content/service/near_duplicates.py 에서 한다.
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# shingle 이 이보다 적은 짧은 메일은 서명을 만들지 않는다 ("감사합니다" 같은 메일끼리 묶이지 않도록)
+MIN_SHINGLES = 8
+# 서명 계산에 쓰는 본문 앞부분 길이
+MAX_TEXT_CHARS = 5000
+# 한 번에 계산하는 shingle 수 (메모리: 이 값 x NUM_PERM x 8 바이트)
+BLOCK_SHINGLES = 32768
+
+_URL = re.compile(r"(https?://|www\.)\S+", re.IGNORECASE)
+_ADDRESS = re.compile(r"\S+@\S+")
+_DIGITS = re.compile(r"\d+")
+_NON_WORD = re.compile(r"[^\w]+")
+
+# 해시 함수 h(x) = (a * x + b) mod 2^64 의 상위 32비트 (a 는 홀수)
+_rng = np.random.default_rng(20251001)
+_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+_MIX = np.uint64(0x100000001B3)
+_BAND_SEEDS = np.arange(1, BANDS + 1, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+
+
+def normalize(text):
+    text = _URL.sub(" ", (text or "")[:MAX_TEXT_CHARS].lower())
+    text = _ADDRESS.sub(" ", text)
+    text = _DIGITS.sub("0", text)
+    return _NON_WORD.sub(" ", text).split()
+
+
+def shingles(text):
+    """정규화한 텍스트의 단어 shingle 해시(uint32) 배열. 중복은 제거된다."""
+    words = normalize(text)
+    if len(words) < SHINGLE_WORDS:
+        return np.empty(0, dtype=np.uint32)
+    grams = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint32, count=len(grams))
+
+
+def signatures(texts):
+    """
+    texts 각각의 MinHash 서명(uint32 NUM_PERM 개)을 리스트로 반환합니다. shingle 이 부족한 텍스트는 None.
+    모든 텍스트의 shingle 을 이어 붙여 블록 단위로 한 번에 해시하고, 텍스트별 최솟값은 reduceat 으로 구한다.
+    """
+    result = [None] * len(texts)
+    pending = []  # (텍스트 순번, shingle 배열)
+    for index, text in enumerate(texts):
+        hashes = shingles(text)
+        if len(hashes) >= MIN_SHINGLES:
+            pending.append((index, hashes))
+
+    start = 0
+    while start < len(pending):
+        # 블록 크기를 넘지 않는 만큼 텍스트를 모은다 (한 텍스트가 혼자 넘으면 단독 블록)
+        end, size = start, 0
+        while end < len(pending) and (end == start or size + len(pending[end][1]) <= BLOCK_SHINGLES):
+            size += len(pending[end][1])
+            end += 1
+        block = pending[start:end]
+        values = np.concatenate([hashes for _index, hashes in block]).astype(np.uint64)
+        hashed = ((values[:, None] * _A + _B) >> _SHIFT).astype(np.uint32)
+        offsets = np.cumsum([0] + [len(hashes) for _index, hashes in block[:-1]])
+        for (index, _hashes), signature in zip(block, np.minimum.reduceat(hashed, offsets, axis=0)):
+            result[index] = signature
+        start = end
+    return result
+
+
+def band_buckets(signature):
+    """서명의 구간별 버킷 값(int64, BANDS 개). 구간 번호가 섞여 있어 다른 구간끼리는 겹치지 않는다."""
+    rows = np.asarray(signature, dtype=np.uint64).reshape(BANDS, ROWS)
+    bucket = _BAND_SEEDS.copy()
+    for column in range(ROWS):
+        bucket = (bucket ^ rows[:, column]) * _MIX
+    return (bucket >> np.uint64(1)).astype(np.int64)
+
+
+def similarity(signature, others):
+    """signature 와 others(서명 하나 또는 (n, NUM_PERM) 배열)의 추정 Jaccard 유사도."""
+    return np.mean(np.asarray(others) == np.asarray(signature), axis=-1)
+
+
+def to_bytes(signature):
+    return np.asarray(signature, dtype="<u4").tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype="<u4") if data else None
@@ -0,0 +1,40 @@
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from .sparse_fields import prune, sparse_fields
+
+# 대량 목록 조회용 빠른 응답 경로.
+# ModelSerializer 는 행마다 필드 객체를 순회하고 중첩 시리얼라이저/SerializerMethodField 를 호출하므로,
+# 수백 건을 내려줄 때 직렬화 비용이 쿼리 비용보다 커진다.
+# ProjectionListMixin 을 쓰는 view 는 values() 로 필요한 컬럼만 한 번의 쿼리로 읽고, dict 를 직접 만든다.
+# 응답 형식은 view 의 serializer_class 와 같아야 한다. (OpenAPI 스키마는 serializer_class 기준으로 생성됨)
+
+# DRF DateTimeField 와 같은 형식(타임존 변환, UTC 는 'Z')으로 날짜를 출력하기 위함
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class ProjectionListMixin:
+    """GenericAPIView 용 믹스인. list() 를 values() 기반 경로로 바꿉니다."""
+
+    def project_queryset(self, queryset):
+        """필요한 컬럼만 읽는 values() 쿼리셋을 반환합니다. 페이지네이션 정렬 필드도 포함해야 합니다."""
+        raise NotImplementedError
+
+    def project_row(self, row):
+        """values() 한 행을 응답 dict 로 바꿉니다."""
+        return row
+
+    def _project_rows(self, rows):
+        # fields / exclude 파라미터(SparseFieldsMixin 과 같은 규칙)도 여기서 적용한다
+        include, exclude = sparse_fields(self.request)
+        if include is None and exclude is None:
+            return [self.project_row(row) for row in rows]
+        return [prune(self.project_row(row), include, exclude) for row in rows]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.project_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self._project_rows(page))
+        return Response(self._project_rows(queryset))
@@ -0,0 +1,92 @@
+import re
+from collections import OrderedDict
+from email.utils import parseaddr
+
+# 보낸 쪽(발신자/메일링 리스트) 평판 계산.
+# 뉴스레터나 대량 메일은 같은 List-Id/발신 도메인에서 반복해서 오므로, 지금까지의 분류 결과와 사용자의 폴더 이동을
+# 발신 키별 가중치(spam, ham)로 쌓아 두고, 결과가 한쪽으로 안정되면 모델을 부르지 않고 그대로 판정한다.
+# DB 저장/갱신은 email_content/service/sender_reputation.py 에서 한다.
+#
+# 발신 키:
+#   list:<List-Id>   : List-Id 헤더가 있으면 그 값 (메일링 리스트는 보낸 주소가 바뀌어도 같은 리스트로 묶는다)
+#   domain:<도메인>  : List-Unsubscribe/Precedence: bulk 가 붙은 대량 메일이면 발신 도메인
+#   addr:<주소>      : 그 밖의 메일은 보낸 사람 주소 (gmail.com 같은 공용 도메인을 한 평판으로 묶지 않기 위함)
+
+# 분류 결과 한 건의 가중치와 사용자가 직접 옮긴 메일 한 건의 가중치
+OUTCOME_WEIGHT = 1
+USER_MOVE_WEIGHT = 5
+# 누적 가중치가 이만큼 쌓여야 평판으로 판정한다
+MIN_WEIGHT = 5
+# 한쪽 비율이 이 값 이상이면 그쪽으로 판정한다
+CONFIDENCE = 0.9
+# 누적 가중치가 이 값을 넘으면 둘 다 반으로 줄여 최근 결과의 비중을 유지한다
+MAX_WEIGHT = 60
+
+_LIST_ID = re.compile(r"<([^<>]+)>")
+_BULK_PRECEDENCE = ("bulk", "junk", "list")
+
+
+def _lowered_headers(headers):
+    return {str(name).lower(): str(value) for name, value in (headers or {}).items()}
+
+
+def list_id(headers):
+    """List-Id 헤더의 식별자(꺾쇠 안의 값)를 소문자로 반환합니다. 없으면 ""."""
+    value = _lowered_headers(headers).get("list-id", "").strip()
+    match = _LIST_ID.search(value)
+    return (match.group(1) if match else value).strip().lower()[:200]
+
+
+def is_bulk(headers):
+    lowered = _lowered_headers(headers)
+    precedence = lowered.get("precedence", "").lower()
+    return "list-unsubscribe" in lowered or any(value in precedence for value in _BULK_PRECEDENCE)
+
+
+def sender_key(from_header, headers):
+    """메일의 발신 키를 반환합니다. 보낸 사람을 알 수 없으면 ""."""
+    identifier = list_id(headers)
+    if identifier:
+        return f"list:{identifier}"
+    address = parseaddr(str(from_header or ""))[1].lower()
+    if "@" not in address:
+        return ""
+    if is_bulk(headers):
+        return f"domain:{address.rpartition('@')[2]}"
+    return f"addr:{address}"[:255]
+
+
+def is_group_key(key):
+    """대표 메일 하나의 판정을 같은 배치의 나머지 메일에도 적용해도 되는 키인지 (메일링 리스트/대량 발송)"""
+    return key.startswith(("list:", "domain:"))
+
+
+def verdict(spam_weight, ham_weight):
+    """누적 가중치로 "spam" / "inbox" / None(판단 보류) 을 반환합니다."""
+    total = spam_weight + ham_weight
+    if total < MIN_WEIGHT:
+        return None
+    if spam_weight >= total * CONFIDENCE:
+        return "spam"
+    if ham_weight >= total * CONFIDENCE:
+        return "inbox"
+    return None
+
+
+def accumulate(weights, deltas):
+    """
+    가중치들에 deltas 를 더한 새 튜플을 반환합니다. 음수로 내려가지 않고, 합이 MAX_WEIGHT 를 넘으면 모두 반으로 줄입니다.
+    (spam, ham) 외에 따로 쌓는 가중치(LLM 판정분)가 있어도 함께 줄여 비율을 유지한다.
+    """
+    weights = [max(weight + delta, 0) for weight, delta in zip(weights, deltas)]
+    while sum(weights) > MAX_WEIGHT:
+        weights = [weight // 2 for weight in weights]
+    return tuple(weights)
+
+
+def group_by_key(items, key):
+    """items 를 key(item) 별로 묶습니다. 처음 나온 순서를 유지하며, 그룹의 첫 항목이 대표입니다."""
+    groups = OrderedDict()
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
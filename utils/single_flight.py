@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# 같은 키의 작업이 동시에 여러 번 요청되면 한 번만 실행하고 결과를 나눠 갖는다. (프로세스 안에서만)
+# 먼저 온 요청(leader)이 fn 을 실행하고, 그동안 들어온 요청은 leader 의 Future 를 timeout 까지 기다린다.
+# fn 이 예외를 내면 기다리던 요청도 같은 예외를 받는다. 작업이 끝나면 키를 비우므로 결과를 캐시하지는 않는다.
+
+
+class SingleFlightTimeout(Exception):
+    """진행 중인 작업을 기다리다 timeout 이 지난 경우"""
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, timeout=None):
+        """
+        key 로 진행 중인 작업이 없으면 fn() 을 실행하고, 있으면 그 결과를 최대 timeout 초 기다립니다.
+        (결과, 다른 요청의 결과를 받았는지) 를 반환합니다.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+            return future.result(), False
+
+        try:
+            return future.result(timeout=timeout), True
+        except FutureTimeoutError:
+            raise SingleFlightTimeout(f"timed out after {timeout}s waiting for {key!r}") from None
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
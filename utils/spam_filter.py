@@ -1,33 +1,21 @@
-import os
 import json
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+import logging
 
+from utils.llm import LLMError, get_gateway
+from utils.llm_batching import clean_body, estimate_tokens, pack_chunks, run_chunks
 
-def classify_emails_in_batch(emails: list, job: str, interests: list, usage: str) -> dict:
-    """
-    여러 이메일과 사용자 선호도를 LLM에 한 번에 보내어 스팸 여부를 분류합니다.
-
-    Args:
-        emails (list): 각 요소가 {'id': str, 'subject': str, 'body': str} 형태인 딕셔너리 리스트
-        job (str): 사용자의 직업
-        interests (list): 사용자의 관심사 키워드 리스트
-        usage (str): 계정의 용도
+logger = logging.getLogger(__name__)
 
-    Returns:
-        dict: 이메일 ID를 키로, 'spam' 또는 'inbox'를 값으로 갖는 딕셔너리
-    """
-    load_dotenv()
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        print("Error: GOOGLE_API_KEY not found in .env file")
-        return {}
-
-    try:
-        client = genai.Client(api_key=api_key)
+# 한 번의 LLM 호출(청크)에 넣는 메일 입력 토큰 예산과 최대 메일 수, 동시에 보내는 청크 수
+CHUNK_TOKEN_BUDGET = 6000
+CHUNK_MAX_EMAILS = 20
+MAX_CONCURRENCY = 4
+CHUNK_RETRIES = 2
+# 분류에는 본문 앞부분이면 충분하다
+BODY_CHARS = 1500
+SUBJECT_CHARS = 300
 
-        system_instruction = """
+SYSTEM_INSTRUCTION = """
         You are a highly intelligent spam classification expert. Your task is to classify a list of emails as either "spam" or "inbox" based on the user's personal and professional context.
 
         I will provide you with:
@@ -57,35 +45,71 @@ def classify_emails_in_batch(emails: list, job: str, interests: list, usage: str
 
         Do not output any other text, explanations, or markdown formatting. Just the JSON object.
         """
-        # 1. 청크 단위 줄이기 2. 스팸에 대한 정의가 모호하다. 오히려 JSON 포맷으로 가능한 토픽 20개 정도 주루룩 늘여놓고 마지막에 이것도 다 아니면 스팸메일로 처리. 이 카테고리 중 하나로 분류해줘.
-        # 그리고 매 메일마다 iteration 돌리기. 기존에 spam으로 된거 유지하는 것도 괜찮아보이는데.
+# 1. 청크 단위 줄이기 2. 스팸에 대한 정의가 모호하다. 오히려 JSON 포맷으로 가능한 토픽 20개 정도 주루룩 늘여놓고 마지막에 이것도 다 아니면 스팸메일로 처리. 이 카테고리 중 하나로 분류해줘.
+# 그리고 매 메일마다 iteration 돌리기. 기존에 spam으로 된거 유지하는 것도 괜찮아보이는데.
 
-        # LLM 프롬프트에 포함시키기 위해 이메일 리스트를 JSON 문자열로 변환
-        emails_json_string = json.dumps(emails, indent=2, ensure_ascii=False)
 
-        user_prompt = f"""
-        **User Profile:**
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _profile_prompt(job, interests, usage):
+    return f"""**User Profile:**
         - Job: {job}
         - Interests: {interests}
-        - Usage: {usage}
+        - Usage: {usage}"""
 
-        **Emails to Classify:**
-        {emails_json_string}
-        """
 
-        config = types.GenerateContentConfig(system_instruction=system_instruction)
-        response = client.models.generate_content(model="gemini-2.5-pro", config=config, contents=user_prompt)
+def classify_emails_in_batch(emails: list, job: str, interests: list, usage: str) -> dict:
+    """
+    여러 이메일과 사용자 선호도를 LLM에 보내어 스팸 여부를 분류합니다.
+    본문을 정리/축약한 뒤 토큰 예산에 맞춰 청크로 나누어 동시에 보내며, 실패한 청크만 재시도합니다.
+    끝내 분류되지 못한 메일은 결과에 포함되지 않습니다.
 
-        # LLM의 응답에서 JSON 부분만 추출
-        cleaned_response = response.text.strip().replace("```json", "").replace("```", "").strip()
+    Args:
+        emails (list): 각 요소가 {'id': str, 'subject': str, 'body': str} 형태인 딕셔너리 리스트
+        job (str): 사용자의 직업
+        interests (list): 사용자의 관심사 키워드 리스트
+        usage (str): 계정의 용도
 
-        # JSON 응답을 파싱하여 딕셔너리로 변환
-        classification_results = json.loads(cleaned_response)
-        return classification_results
+    Returns:
+        dict: 이메일 ID를 키로, 'spam' 또는 'inbox'를 값으로 갖는 딕셔너리
+    """
+    items = [
+        {
+            "id": str(email["id"]),
+            "subject": str(email.get("subject") or "")[:SUBJECT_CHARS],
+            "body": clean_body(email.get("body") or "", BODY_CHARS),
+        }
+        for email in emails
+    ]
+    # 청크마다 프로필 부분이 반복되므로 그만큼을 뺀 나머지를 메일에 쓴다
+    budget = CHUNK_TOKEN_BUDGET - estimate_tokens(_profile_prompt(job, interests, usage))
+    chunks = pack_chunks(items, budget, CHUNK_MAX_EMAILS, cost=lambda item: estimate_tokens(_dumps(item)))
+    gateway = get_gateway()
+
+    def classify_chunk(chunk):
+        user_prompt = f"""
+        {_profile_prompt(job, interests, usage)}
 
-    except Exception as e:
-        print(f"An error occurred during the batch classification API call: {e}")
-        return {}
+        **Emails to Classify:**
+        {_dumps(chunk)}
+        """
+        try:
+            response_text = gateway.generate(user_prompt, SYSTEM_INSTRUCTION)
+        except LLMError as e:
+            # 시간 초과/일시 오류는 게이트웨이가 이미 재시도했으므로 이 청크는 포기한다
+            logger.warning("batch classification API call failed: %s", e)
+            return {}
+        # LLM의 응답에서 JSON 부분만 추출
+        cleaned_response = response_text.strip().replace("```json", "").replace("```", "").strip()
+        parsed = json.loads(cleaned_response)
+        # 이 청크에 있는 메일에 대한 올바른 값만 받는다
+        ids = {item["id"] for item in chunk}
+        return {key: value for key, value in parsed.items() if key in ids and value in ("spam", "inbox")}
+
+    # 청크들을 동시에 보내고, 응답이 깨진 청크만 다시 보낸다
+    return run_chunks(chunks, classify_chunk, max_workers=MAX_CONCURRENCY, retries=CHUNK_RETRIES)
 
 
 # 스팸메일 처리 로직 피드백.
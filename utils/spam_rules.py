@@ -0,0 +1,229 @@
+import fnmatch
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import parseaddr
+
+# 로컬 규칙 기반 스팸 점수 엔진. (SPAM_FILTER_PLAN.md Phase 3 의 calculate_score)
+# EmailAccount.filter_rules 에 저장된 규칙(factor)들을 메일과 대조하여, 매칭된 factor 의 weight 를 합산한다.
+# LLM 을 부르기 전에 실행되므로, 규칙은 계정별로 한 번만 컴파일해 두고 메일마다 재사용한다.
+#
+# filter_rules 형식:
+#   {
+#     "spam_threshold": 5.0,
+#     "factors": [
+#       {"id": "kw-free", "type": "keyword", "content": "무료 체험", "weight": 2.5},
+#       {"id": "promo", "type": "sender", "content": "*@promo.example.com", "weight": 4},
+#       {"id": "bulk", "type": "header", "content": "Precedence: bulk", "weight": 1.5},
+#       {"id": "boss", "type": "sender", "content": "boss@corp.com", "weight": -10},
+#     ]
+#   }
+#   - keyword: 제목+본문에서 대소문자 구분 없이 부분 문자열로 찾는다. 여러 번 나와도 한 번만 더한다.
+#   - sender : 보낸 사람 주소. 전체 주소, 도메인(하위 도메인 포함), 또는 * ? 와일드카드 패턴.
+#   - header : "Name" 이면 헤더 존재 여부, "Name: 값" 이면 헤더 값에 부분 문자열이 있는지.
+#   weight 가 음수인 factor 는 정상 메일 쪽 신호로 쓰인다.
+
+DEFAULT_SPAM_THRESHOLD = 5.0
+# 점수가 이 값 이하이면 LLM 없이 정상 메일로 본다. (spam_threshold 와 사이의 구간만 LLM 으로 보낸다)
+DEFAULT_HAM_THRESHOLD = -1.0
+FACTOR_TYPES = ("keyword", "sender", "header")
+
+# 긴 본문(HTML 뉴스레터 등)은 앞부분만 검사한다
+MAX_SCAN_CHARS = 20000
+
+_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class ScoreResult:
+    score: float
+    matched: tuple  # 매칭된 factor id 목록
+    is_spam: bool
+
+
+def _get(email, name, default=""):
+    """dict(ingest 데이터)와 모델 인스턴스(EmailContent) 모두에서 값을 꺼낸다."""
+    value = email.get(name) if isinstance(email, dict) else getattr(email, name, None)
+    return value if value is not None else default
+
+
+class CompiledRules:
+    """filter_rules 를 미리 컴파일한 매처. calculate_score 는 이 객체의 score() 를 호출한다."""
+
+    def __init__(self, rules):
+        rules = rules or {}
+        try:
+            self.threshold = float(rules.get("spam_threshold", DEFAULT_SPAM_THRESHOLD))
+        except (TypeError, ValueError):
+            self.threshold = DEFAULT_SPAM_THRESHOLD
+        try:
+            self.ham_threshold = min(float(rules.get("ham_threshold", DEFAULT_HAM_THRESHOLD)), self.threshold)
+        except (TypeError, ValueError):
+            self.ham_threshold = min(DEFAULT_HAM_THRESHOLD, self.threshold)
+
+        keywords = {}  # 소문자 키워드 -> [(factor id, weight)]
+        self.exact_senders = {}  # 주소 -> [(id, weight)]
+        self.domain_senders = {}  # 도메인 -> [(id, weight)]
+        self.pattern_senders = []  # (정규식, id, weight)
+        self.headers = {}  # 소문자 헤더 이름 -> [(소문자 값 또는 None, id, weight)]
+
+        for index, factor in enumerate(rules.get("factors") or []):
+            if not isinstance(factor, dict):
+                continue
+            content = str(factor.get("content") or "").strip()
+            try:
+                weight = float(factor.get("weight", 0))
+            except (TypeError, ValueError):
+                continue
+            if not content or not weight:
+                continue
+            entry = (str(factor.get("id") or f"factor-{index}"), weight)
+            kind = factor.get("type")
+
+            if kind == "keyword":
+                keywords.setdefault(content.lower(), []).append(entry)
+            elif kind == "sender":
+                pattern = content.lower().lstrip("@")
+                if "*" in pattern or "?" in pattern:
+                    self.pattern_senders.append((re.compile(fnmatch.translate(pattern)), *entry))
+                elif "@" in pattern:
+                    self.exact_senders.setdefault(pattern, []).append(entry)
+                else:
+                    self.domain_senders.setdefault(pattern, []).append(entry)
+            elif kind == "header":
+                name, sep, value = content.partition(":")
+                value = value.strip().lower() if sep else None
+                self.headers.setdefault(name.strip().lower(), []).append((value or None, *entry))
+
+        self.keywords = keywords
+        self.keyword_regex = None
+        if keywords:
+            # 모든 키워드를 하나의 정규식으로 합친다. 긴 키워드를 먼저 두고 각 위치에서 lookahead 로 검사하므로
+            # 겹쳐 있는 키워드("무료", "무료 배송")도 모두 찾는다. 한 위치에서 가장 긴 키워드만 잡히는 경우는
+            # contained 로 그 안에 포함된 짧은 키워드까지 함께 인정한다.
+            ordered = sorted(keywords, key=len, reverse=True)
+            self.keyword_regex = re.compile("(?=(" + "|".join(re.escape(k) for k in ordered) + "))")
+            self.contained = {k: [other for other in ordered if other in k] for k in ordered}
+
+    def _match_keywords(self, text):
+        found = set()
+        for match in self.keyword_regex.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.update(self.contained[keyword])
+        return found
+
+    def _match_sender(self, address):
+        entries = list(self.exact_senders.get(address, ()))
+        domain = address.rpartition("@")[2]
+        while domain:
+            entries += self.domain_senders.get(domain, ())
+            domain = domain.partition(".")[2]
+        entries += [(fid, weight) for regex, fid, weight in self.pattern_senders if regex.match(address)]
+        return entries
+
+    def _match_headers(self, headers):
+        entries = []
+        lowered = {str(name).lower(): str(value).lower() for name, value in (headers or {}).items()}
+        for name, checks in self.headers.items():
+            if name not in lowered:
+                continue
+            for value, fid, weight in checks:
+                if value is None or value in lowered[name]:
+                    entries.append((fid, weight))
+        return entries
+
+    def score(self, email):
+        """메일 하나의 점수를 계산합니다. email 은 subject/text_body(또는 body)/from_header/headers 를 가진 dict 나 객체."""
+        matched = {}
+        if self.keyword_regex is not None:
+            body = _get(email, "text_body") or _get(email, "body")
+            text = f"{_get(email, 'subject')}\n{body[:MAX_SCAN_CHARS]}".lower()
+            for keyword in self._match_keywords(text):
+                matched.update(self.keywords[keyword])
+        if self.exact_senders or self.domain_senders or self.pattern_senders:
+            address = parseaddr(str(_get(email, "from_header")))[1].lower()
+            if address:
+                matched.update(self._match_sender(address))
+        if self.headers:
+            matched.update(self._match_headers(_get(email, "headers", {})))
+
+        score = round(sum(matched.values()), 4)
+        return ScoreResult(score=score, matched=tuple(sorted(matched)), is_spam=score >= self.threshold)
+
+    def score_batch(self, emails):
+        return [self.score(email) for email in emails]
+
+
+# 헤더 휴리스틱. 대량 발송 메일에 붙는 헤더는 점수를 더하고, 수신 서버가 이미 스팸으로 표시한 메일은 바로 스팸으로 본다.
+BULK_HEADER_WEIGHTS = (
+    ("list-unsubscribe", None, 1.5),
+    ("list-id", None, 0.5),
+    ("precedence", ("bulk", "junk", "list"), 1.5),
+    ("auto-submitted", ("auto-generated",), 0.5),
+)
+
+
+def header_heuristics(headers):
+    """
+    헤더만으로 판단할 수 있는 신호를 계산합니다.
+    (verdict, score, matched) 를 반환하며, verdict 는 "spam" 또는 None(판단 보류) 입니다.
+    """
+    lowered = {str(name).lower(): str(value).lower() for name, value in (headers or {}).items()}
+    if lowered.get("x-spam-flag", "").strip().startswith("yes") or lowered.get("x-spam-status", "").startswith("yes"):
+        return "spam", 0.0, ("header:x-spam-flag",)
+
+    score, matched = 0.0, []
+    for name, values, weight in BULK_HEADER_WEIGHTS:
+        if name not in lowered:
+            continue
+        if values is None or any(value in lowered[name] for value in values):
+            score += weight
+            matched.append(f"header:{name}")
+    return None, score, tuple(matched)
+
+
+def rules_fingerprint(rules):
+    return hashlib.sha1(json.dumps(rules or {}, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+_compiled_cache = OrderedDict()  # account_id -> (fingerprint, CompiledRules)
+_cache_lock = threading.Lock()
+
+
+def get_compiled_rules(account_id, rules):
+    """
+    계정별로 컴파일된 규칙을 캐시에서 꺼냅니다.
+    규칙 내용이 바뀌면 지문(fingerprint)이 달라지므로 자동으로 다시 컴파일됩니다.
+    """
+    fingerprint = rules_fingerprint(rules)
+    with _cache_lock:
+        cached = _compiled_cache.get(account_id)
+        if cached and cached[0] == fingerprint:
+            _compiled_cache.move_to_end(account_id)
+            return cached[1]
+
+    compiled = CompiledRules(rules)
+    with _cache_lock:
+        _compiled_cache[account_id] = (fingerprint, compiled)
+        _compiled_cache.move_to_end(account_id)
+        while len(_compiled_cache) > _CACHE_SIZE:
+            _compiled_cache.popitem(last=False)
+    return compiled
+
+
+def invalidate_compiled_rules(account_id):
+    with _cache_lock:
+        _compiled_cache.pop(account_id, None)
+
+
+def calculate_score(email, rules, account_id=None):
+    """
+    규칙(filter_rules)으로 메일의 스팸 점수를 계산합니다.
+    account_id 를 주면 계정별 컴파일 캐시를 사용합니다.
+    """
+    compiled = get_compiled_rules(account_id, rules) if account_id is not None else CompiledRules(rules)
+    return compiled.score(email)
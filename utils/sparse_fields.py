@@ -0,0 +1,131 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+
+# 응답 필드 선택 (sparse fieldsets).
+#   ?fields=id,folder,email.subject   → 지정한 필드만 응답
+#   ?exclude=email.text_body           → 지정한 필드를 빼고 응답
+# 점(.)으로 중첩 시리얼라이저의 필드를 지정한다. fields=email 처럼 중첩 필드 이름만 쓰면 하위 필드 전체를 포함한다.
+# 클라이언트가 HTML 본문만 그리는 경우 text_body 를 빼는 식으로 응답 크기를 줄이기 위함이다.
+
+SPARSE_FIELD_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        description="응답에 포함할 필드 목록 (콤마 구분, 중첩 필드는 점으로 지정. 예: `id,email.subject`)",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+    OpenApiParameter(
+        name="exclude",
+        description="응답에서 제외할 필드 목록 (콤마 구분, 예: `email.text_body,email.bcc_header`)",
+        required=False,
+        type=OpenApiTypes.STR,
+    ),
+]
+
+
+def parse_field_tree(value):
+    """'id,email.subject' 를 {"id": {}, "email": {"subject": {}}} 형태로 바꿉니다. 값이 없으면 None."""
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree or None
+
+
+def sparse_fields(request):
+    """요청의 fields / exclude 파라미터를 (include 트리, exclude 트리)로 반환합니다."""
+    if request is None:
+        return None, None
+    params = getattr(request, "query_params", request.GET)
+    return parse_field_tree(params.get("fields")), parse_field_tree(params.get("exclude"))
+
+
+def _subtree(tree, path):
+    """path 위치의 하위 트리. 제한이 없으면(트리 없음 또는 상위 필드 전체 지정) None."""
+    for name in path:
+        if tree is None:
+            return None
+        tree = tree.get(name)
+        if not tree:
+            return None
+    return tree
+
+
+def is_excluded(exclude, path):
+    """exclude 트리에 path 자체가 (하위 필드 지정 없이) 들어 있는지 여부"""
+    node = exclude
+    for name in path:
+        if node is None or name not in node:
+            return False
+        node = node[name]
+    return node == {}
+
+
+def is_selected(include, exclude, path):
+    """path 의 필드가 응답에 포함되는지 여부 (예: ("email", "html_body"))"""
+    for depth, name in enumerate(path):
+        allowed = _subtree(include, path[:depth])
+        if allowed is not None and name not in allowed:
+            return False
+        if is_excluded(exclude, path[: depth + 1]):
+            return False
+    return True
+
+
+def prune(data, include, exclude, path=()):
+    """
+    이미 만들어진 응답 dict 에 필드 선택을 적용합니다. (values() 기반 빠른 목록 경로용)
+    """
+    allowed = _subtree(include, path)
+    result = {}
+    for name, value in data.items():
+        if allowed is not None and name not in allowed:
+            continue
+        if is_excluded(exclude, (*path, name)):
+            continue
+        if isinstance(value, dict):
+            value = prune(value, include, exclude, (*path, name))
+        result[name] = value
+    return result
+
+
+class SparseFieldsMixin:
+    """
+    읽기용 시리얼라이저에 fields / exclude 쿼리 파라미터를 적용하는 믹스인.
+    중첩 시리얼라이저에도 이 믹스인을 붙여야 점(.) 경로가 동작합니다. (context 에 request 가 있어야 함)
+    """
+
+    def _field_path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:  # many=True 인 경우 이름은 ListSerializer 쪽에 있다
+                path.append(node.field_name)
+            node = node.parent
+        return tuple(reversed(path))
+
+    def _sparse_filter(self):
+        context = self.context
+        if "_sparse_fields" not in context:
+            context["_sparse_fields"] = sparse_fields(context.get("request"))
+        return context["_sparse_fields"]
+
+    @property
+    def _readable_fields(self):
+        include, exclude = self._sparse_filter()
+        if include is None and exclude is None:
+            yield from super()._readable_fields
+            return
+
+        path = self._field_path()
+        allowed = _subtree(include, path)
+        for field in super()._readable_fields:
+            if allowed is not None and field.field_name not in allowed:
+                continue
+            if is_excluded(exclude, (*path, field.field_name)):
+                continue
+            yield field
@@ -1,7 +1,30 @@
-import os
-from dotenv import load_dotenv
-from google import genai
-from google.genai import types
+import logging
+
+from utils import textrank
+from utils.llm import LLMError, get_gateway
+from utils.llm_batching import clean_body
+
+logger = logging.getLogger(__name__)
+
+# 요약 요청은 사용자가 응답을 기다리므로 분류보다 짧은 마감 시간을 둔다
+SUMMARY_TIMEOUT = 30.0
+# LLM 없이 요약할 때 보는 본문(인용문/서명 제외) 길이
+LOCAL_SUMMARY_BODY_CHARS = 5000
+
+SYSTEM_INSTRUCTION = """
+        You are an expert at summarizing emails. Your task is to create a concise summary of the given email content.
+        The summary should be in Korean.
+        Focus on the main point of the email and be as brief as possible.
+        """
+
+
+def _user_prompt(subject: str, body: str) -> str:
+    return f"""
+        **Subject:** {subject}
+
+        **Body:**
+        {body}
+        """
 
 
 def summarize_email_content(subject: str, body: str) -> str:
@@ -13,35 +36,42 @@ def summarize_email_content(subject: str, body: str) -> str:
         body (str): 이메일 본문
 
     Returns:
-        str: LLM이 생성한 요약 내용
+        str: LLM이 생성한 요약 내용. 실패하거나 SUMMARY_TIMEOUT 안에 끝나지 않으면 빈 문자열
     """
-    load_dotenv()
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        print("Error: GOOGLE_API_KEY not found in .env file")
+    try:
+        return get_gateway().generate(_user_prompt(subject, body), SYSTEM_INSTRUCTION, timeout=SUMMARY_TIMEOUT).strip()
+    except LLMError as e:
+        logger.warning("summarization API call failed: %s", e)
         return ""
 
-    try:
-        client = genai.Client(api_key=api_key)
 
-        system_instruction = """
-        You are an expert at summarizing emails. Your task is to create a concise summary of the given email content.
-        The summary should be in Korean.
-        Focus on the main point of the email and be as brief as possible.
-        """
+def stream_email_content(subject: str, body: str, on_text) -> str:
+    """
+    summarize_email_content 의 스트리밍 버전. 요약 조각을 받을 때마다 on_text(조각)을 호출합니다.
 
-        user_prompt = f"""
-        **Subject:** {subject}
+    Returns:
+        str: 조각을 이어 붙인 요약 내용. 중간에 실패하면 (이미 on_text 로 보낸 조각이 있어도) 빈 문자열
+    """
+    parts = []
+    try:
+        for part in get_gateway().stream(_user_prompt(subject, body), SYSTEM_INSTRUCTION, timeout=SUMMARY_TIMEOUT):
+            parts.append(part)
+            on_text(part)
+    except LLMError as e:
+        logger.warning("summarization API call failed: %s", e)
+        return ""
+    return "".join(parts).strip()
 
-        **Body:**
-        {body}
-        """
 
-        config = types.GenerateContentConfig(system_instruction=system_instruction)
-        response = client.models.generate_content(model="gemini-2.5-pro", config=config, contents=user_prompt)
+def summarize_locally(subject: str, body: str) -> str:
+    """
+    LLM 없이 본문에서 중요한 문장을 골라 요약합니다. (utils/textrank.py, 메일 하나에 몇 ms)
+    고를 문장이 없으면(인사말뿐인 메일 등) 본문 앞부분을 반환합니다.
+    """
+    text = clean_body(body or "", limit=LOCAL_SUMMARY_BODY_CHARS)
+    return textrank.summarize(subject, text) or text[: textrank.MAX_CHARS]
 
-        return response.text.strip()
 
-    except Exception as e:
-        print(f"An error occurred during the summarization API call: {e}")
-        return ""
+def llm_available() -> bool:
+    """LLM circuit breaker 가 열려 있으면(장애 중) False. 이때 LLM 을 부르면 바로 실패한다."""
+    return get_gateway().breaker.state != "open"
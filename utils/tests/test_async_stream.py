@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.async_stream import stream_from_thread
+
+
+def collect(produce, limit=None):
+    async def run():
+        items = []
+        async for item in stream_from_thread(produce):
+            items.append(item)
+            if limit is not None and len(items) >= limit:
+                break
+        return items
+
+    return asyncio.run(run())
+
+
+def test_items_come_from_one_producer_thread():
+    threads = set()
+
+    def produce(emit):
+        for i in range(3):
+            threads.add(threading.current_thread().name)
+            emit(i)
+
+    assert collect(produce) == [0, 1, 2]
+    assert len(threads) == 1 and threading.main_thread().name not in threads
+
+
+def test_producer_error_is_raised_after_emitted_items():
+    def produce(emit):
+        emit("partial")
+        raise ValueError("boom")
+
+    items = []
+
+    async def run():
+        async for item in stream_from_thread(produce):
+            items.append(item)
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+    assert items == ["partial"]
+
+
+def test_producer_finishes_after_consumer_stops():
+    finished = threading.Event()
+
+    def produce(emit):
+        for i in range(5):
+            emit(i)
+        finished.set()
+
+    assert collect(produce, limit=1) == [0]
+    assert finished.wait(1)
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from utils.llm import (
+    CircuitBreaker,
+    FakeBackend,
+    LLMBackendError,
+    LLMGateway,
+    LLMTimeout,
+    LLMUnavailable,
+)
+
+
+def gateway(backend, **kwargs):
+    kwargs.setdefault("backoff", 0.001)
+    return LLMGateway(lambda: backend, **kwargs)
+
+
+class Flaky(FakeBackend):
+    def __init__(self, failures, retryable=True):
+        super().__init__(responder=lambda prompt, system_instruction: f"ok:{prompt}")
+        self.failures = failures
+        self.retryable = retryable
+
+    def generate(self, model, prompt, system_instruction, timeout):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise LLMBackendError("boom", retryable=self.retryable)
+        return self.responder(prompt, system_instruction)
+
+
+def test_retries_transient_errors_and_reuses_backend():
+    backend = Flaky(failures=2)
+    llm = gateway(backend, max_retries=2)
+    assert llm.generate("hi") == "ok:hi"
+    assert backend.calls == 3
+    assert llm.backend is backend
+
+
+def test_non_retryable_error_fails_immediately():
+    backend = Flaky(failures=5, retryable=False)
+    with pytest.raises(LLMBackendError):
+        gateway(backend, max_retries=3).generate("hi")
+    assert backend.calls == 1
+
+
+def test_deadline_covers_slow_backend():
+    llm = gateway(FakeBackend(latency=1.0), max_retries=0)
+    started = time.monotonic()
+    with pytest.raises(LLMTimeout):
+        llm.generate("hi", timeout=0.05)
+    assert time.monotonic() - started < 0.5
+
+
+def test_circuit_breaker_fails_fast_then_half_opens():
+    backend = Flaky(failures=3)
+    llm = gateway(backend, max_retries=0, breaker=CircuitBreaker(threshold=3, reset_timeout=0.05))
+    for _ in range(3):
+        with pytest.raises(LLMBackendError):
+            llm.generate("hi")
+    with pytest.raises(LLMUnavailable):
+        llm.generate("hi")
+    assert backend.calls == 3
+    assert llm.breaker.state == "open"
+
+    time.sleep(0.06)
+    assert llm.generate("hi") == "ok:hi"
+    assert llm.breaker.state == "closed"
+
+
+def test_concurrency_is_limited():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def responder(prompt, system_instruction):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        return prompt
+
+    llm = gateway(FakeBackend(responder=responder), max_concurrency=2)
+    threads = [threading.Thread(target=llm.generate, args=(str(i),)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_stream_retries_only_before_first_chunk():
+    backend = Flaky(failures=1)
+    assert "".join(gateway(backend, max_retries=2).stream("hi there")) == "ok:hi there"
+    assert backend.calls == 2
+
+    class BrokenMidway(FakeBackend):
+        def stream(self, model, prompt, system_instruction, timeout):
+            self.calls += 1
+            yield "partial"
+            raise LLMBackendError("connection reset")
+
+    backend = BrokenMidway()
+    chunks = []
+    with pytest.raises(LLMBackendError):
+        for chunk in gateway(backend, max_retries=2).stream("hi"):
+            chunks.append(chunk)
+    assert chunks == ["partial"]
+    assert backend.calls == 1
+
+
+def test_closing_stream_releases_slot():
+    llm = gateway(FakeBackend(responder=lambda prompt, system_instruction: "a b c"), max_concurrency=1)
+    stream = llm.stream("hi")
+    assert next(stream) == "a"
+    stream.close()
+    assert llm.generate("hi", timeout=0.1) == "a b c"
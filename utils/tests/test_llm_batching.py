@@ -0,0 +1,57 @@
+import threading
+import time
+
+from utils.llm_batching import clean_body, estimate_tokens, pack_chunks, run_chunks
+
+
+def test_clean_body_strips_html_quotes_and_signature():
+    html_body = (
+        "<html><head><style>p{}</style></head><body><p>안녕하세요&nbsp;회의 안내</p><div>내일 10시</div></body></html>"
+    )
+    assert clean_body(html_body) == "안녕하세요 회의 안내\n내일 10시"
+
+    text = "확인했습니다.\n\n-- \n홍길동 드림\n010-0000-0000"
+    assert clean_body(text) == "확인했습니다."
+
+    reply = "좋습니다.\n> 이전 내용\nOn Mon, Jan 1, 2024 at 10:00 Kim <kim@x.com> wrote:\n> 원문"
+    assert clean_body(reply) == "좋습니다."
+    assert clean_body("가" * 5000, limit=100) == "가" * 100
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("안녕하세요") == 5
+
+
+def test_pack_chunks_respects_budget_and_max_items():
+    items = [10, 10, 10, 50, 10, 10, 10, 10]
+    chunks = pack_chunks(items, budget=30, max_items=2, cost=lambda item: item)
+    assert chunks == [[10, 10], [10], [50], [10, 10], [10, 10]]
+    assert pack_chunks([], budget=30, max_items=2) == []
+
+
+def test_run_chunks_retries_only_failed_chunk_with_bounded_parallelism():
+    calls = {}
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def worker(chunk):
+        with lock:
+            calls[chunk[0]] = calls.get(chunk[0], 0) + 1
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        if chunk[0] == "b" and calls["b"] == 1:
+            raise ValueError("malformed json")
+        if chunk[0] == "c":
+            raise ValueError("always broken")
+        return {item: "inbox" for item in chunk}
+
+    chunks = [["a", "a2"], ["b"], ["c"], ["d"], ["e"]]
+    results = run_chunks(chunks, worker, max_workers=2, retries=1, backoff=0)
+    assert results == {"a": "inbox", "a2": "inbox", "b": "inbox", "d": "inbox", "e": "inbox"}
+    assert calls == {"a": 1, "b": 2, "c": 2, "d": 1, "e": 1}
+    assert peak[0] <= 2
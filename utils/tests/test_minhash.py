@@ -0,0 +1,48 @@
+import numpy as np
+
+from utils import minhash
+from utils.minhash import BANDS, NUM_PERM, band_buckets, from_bytes, normalize, signatures, similarity, to_bytes
+
+CAMPAIGN = (
+    "안녕하세요 {name} 고객님, 이번 주 특가 상품을 소개합니다. 최대 50% 할인된 가격으로 겨울 코트와 니트를 만나보세요. "
+    "쿠폰 코드는 WINTER 입니다. 자세한 내용은 https://shop.example.com/track?u={uid} 에서 확인하세요. "
+    "이번 행사는 이번 주 일요일까지 진행됩니다. 수신을 원하지 않으시면 {email} 로 알려 주세요."
+)
+OTHER = "Quarterly report attached, please review the numbers before our meeting on Friday and let me know if anything looks off."
+
+
+def campaign(name, uid):
+    return CAMPAIGN.format(name=name, uid=uid, email=f"{uid}@mail.example.com")
+
+
+def test_normalize_drops_links_addresses_and_numbers():
+    assert normalize("Visit https://x.com/a?b=1 or mail me@x.com, code 1234!") == ["visit", "or", "mail", "code", "0"]
+
+
+def test_near_duplicates_share_buckets_and_score_high():
+    first, second, other, short = signatures([campaign("홍길동", 1), campaign("김철수", 98765), OTHER, "감사합니다"])
+    assert short is None
+    assert first.shape == (NUM_PERM,) and first.dtype == np.uint32
+
+    assert similarity(first, second) >= 0.8
+    assert similarity(first, other) < 0.3
+    assert (band_buckets(first) == band_buckets(second)).any()
+    assert len(set(band_buckets(first)) & set(band_buckets(other))) == 0
+
+
+def test_batch_computation_matches_one_by_one(monkeypatch):
+    texts = [campaign(str(i), i) * (i % 3 + 1) for i in range(30)] + [OTHER]
+    # 여러 블록으로 나뉘어 계산되도록 블록 크기를 줄인다
+    monkeypatch.setattr(minhash, "BLOCK_SHINGLES", 100)
+    batched = signatures(texts)
+    for text, signature in zip(texts, batched):
+        assert np.array_equal(signatures([text])[0], signature)
+
+
+def test_band_buckets_and_serialization():
+    signature = signatures([OTHER * 2])[0]
+    buckets = band_buckets(signature)
+    assert buckets.shape == (BANDS,) and buckets.dtype == np.int64 and (buckets >= 0).all()
+    assert np.array_equal(from_bytes(to_bytes(signature)), signature)
+    assert len(to_bytes(signature)) == NUM_PERM * 4
+    assert from_bytes(None) is None
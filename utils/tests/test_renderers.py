@@ -0,0 +1,20 @@
+import json
+from datetime import datetime, timezone
+
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from utils.renderers import ORJSONRenderer
+
+
+def test_renders_drf_subclasses_like_json_renderer():
+    data = ReturnDict(
+        {
+            "query": [ErrorDetail("Unknown operator: foo", code="invalid")],
+            "at": datetime(2025, 1, 1, tzinfo=timezone.utc),
+        },
+        serializer=None,
+    )
+    assert json.loads(ORJSONRenderer().render(data)) == json.loads(JSONRenderer().render(data))
+    assert json.loads(ORJSONRenderer().render(data))["query"] == ["Unknown operator: foo"]
@@ -0,0 +1,50 @@
+from utils.sender_reputation import (
+    MAX_WEIGHT,
+    accumulate,
+    group_by_key,
+    is_group_key,
+    list_id,
+    sender_key,
+    verdict,
+)
+
+
+def test_sender_key_prefers_list_id_then_bulk_domain_then_address():
+    assert list_id({"List-Id": "Weekly News <News.Example.COM>"}) == "news.example.com"
+    assert list_id({"list-id": "plain-id"}) == "plain-id"
+    assert list_id({}) == ""
+
+    assert sender_key("A <a@x.com>", {"List-Id": "<list.x.com>"}) == "list:list.x.com"
+    assert sender_key("Promo <deals@Mail.Shop.com>", {"List-Unsubscribe": "<mailto:u@x>"}) == "domain:mail.shop.com"
+    assert sender_key("Promo <deals@shop.com>", {"Precedence": "Bulk"}) == "domain:shop.com"
+    # 개인 메일은 공용 도메인으로 묶지 않고 주소별로 본다
+    assert sender_key("Friend <Friend@Gmail.com>", {}) == "addr:friend@gmail.com"
+    assert sender_key("", {}) == ""
+
+    assert is_group_key("list:a") and is_group_key("domain:b.com")
+    assert not is_group_key("addr:c@d.com") and not is_group_key("")
+
+
+def test_verdict_needs_enough_and_consistent_weight():
+    assert verdict(4, 0) is None
+    assert verdict(5, 0) == "spam"
+    assert verdict(1, 9) == "inbox"
+    assert verdict(9, 2) is None
+
+
+def test_accumulate_clamps_and_decays():
+    assert accumulate((3, 0), (-5, 0)) == (0, 0)
+    spam, ham = accumulate((MAX_WEIGHT - 1, 0), (0, 5))
+    assert spam + ham <= MAX_WEIGHT
+    assert spam > ham > 0
+    # 따로 쌓는 가중치도 함께 줄인다
+    weights = accumulate((MAX_WEIGHT - 10, 0, 10, 0), (0, 0, 5, 0))
+    assert sum(weights) <= MAX_WEIGHT
+    assert weights[0] > weights[2] > 0
+
+
+def test_group_by_key_keeps_first_seen_order():
+    items = ["l1", "a1", "l2", "b1", "l3"]
+    groups = group_by_key(items, lambda item: item[0])
+    assert list(groups) == ["l", "a", "b"]
+    assert groups["l"] == ["l1", "l2", "l3"]
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from utils.single_flight import SingleFlight, SingleFlightTimeout
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as exc:
+            results[index] = exc
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "summary"
+
+    results = run_concurrently(8, lambda: flights.do("mail-1", slow, timeout=5))
+    assert len(calls) == 1
+    assert [value for value, _shared in results] == ["summary"] * 8
+    assert sum(shared for _value, shared in results) == 7
+    assert not flights.in_flight("mail-1")
+
+    # 끝난 뒤의 요청은 다시 실행된다 (결과를 캐시하지 않음)
+    assert flights.do("mail-1", lambda: "again") == ("again", False)
+
+
+def test_different_keys_run_independently():
+    flights = SingleFlight()
+    results = run_concurrently(4, lambda: flights.do(threading.get_ident(), lambda: "x", timeout=5))
+    assert all(shared is False for _value, shared in results)
+
+
+def test_waiters_get_the_leaders_exception_and_bounded_wait():
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError("llm down")
+
+    results = run_concurrently(3, lambda: flights.do("k", failing, timeout=5))
+    assert all(isinstance(result, ValueError) for result in results)
+
+    started = threading.Event()
+
+    def leader():
+        started.set()
+        time.sleep(0.5)
+        return "late"
+
+    thread = threading.Thread(target=flights.do, args=("slow", leader))
+    thread.start()
+    started.wait()
+    with pytest.raises(SingleFlightTimeout):
+        flights.do("slow", lambda: "unused", timeout=0.05)
+    thread.join()
@@ -0,0 +1,81 @@
+import time
+
+from utils.spam_bayes import HashedNaiveBayes, tokenize
+
+SPAM = [
+    {
+        "subject": "무료 체험 이벤트",
+        "text_body": "지금 가입하면 100% 무료 쿠폰 https://promo.example.com/x",
+        "from_header": "ad@promo.example.com",
+    },
+    {
+        "subject": "대출 한도 조회",
+        "text_body": "무료 상담 즉시 승인 https://promo.example.com/y",
+        "from_header": "loan@promo.example.com",
+    },
+    {
+        "subject": "당첨 축하",
+        "text_body": "쿠폰 당첨 이벤트 확인 https://promo.example.com/z",
+        "from_header": "win@promo.example.com",
+    },
+]
+HAM = [
+    {"subject": "회의 일정", "text_body": "내일 오전 회의 자료 공유드립니다", "from_header": "kim@corp.com"},
+    {
+        "subject": "코드 리뷰 요청",
+        "text_body": "PR 리뷰 부탁드립니다 회의 전에 확인 바랍니다",
+        "from_header": "lee@corp.com",
+    },
+    {"subject": "주간 보고", "text_body": "이번 주 진행 상황 공유드립니다", "from_header": "park@corp.com"},
+]
+
+
+def trained():
+    model = HashedNaiveBayes()
+    model.learn(SPAM, "spam")
+    model.learn(HAM, "ham")
+    return model
+
+
+def test_tokenize_prefixes_subject_sender_and_links():
+    tokens = tokenize(SPAM[0])
+    assert {"s:무료", "무료", "url:promo.example.com", "from:ad@promo.example.com", "from@promo.example.com"} <= tokens
+
+
+def test_predicts_trained_classes():
+    model = trained()
+    probability = model.predict_spam_proba(
+        [
+            {
+                "subject": "무료 쿠폰 이벤트",
+                "text_body": "https://promo.example.com/new",
+                "from_header": "x@promo.example.com",
+            },
+            {"subject": "회의 자료", "text_body": "회의 전에 공유드립니다", "from_header": "choi@corp.com"},
+        ]
+    )
+    assert probability[0] > 0.95
+    assert probability[1] < 0.05
+
+
+def test_unlearn_restores_previous_state_and_roundtrips_bytes():
+    model = trained()
+    before = model.counts.copy()
+    model.learn(SPAM[:1], "spam")
+    model.learn(SPAM[:1], "spam", sign=-1)
+    assert (model.counts == before).all()
+    assert list(model.docs) == [3, 3]
+
+    restored = HashedNaiveBayes.from_bytes(model.to_bytes(), model.docs)
+    assert (restored.counts == model.counts).all()
+    assert len(model.to_bytes()) < 20000
+
+
+def test_batch_prediction_is_fast():
+    model = trained()
+    batch = [
+        {"subject": f"메일 {i}", "text_body": "회의 무료 쿠폰 " * 50, "from_header": f"u{i}@x.com"} for i in range(200)
+    ]
+    started = time.perf_counter()
+    assert len(model.predict_spam_proba(batch)) == 200
+    assert time.perf_counter() - started < 0.5
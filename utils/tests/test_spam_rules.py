@@ -0,0 +1,90 @@
+import time
+
+from utils.spam_rules import CompiledRules, calculate_score, get_compiled_rules, header_heuristics
+
+RULES = {
+    "spam_threshold": 5,
+    "factors": [
+        {"id": "free", "type": "keyword", "content": "무료", "weight": 1},
+        {"id": "free-ship", "type": "keyword", "content": "무료 배송", "weight": 2},
+        {"id": "ab", "type": "keyword", "content": "ab", "weight": 0.5},
+        {"id": "bc", "type": "keyword", "content": "BC", "weight": 0.25},
+        {"id": "promo", "type": "sender", "content": "promo.example.com", "weight": 3},
+        {"id": "glob", "type": "sender", "content": "news*@*", "weight": 1},
+        {"id": "boss", "type": "sender", "content": "boss@corp.com", "weight": -10},
+        {"id": "unsub", "type": "header", "content": "List-Unsubscribe", "weight": 0.5},
+        {"id": "bulk", "type": "header", "content": "Precedence: bulk", "weight": 1},
+    ],
+}
+
+
+def mail(subject="", body="", sender="someone@x.com", headers=None):
+    return {"subject": subject, "text_body": body, "from_header": sender, "headers": headers or {}}
+
+
+def test_overlapping_keywords_are_all_credited():
+    result = calculate_score(mail("오늘만 무료 배송!"), RULES)
+    assert result.matched == ("free", "free-ship")
+    assert result.score == 3
+
+    # 부분적으로 겹치는 키워드 (ab / bc in "abc"), 여러 번 나와도 한 번만
+    result = calculate_score(mail(body="ABC abc"), RULES)
+    assert result.matched == ("ab", "bc")
+    assert result.score == 0.75
+
+
+def test_sender_domain_glob_and_negative_weight():
+    assert calculate_score(mail(sender="Deals <deals@mail.promo.example.com>"), RULES).matched == ("promo",)
+    assert calculate_score(mail(sender="newsletter@foo.org"), RULES).matched == ("glob",)
+    result = calculate_score(mail("무료 배송", sender="Boss <BOSS@corp.com>"), RULES)
+    assert result.score == -7 and not result.is_spam
+
+
+def test_header_factors_and_threshold():
+    headers = {"List-Unsubscribe": "<mailto:x>", "Precedence": "Bulk"}
+    result = calculate_score(mail("무료 배송", sender="a@promo.example.com", headers=headers), RULES)
+    assert set(result.matched) == {"free", "free-ship", "promo", "unsub", "bulk"}
+    assert result.score == 7.5 and result.is_spam
+
+
+def test_ham_threshold_is_clamped_to_spam_threshold():
+    assert CompiledRules({}).ham_threshold == -1.0
+    assert CompiledRules({"spam_threshold": 2, "ham_threshold": 0.5}).ham_threshold == 0.5
+    assert CompiledRules({"spam_threshold": 2, "ham_threshold": 9}).ham_threshold == 2
+
+
+def test_header_heuristics():
+    assert header_heuristics({"X-Spam-Flag": "YES"})[0] == "spam"
+    assert header_heuristics({"X-Spam-Status": "Yes, score=7.1"})[0] == "spam"
+    assert header_heuristics({"X-Spam-Status": "No, score=0.2"}) == (None, 0.0, ())
+
+    verdict, score, matched = header_heuristics({"List-Unsubscribe": "<mailto:u@x.com>", "Precedence": "Bulk"})
+    assert verdict is None
+    assert score == 3.0
+    assert matched == ("header:list-unsubscribe", "header:precedence")
+    assert header_heuristics({"Precedence": "first-class"})[1] == 0
+
+
+def test_invalid_factors_are_ignored():
+    rules = {"factors": [{"type": "keyword", "content": "", "weight": 1}, {"type": "keyword", "weight": "x"}, "bad"]}
+    assert calculate_score(mail("anything"), rules).score == 0
+    assert calculate_score(mail("anything"), {}).is_spam is False
+
+
+def test_compiled_rules_cache_follows_rule_changes():
+    first = get_compiled_rules(1, RULES)
+    assert get_compiled_rules(1, RULES) is first
+    changed = {**RULES, "spam_threshold": 1}
+    assert get_compiled_rules(1, changed) is not first
+    assert get_compiled_rules(1, changed).threshold == 1
+
+
+def test_batch_scoring_is_fast():
+    rules = {"factors": [{"id": f"k{i}", "type": "keyword", "content": f"keyword{i}", "weight": 1} for i in range(300)]}
+    compiled = CompiledRules(rules)
+    emails = [mail(f"subject {i}", "본문 " * 200 + " keyword42") for i in range(200)]
+    started = time.perf_counter()
+    results = compiled.score_batch(emails)
+    # "keyword42" 안에 "keyword4" 도 포함되어 있다
+    assert all(r.matched == ("k4", "k42") for r in results)
+    assert (time.perf_counter() - started) / len(emails) < 0.005
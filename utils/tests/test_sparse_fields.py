@@ -0,0 +1,35 @@
+from utils.sparse_fields import is_selected, parse_field_tree, prune
+
+
+ROW = {
+    "id": 1,
+    "folder": "inbox",
+    "email": {"subject": "hi", "text_body": "t", "html_body": "<p>h</p>"},
+}
+
+
+def test_parse_field_tree():
+    assert parse_field_tree("id, email.subject,email.date") == {"id": {}, "email": {"subject": {}, "date": {}}}
+    assert parse_field_tree("") is None
+    assert parse_field_tree(",") is None
+
+
+def test_prune_fields():
+    include = parse_field_tree("id,email.subject")
+    assert prune(ROW, include, None) == {"id": 1, "email": {"subject": "hi"}}
+    # 중첩 필드 이름만 쓰면 하위 필드 전체 포함
+    assert prune(ROW, parse_field_tree("email"), None) == {"email": ROW["email"]}
+
+
+def test_prune_exclude():
+    exclude = parse_field_tree("folder,email.text_body")
+    assert prune(ROW, None, exclude) == {"id": 1, "email": {"subject": "hi", "html_body": "<p>h</p>"}}
+
+
+def test_is_selected():
+    assert is_selected(None, None, ("email", "html_body"))
+    assert not is_selected(parse_field_tree("id"), None, ("email", "html_body"))
+    assert is_selected(parse_field_tree("email"), None, ("email", "html_body"))
+    assert not is_selected(parse_field_tree("email.subject"), None, ("email", "html_body"))
+    assert not is_selected(None, parse_field_tree("email.html_body"), ("email", "html_body"))
+    assert not is_selected(None, parse_field_tree("email"), ("email", "html_body"))
@@ -0,0 +1,59 @@
+import time
+
+from utils.textrank import MAX_CHARS, split_sentences, summarize, tokens
+
+MEETING = """안녕하세요, 홍길동입니다.
+다음 주 화요일 오후 3시에 3분기 마케팅 예산 검토 회의가 있습니다. 회의실은 본관 5층 대회의실입니다
+회의 전까지 각 팀은 3분기 마케팅 예산 집행 내역과 4분기 예산 요청안을 공유 드라이브에 올려 주세요
+- 디자인팀: 캠페인 시안 비용 정리
+- 개발팀: 광고 트래킹 시스템 유지보수 비용
+예산 검토 회의에서는 4분기 예산 배분을 확정할 예정이니 꼭 참석 부탁드립니다.
+점심 메뉴는 아직 미정입니다.
+감사합니다."""
+
+
+def test_split_sentences_handles_korean_endings_lists_and_wrapped_lines():
+    sentences = split_sentences(
+        "회의는 3시입니다 자료는 미리 보내 주세요\n"
+        "- 첫째 항목\n"
+        "1. 둘째 항목\n"
+        "This line was wrapped by the mail client at a fixed width and\n"
+        "continues here. Next sentence!"
+    )
+    assert sentences == [
+        "회의는 3시입니다",
+        "자료는 미리 보내 주세요",
+        "첫째 항목",
+        "둘째 항목",
+        "This line was wrapped by the mail client at a fixed width and continues here.",
+        "Next sentence!",
+    ]
+
+
+def test_korean_tokens_are_bigrams_so_particles_still_overlap():
+    assert set(tokens("예산을")) & set(tokens("예산은")) == {"예산"}
+    assert tokens("Q4 budget, a 회") == ["q4", "budget", "회"]
+
+
+def test_summary_picks_central_sentences_in_original_order():
+    summary = summarize("3분기 마케팅 예산 검토 회의 안내", MEETING)
+    assert summary.startswith("다음 주 화요일 오후 3시에 3분기 마케팅 예산 검토 회의가 있습니다.")
+    assert "예산 배분을 확정" in summary
+    assert "안녕하세요" not in summary and "점심" not in summary
+    assert len(summary) <= MAX_CHARS
+
+
+def test_repeated_sentences_are_used_once_and_long_text_is_cut():
+    text = "Please upload your budget report. " * 5 + "The budget review is on Friday. Lunch is at noon."
+    assert summarize("budget", text).count("Please upload") == 1
+    assert summarize("", "가" * 1000, max_chars=50) == "가" * 49 + "…"
+    assert summarize("", "") == "" and summarize("", "감사합니다.") == ""
+
+
+def test_long_mail_is_summarized_in_a_few_milliseconds():
+    body = "\n".join(MEETING for _ in range(20))
+    summarize("예산 회의", body)
+    started = time.perf_counter()
+    for _ in range(20):
+        summarize("예산 회의", body)
+    assert (time.perf_counter() - started) / 20 < 0.02
@@ -0,0 +1,143 @@
+import re
+
+import numpy as np
+
+# LLM 없이 메일을 요약하는 추출 요약기(TextRank). 본문에서 중요한 문장 몇 개를 골라 원래 순서대로 잇는다.
+#   1. split_sentences : 줄바꿈/문장부호/한국어 종결어미("니다", "세요" 등)로 문장을 나눈다.
+#                        고정 폭으로 줄바꿈된 긴 줄은 한 문장으로 다시 잇는다.
+#   2. tokens          : 한글은 글자 bigram (조사가 붙어도 같은 말끼리 겹치도록), 영문/숫자는 단어 단위
+#   3. TF-IDF          : 문장 x 토큰 행렬을 한 번에 만들고 행을 정규화한다. 문장 간 유사도는 행렬 곱 한 번이다.
+#   4. TextRank        : 유사도 그래프에서 PageRank 를 반복 계산한다. 제목과 닮은 문장에서 출발할 확률을 높인다.
+# 문장 수와 본문 길이를 제한하므로 메일 하나에 몇 ms 안에 끝난다.
+# 짧은 메일 요약, LLM 장애(circuit open) 시 대체 요약, LLM 요약을 기다리는 동안의 미리보기에 쓴다. (summarizer.py)
+
+# 요약에 넣는 최대 문장 수와 글자 수
+MAX_SENTENCES = 3
+MAX_CHARS = 300
+# 이보다 많은 문장은 보지 않는다 (뒤쪽은 대개 안내문/수신 거부 문구)
+MAX_INPUT_SENTENCES = 60
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+# 고정 폭 줄바꿈으로 보고 다음 줄과 잇는 줄 길이
+WRAP_WIDTH = 60
+
+_LIST_ITEM = re.compile(r"^\s*(?:[-*•·▶■□○●]|\d+[.)]|[가-하][.)])\s*")
+_LINE_END = re.compile(r"([.!?。！？…~]|니다|세요|[어아해까]요|[다죠])[\"')\]]*$")
+# 문장부호 뒤, 또는 문장부호 없이 끝나는 종결어미 뒤의 공백에서 나눈다
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?。！？…~])\s+|(?<=니다)\s+|(?<=세요)\s+|(?<=[어아해까]요)\s+")
+_TOKEN = re.compile(r"[가-힣]+|[a-z0-9]+")
+_URL = re.compile(r"(https?://|www\.)\S+", re.IGNORECASE)
+# 인사/맺음말만 있는 문장은 요약에 넣지 않는다
+_BOILERPLATE = re.compile(
+    r"^(안녕하세요|안녕하십니까|감사합니다|고맙습니다|수고하세요|수고하십시오|좋은 하루 되세요"
+    r"|hi|hello|dear|thanks|thank you|best regards|regards|cheers)\b[^.!?]{0,20}[.!?]?$",
+    re.IGNORECASE,
+)
+
+
+def _lines_to_segments(text):
+    """줄 단위로 나누되, 고정 폭으로 줄바꿈된 줄은 다음 줄과 잇는다. 목록 항목은 따로 둔다."""
+    segments = []
+    joinable = False
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            joinable = False
+            continue
+        if joinable and not _LIST_ITEM.match(line):
+            segments[-1] = f"{segments[-1]} {line}"
+        else:
+            segments.append(_LIST_ITEM.sub("", line) or line)
+        joinable = len(line) >= WRAP_WIDTH and not _LINE_END.search(line)
+    return segments
+
+
+def split_sentences(text):
+    """본문을 문장 목록으로 나눕니다."""
+    if not text:
+        return []
+    text = _URL.sub("", text.replace("\r\n", "\n"))
+    sentences = []
+    for segment in _lines_to_segments(text):
+        sentences.extend(part.strip() for part in _SENTENCE_BREAK.split(segment) if part.strip())
+    return sentences
+
+
+def tokens(sentence):
+    result = []
+    for word in _TOKEN.findall(sentence.lower()):
+        if "가" <= word[0] <= "힣":
+            result.extend([word] if len(word) == 1 else [word[i : i + 2] for i in range(len(word) - 1)])
+        elif len(word) > 1:
+            result.append(word)
+    return result
+
+
+def _term_counts(token_lists, vocabulary):
+    """문장 x 토큰 출현 횟수 행렬을 만든다. vocabulary 에 없는 토큰은 추가한다."""
+    rows, cols = [], []
+    for row, sentence_tokens in enumerate(token_lists):
+        for token in sentence_tokens:
+            rows.append(row)
+            cols.append(vocabulary.setdefault(token, len(vocabulary)))
+    counts = np.zeros((len(token_lists), len(vocabulary)))
+    np.add.at(counts, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1.0)
+    return counts
+
+
+def _rank(similarity, personalization):
+    """유사도 행렬에서 PageRank 점수를 계산한다. 이웃이 없는 문장은 모든 문장으로 고르게 이어진다고 본다."""
+    n = len(similarity)
+    weights = similarity.sum(axis=1, keepdims=True)
+    transition = np.where(weights > 0, similarity / np.where(weights > 0, weights, 1.0), 1.0 / n)
+    scores = np.full(n, 1.0 / n)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - DAMPING) * personalization + DAMPING * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize(subject, body, max_sentences=MAX_SENTENCES, max_chars=MAX_CHARS):
+    """본문에서 중요한 문장을 골라 원래 순서대로 이은 요약을 반환합니다. 문장이 없으면 빈 문자열."""
+    # 같은 문장이 반복되면(안내문, 템플릿) 한 번만 본다
+    sentences = list(dict.fromkeys(s for s in split_sentences(body)[:MAX_INPUT_SENTENCES] if not _BOILERPLATE.match(s)))
+    if not sentences:
+        return ""
+
+    if len(sentences) <= max_sentences:
+        chosen = list(range(len(sentences)))
+    else:
+        vocabulary = {}
+        counts = _term_counts([tokens(s) for s in sentences], vocabulary)
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+        matrix = np.log1p(counts) * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms > 0, norms, 1.0)
+
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+
+        # 제목과 닮은 문장에서 출발할 확률을 높인다 (제목 토큰 중 본문에 없는 것은 무시)
+        subject_tokens = [t for t in tokens(subject or "") if t in vocabulary]
+        personalization = np.ones(len(sentences))
+        if subject_tokens:
+            subject_vector = np.zeros(len(vocabulary))
+            np.add.at(subject_vector, [vocabulary[t] for t in subject_tokens], 1.0)
+            personalization += matrix @ (np.log1p(subject_vector) * idf)
+        personalization /= personalization.sum()
+
+        scores = _rank(similarity, personalization)
+        # 점수가 같으면 앞 문장을 고른다
+        chosen = sorted(np.lexsort((np.arange(len(sentences)), -scores))[:max_sentences])
+
+    summary = ""
+    for index in chosen:
+        candidate = f"{summary} {sentences[index]}".strip()
+        if summary and len(candidate) > max_chars:
+            break
+        summary = candidate
+    return summary if len(summary) <= max_chars else summary[: max_chars - 1] + "…"